@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+"""
+Fuzzy autocompletion example.
+
+Type any characters of an animal name in the right order, e.g. "oar" for
+"leopard". The matching characters are highlighted in the menu.
+"""
+from __future__ import unicode_literals
+
+from prompt_toolkit.contrib.completers import FuzzyCompleter, WordCompleter
+from prompt_toolkit import prompt
+
+
+animal_completer = FuzzyCompleter(WordCompleter([
+    'alligator', 'ant', 'ape', 'bat', 'bear', 'beaver', 'bee', 'bison',
+    'butterfly', 'cat', 'chicken', 'crocodile', 'dinosaur', 'dog', 'dolphine',
+    'dove', 'duck', 'eagle', 'elephant', 'fish', 'goat', 'gorilla',
+    'kangoroo', 'leopard', 'lion', 'mouse', 'rabbit', 'rat', 'snake',
+    'spider', 'turkey', 'turtle',
+]))
+
+
+def main():
+    text = prompt('Give some animals: ', completer=animal_completer,
+                  complete_while_typing=True)
+    print('You said: %s' % text)
+
+
+if __name__ == '__main__':
+    main()
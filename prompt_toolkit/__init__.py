@@ -13,9 +13,49 @@ See the examples directory to learn about the usage.
 Probably, to get started, you meight also want to have a look at
 `prompt_toolkit.shortcuts.prompt`.
 """
-from .interface import CommandLineInterface
-from .application import AbortAction, Application
-from .shortcuts import prompt, prompt_async
+import sys
+
+__all__ = (
+    'CommandLineInterface',
+    'AbortAction',
+    'Application',
+    'prompt',
+    'prompt_async',
+)
+
+# The public API is imported on first access, so that `import
+# prompt_toolkit` stays fast for short-lived processes. (Module level
+# `__getattr__` requires Python 3.7. Older versions import everything.)
+_LAZY_ATTRIBUTES = {
+    'CommandLineInterface': '.interface',
+    'AbortAction': '.application',
+    'Application': '.application',
+    'prompt': '.shortcuts',
+    'prompt_async': '.shortcuts',
+}
+
+
+def __getattr__(name):
+    from importlib import import_module
+
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):
+    from .interface import CommandLineInterface
+    from .application import AbortAction, Application
+    from .shortcuts import prompt, prompt_async
 
 
 # Don't forget to update in `docs/conf.py`!
@@ -112,7 +112,8 @@ class CompletionState(object):
     """
     Immutable class that contains a completion state.
     """
-    def __init__(self, original_document, current_completions=None, complete_index=None):
+    def __init__(self, original_document, current_completions=None, complete_index=None,
+                 _statistics=None):
         #: Document as it was when the completion started.
         self.original_document = original_document
 
@@ -124,6 +125,10 @@ class CompletionState(object):
         #: This can be `None` to indicate "no completion", the original text.
         self.complete_index = complete_index  # Position in the `_completions` array.
 
+        # Statistics about `current_completions`, computed by the completion
+        # menus. (By ref, shared with the states created by `go_to_index`.)
+        self._statistics = _statistics or [None]
+
     def __repr__(self):
         return '%s(%r, <%r> completions, index=%r)' % (
             self.__class__.__name__,
@@ -133,7 +138,8 @@ class CompletionState(object):
         """
         Create a new :class:`.CompletionState` object with the new index.
         """
-        return CompletionState(self.original_document, self.current_completions, complete_index=index)
+        return CompletionState(self.original_document, self.current_completions, complete_index=index,
+                               _statistics=self._statistics)
 
     def new_text_and_position(self):
         """
@@ -209,6 +215,12 @@ class Buffer(object):
     :param complete_while_typing: :class:`~prompt_toolkit.filters.SimpleFilter`
         instance. Decide whether or not to do asynchronous autocompleting while
         typing.
+    :param validate_while_typing: :class:`~prompt_toolkit.filters.SimpleFilter`
+        instance. When enabled, the validator is called in a background thread
+        while typing (after a short pause), and errors are shown as soon as
+        they are known. When the text didn't change since then, accepting the
+        input reuses that result instead of calling the validator again. (The
+        validator has to be thread safe.)
     :param enable_history_search: :class:`~prompt_toolkit.filters.SimpleFilter`
         to indicate when up-arrow partial string matching is enabled. It is
         adviced to not enable this at the same time as `complete_while_typing`,
@@ -220,6 +232,7 @@ class Buffer(object):
     def __init__(self, completer=None, auto_suggest=None, history=None,
                  validator=None, tempfile_suffix='',
                  is_multiline=False, complete_while_typing=False,
+                 validate_while_typing=False,
                  enable_history_search=False, initial_document=None,
                  accept_action=AcceptAction.IGNORE, read_only=False,
                  on_text_changed=None, on_text_insert=None, on_cursor_position_changed=None):
@@ -228,6 +241,7 @@ class Buffer(object):
         enable_history_search = to_simple_filter(enable_history_search)
         is_multiline = to_simple_filter(is_multiline)
         complete_while_typing = to_simple_filter(complete_while_typing)
+        validate_while_typing = to_simple_filter(validate_while_typing)
         read_only = to_simple_filter(read_only)
 
         # Validate input.
@@ -240,13 +254,14 @@ class Buffer(object):
 
         self.completer = completer
         self.auto_suggest = auto_suggest
-        self.validator = validator
+        self._validator = validator
         self.tempfile_suffix = tempfile_suffix
         self.accept_action = accept_action
 
         # Filters. (Usually, used by the key bindings to drive the buffer.)
         self.is_multiline = is_multiline
         self.complete_while_typing = complete_while_typing
+        self.validate_while_typing = validate_while_typing
         self.enable_history_search = enable_history_search
         self.read_only = read_only
 
@@ -287,6 +302,10 @@ class Buffer(object):
         self.validation_error = None
         self.validation_state = ValidationState.UNKNOWN
 
+        # Result of the background validation of the current text, as a
+        # `(Document, ValidationError or None)` tuple.
+        self._async_validation_result = None
+
         # State of the selection.
         self.selection_state = None
 
@@ -410,10 +429,23 @@ class Buffer(object):
             self.__working_index = value
             self._text_changed()
 
+    @property
+    def validator(self):
+        return self._validator
+
+    @validator.setter
+    def validator(self, value):
+        # Forget about the results of the previous validator.
+        self._validator = value
+        self._async_validation_result = None
+        self.validation_error = None
+        self.validation_state = ValidationState.UNKNOWN
+
     def _text_changed(self):
         # Remove any validation errors and complete state.
         self.validation_error = None
         self.validation_state = ValidationState.UNKNOWN
+        self._async_validation_result = None
         self.complete_state = None
         self.yank_nth_arg_state = None
         self.document_before_paste = None
@@ -1098,11 +1130,20 @@ class Buffer(object):
         if self.validation_state != ValidationState.UNKNOWN:
             return self.validation_state == ValidationState.VALID
 
-        # Validate first. If not valid, set validation exception.
+        # Validate first. If not valid, set validation exception. (When
+        # validating while typing, use the result of the background validation
+        # of this text, if there is one.)
         if self.validator:
-            try:
-                self.validator.validate(self.document)
-            except ValidationError as e:
+            result = self._async_validation_result
+
+            if (result is not None and self.validate_while_typing() and
+                    result[0].text == self.text and
+                    result[0].cursor_position == self.cursor_position):
+                e = result[1]
+            else:
+                e = self._run_validator(self.document)
+
+            if e is not None:
                 # Set cursor position (don't allow invalid values.)
                 cursor_position = e.cursor_position
                 self.cursor_position = min(max(0, cursor_position), len(self.text))
@@ -1115,6 +1156,31 @@ class Buffer(object):
         self.validation_error = None
         return True
 
+    def _run_validator(self, document):
+        """
+        Call the validator. Return the `ValidationError`, or `None` when the
+        input is valid. (This can be called from another thread.)
+        """
+        try:
+            self.validator.validate(document)
+        except ValidationError as e:
+            return e
+
+    def set_validation_result(self, document, validation_error):
+        """
+        Store the result of validating `document`, done in the background.
+        When the text didn't change in the meantime, show the error. (The
+        cursor is not moved, and the `validation_state` stays unknown until
+        :meth:`.validate` is called, which will then use this result.)
+
+        :param validation_error: `ValidationError` instance or `None`.
+        """
+        assert validation_error is None or isinstance(validation_error, ValidationError)
+
+        if self.text == document.text:
+            self._async_validation_result = (document, validation_error)
+            self.validation_error = validation_error
+
     def append_to_history(self):
         """
         Append the current input to the history.
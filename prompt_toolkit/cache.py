@@ -46,6 +46,9 @@ class SimpleCache(object):
 
             return value
 
+    def __contains__(self, key):
+        return key in self._data
+
     def clear(self):
         " Clear cache. "
         self._data = {}
@@ -24,13 +24,17 @@ class Completion(object):
         completion, e.g. the path or source where it's coming from.
     :param get_display_meta: Lazy `display_meta`. Retrieve meta information
         only when meta is displayed.
+    :param match_positions: (Optional) sequence of indexes in `display` of the
+        characters that should be highlighted in the completion menu. (E.g.
+        the characters that matched a fuzzy search.)
     """
     def __init__(self, text, start_position=0, display=None, display_meta=None,
-                 get_display_meta=None):
+                 get_display_meta=None, match_positions=None):
         self.text = text
         self.start_position = start_position
         self._display_meta = display_meta
         self._get_display_meta = get_display_meta
+        self.match_positions = match_positions
 
         if display is None:
             self.display = text
@@ -84,7 +88,8 @@ class Completion(object):
             text=self.text[position - self.start_position:],
             display=self.display,
             display_meta=self._display_meta,
-            get_display_meta=self._get_display_meta)
+            get_display_meta=self._get_display_meta,
+            match_positions=self.match_positions)
 
 
 class CompleteEvent(object):
@@ -1,7 +1,16 @@
 from __future__ import unicode_literals
 
 from prompt_toolkit.completion import Completer, Completion
+from bisect import bisect_left
+import heapq
 import os
+import threading
+import time
+
+try:
+    from os import scandir
+except ImportError:  # < Python 3.5
+    scandir = None
 
 __all__ = (
     'PathCompleter',
@@ -9,10 +18,115 @@ __all__ = (
 )
 
 
+class _DirectoryListing(object):
+    """
+    Sorted listing of one directory.
+
+    :param mtime: Modification time of the directory when it was listed.
+    :param names: Sorted list of file names.
+    :param entries: List of `os.DirEntry` objects, in the same order as
+        `names`. (Or `None`, when `os.scandir` is not available.)
+    """
+    def __init__(self, mtime, listed_at, names, entries):
+        self.mtime = mtime
+        self.listed_at = listed_at
+        self.names = names
+        self.entries = entries
+
+    def is_dir(self, directory, index):
+        """
+        True when the file at this index is a directory. (Uses the file type
+        info that `scandir` got for free, so usually without a `stat` call.)
+        """
+        if self.entries is None:
+            return os.path.isdir(os.path.join(directory, self.names[index]))
+
+        try:
+            return self.entries[index].is_dir()
+        except OSError:
+            return False
+
+    def iter_matches(self, prefix):
+        """
+        Yield the indexes of all names that start with `prefix`, in order.
+        """
+        names = self.names
+        i = bisect_left(names, prefix)
+
+        while i < len(names) and names[i].startswith(prefix):
+            yield i
+            i += 1
+
+
+class _DirectoryCache(object):
+    """
+    Cache of directory listings, shared by all `PathCompleter` instances.
+    A listing is reused as long as the modification time of the directory
+    didn't change.
+
+    :param maxsize: Maximum number of directories to keep.
+    """
+    # When a directory was listed within this amount of seconds after its
+    # last modification, we don't trust the cached listing. (Some file systems
+    # have a coarse mtime resolution.)
+    MTIME_RESOLUTION = 2
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def get_listing(self, directory):
+        """
+        Return the `_DirectoryListing` for this directory.
+        Raises `OSError` when the directory can't be read.
+        """
+        key = os.path.abspath(directory)
+        mtime = os.stat(key).st_mtime
+        listing = self._listings.get(key)
+
+        if (listing is not None and listing.mtime == mtime and
+                listing.listed_at - mtime > self.MTIME_RESOLUTION):
+            return listing
+
+        listing = self._list_directory(key, mtime)
+
+        with self._lock:
+            if len(self._listings) >= self.maxsize and key not in self._listings:
+                # Remove the oldest listing.
+                oldest = min(self._listings, key=lambda k: self._listings[k].listed_at)
+                del self._listings[oldest]
+            self._listings[key] = listing
+
+        return listing
+
+    def _list_directory(self, directory, mtime):
+        listed_at = time.time()
+
+        if scandir is None:
+            names = sorted(os.listdir(directory))
+            return _DirectoryListing(mtime, listed_at, names, None)
+
+        entries = sorted(scandir(directory), key=lambda e: e.name)
+        return _DirectoryListing(mtime, listed_at, [e.name for e in entries], entries)
+
+    def clear(self):
+        " Forget all listings. "
+        with self._lock:
+            self._listings = {}
+
+
+_directory_cache = _DirectoryCache()
+
+
 class PathCompleter(Completer):
     """
     Complete for Path variables.
 
+    Directory listings are cached and reused until the modification time of
+    the directory changes. Completions are yielded in sorted order, but
+    lazily.
+
     :param get_paths: Callable which returns a list of directories to look into
                       when the user enters a relative path.
     :param file_filter: Callable which takes a filename and returns whether
@@ -58,24 +172,27 @@ class PathCompleter(Completer):
             # Start of current file.
             prefix = os.path.basename(text)
 
-            # Get all filenames.
-            filenames = []
-            for directory in directories:
-                # Look for matches in this directory.
-                if os.path.isdir(directory):
-                    for filename in os.listdir(directory):
-                        if filename.startswith(prefix):
-                            filenames.append((directory, filename))
+            # Get the matches of every directory. (Each listing is sorted.)
+            def get_matches(i, directory, listing):
+                for index in listing.iter_matches(prefix):
+                    yield listing.names[index], i, index, directory, listing
 
-            # Sort
-            filenames = sorted(filenames, key=lambda k: k[1])
+            matches = []
+            for i, directory in enumerate(directories):
+                if not directory:
+                    continue
+                try:
+                    listing = _directory_cache.get_listing(directory)
+                except OSError:
+                    continue
+                matches.append(get_matches(i, directory, listing))
 
-            # Yield them.
-            for directory, filename in filenames:
+            # Yield them, merged in sorted order.
+            for filename, _, index, directory, listing in heapq.merge(*matches):
                 completion = filename[len(prefix):]
                 full_name = os.path.join(directory, filename)
 
-                if os.path.isdir(full_name):
+                if listing.is_dir(directory, index):
                     # For directories, add a slash to the filename.
                     # (We don't add them to the `completion`. Users can type it
                     # to trigger the autocompletion themself.)
@@ -91,9 +208,96 @@ class PathCompleter(Completer):
             pass
 
 
+class _ExecutableIndex(object):
+    """
+    Sorted list of the names of all executables in the directories of
+    ``$PATH``. It's rebuilt only when the value of ``$PATH`` or the
+    modification time of one of its directories changes.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._names = []
+        self._background_build_started = False
+
+    def _get_key(self, path):
+        mtimes = []
+        for directory in path.split(os.pathsep):
+            try:
+                mtimes.append(os.stat(directory).st_mtime)
+            except OSError:
+                mtimes.append(None)
+        return path, tuple(mtimes)
+
+    def _build(self, path):
+        names = set()
+
+        for directory in path.split(os.pathsep):
+            if not directory:
+                continue
+            try:
+                listing = _directory_cache.get_listing(directory)
+            except OSError:
+                continue
+
+            for index, name in enumerate(listing.names):
+                if (not listing.is_dir(directory, index) and
+                        os.access(os.path.join(directory, name), os.X_OK)):
+                    names.add(name)
+
+        return sorted(names)
+
+    def get_names(self):
+        """
+        Return the sorted list of executable names. (This blocks while the
+        index is being built.)
+        """
+        path = os.environ.get('PATH', '')
+        key = self._get_key(path)
+
+        if key != self._key:
+            with self._lock:
+                if key != self._key:
+                    listed_at = time.time()
+                    self._names = self._build(path)
+
+                    # Like for `_DirectoryCache`, don't trust the modification
+                    # times of directories that changed right before listing
+                    # them. Build the index again next time.
+                    if all(mtime is None or
+                           listed_at - mtime > _DirectoryCache.MTIME_RESOLUTION
+                           for mtime in key[1]):
+                        self._key = key
+                    else:
+                        self._key = None
+
+        return self._names
+
+    def build_in_background(self):
+        """
+        Start building the index in a daemon thread, so that it's ready by the
+        time the first completion is requested.
+        """
+        with self._lock:
+            if self._background_build_started:
+                return
+            self._background_build_started = True
+
+        t = threading.Thread(target=self.get_names)
+        t.daemon = True
+        t.start()
+
+
+_executable_index = _ExecutableIndex()
+
+
 class ExecutableCompleter(PathCompleter):
     """
     Complete only excutable files in the current path.
+
+    Command names are completed from an index of ``$PATH`` that is built in
+    the background and kept in memory. Input that contains a directory name
+    is completed like a normal path.
     """
     def __init__(self):
         PathCompleter.__init__(
@@ -102,4 +306,24 @@ class ExecutableCompleter(PathCompleter):
             min_input_len=1,
             get_paths=lambda: os.environ.get('PATH', '').split(os.pathsep),
             file_filter=lambda name: os.access(name, os.X_OK),
-            expanduser=True),
+            expanduser=True)
+
+        _executable_index.build_in_background()
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+
+        if len(text) < self.min_input_len:
+            return
+
+        if os.path.dirname(os.path.expanduser(text)):
+            for c in super(ExecutableCompleter, self).get_completions(document, complete_event):
+                yield c
+            return
+
+        names = _executable_index.get_names()
+        i = bisect_left(names, text)
+
+        while i < len(names) and names[i].startswith(text):
+            yield Completion(names[i][len(text):], 0, display=names[i])
+            i += 1
@@ -0,0 +1,149 @@
+"""
+Fuzzy (subsequence) matching on top of any other completer.
+"""
+from __future__ import unicode_literals
+
+import heapq
+
+from prompt_toolkit.cache import FastDictCache
+from prompt_toolkit.completion import Completer, Completion
+from prompt_toolkit.document import Document
+
+__all__ = (
+    'FuzzyCompleter',
+)
+
+
+def _get_char_mask(text):
+    """
+    Return a bitmask with one bit set for every character in `text`. (The
+    character code modulo 64 selects the bit.) When the mask of the input is
+    not a subset of the mask of a candidate, the candidate can't contain the
+    input as a subsequence.
+    """
+    mask = 0
+    for c in set(text):
+        mask |= 1 << (ord(c) & 63)
+    return mask
+
+
+def _fuzzy_match(query, text):
+    """
+    Find the most compact occurrence of `query` as a subsequence of `text`.
+
+    Returns a ``((span, start), positions)`` tuple or `None` if there is no
+    match.
+    """
+    first = query[0]
+    rest = query[1:]
+    best = None
+
+    start = text.find(first)
+    while start != -1:
+        positions = [start]
+        pos = start
+
+        for c in rest:
+            pos = text.find(c, pos + 1)
+            if pos == -1:
+                # When a greedy match fails from this start position, it will
+                # also fail from any later start position.
+                return best
+            positions.append(pos)
+
+        span = pos - start + 1
+        if best is None or span < best[0][0]:
+            best = ((span, start), positions)
+
+            # A contiguous match can't be improved upon.
+            if span == len(query):
+                break
+
+        start = text.find(first, start + 1)
+
+    return best
+
+
+class FuzzyCompleter(Completer):
+    """
+    Wrap another completer and turn its completions into fuzzy matches. The
+    word before the cursor has to appear as a subsequence of the completion,
+    e.g. "oar" matches "leopard".
+
+    The wrapped completer is called with the word before the cursor removed
+    from the document, so that it returns all its candidates. Candidates are
+    rejected early using a character bitmask, only the remaining ones are
+    scored. The best results come first: compact matches, matches close to
+    the start and short completions are preferred.
+
+    :param completer: :class:`~prompt_toolkit.completion.Completer` instance,
+        e.g. a :class:`~prompt_toolkit.contrib.completers.WordCompleter`.
+    :param WORD: When True, use WORD characters for finding the word before
+        the cursor.
+    :param ignore_case: If True, case-insensitive matching.
+    :param max_results: Keep only this many of the best matches. (`None` for
+        no limit.)
+    """
+    def __init__(self, completer, WORD=False, ignore_case=True, max_results=1000):
+        assert isinstance(completer, Completer)
+        assert max_results is None or (isinstance(max_results, int) and max_results > 0)
+
+        self.completer = completer
+        self.WORD = WORD
+        self.ignore_case = ignore_case
+        self.max_results = max_results
+
+        # Bitmask for every candidate text that we have seen.
+        self._char_masks = FastDictCache(get_value=_get_char_mask, size=100000)
+
+    def get_completions(self, document, complete_event):
+        word = document.get_word_before_cursor(WORD=self.WORD)
+
+        # Without input, there is nothing to match against.
+        if not word:
+            for c in self.completer.get_completions(document, complete_event):
+                yield c
+            return
+
+        word_length = len(word)
+        text_before_word = document.text_before_cursor[:-word_length]
+        document2 = Document(text_before_word, len(text_before_word))
+
+        if self.ignore_case:
+            word = word.lower()
+
+        word_mask = _get_char_mask(word)
+        char_masks = self._char_masks
+        max_results = self.max_results
+        heap = []
+
+        for index, c in enumerate(self.completer.get_completions(document2, complete_event)):
+            text = c.text.lower() if self.ignore_case else c.text
+
+            # Quick rejection.
+            if char_masks[text, ] & word_mask != word_mask:
+                continue
+
+            match = _fuzzy_match(word, text)
+            if match is None:
+                continue
+
+            (span, start), positions = match
+
+            # Keep the worst match at the top of the heap, so that it can be
+            # replaced when a better one comes in.
+            item = (-span, -start, -len(text), -index, c, positions)
+
+            if max_results is None or len(heap) < max_results:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        for _, _, _, _, c, positions in sorted(heap, reverse=True):
+            yield Completion(
+                text=c.text,
+                start_position=c.start_position - word_length,
+                display=c.display,
+                display_meta=c._display_meta,
+                get_display_meta=c._get_display_meta,
+                match_positions=positions if c.display == c.text else None)
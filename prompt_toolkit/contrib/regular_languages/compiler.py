@@ -39,9 +39,15 @@ Partial matches are possible::
 
 """
 from __future__ import unicode_literals
+import hashlib
+import json
+import os
 import re
+import six
+import threading
 
 from six.moves import range
+from prompt_toolkit.cache import SimpleCache
 from .regex_parser import Any, Sequence, Regex, Variable, Repeat, Lookahead
 from .regex_parser import parse_regex, tokenize_regex
 
@@ -55,6 +61,92 @@ __all__ = (
 # expression has been matched.)
 _INVALID_TRAILING_INPUT = 'invalid_trailing'
 
+# Version of the format of the files in the on-disk cache. (Increase when the
+# generated patterns change.)
+_CACHE_VERSION = 1
+
+# Note that we don't need re.MULTILINE! (^ and $ still represent the start and
+# end of input text.)
+_FLAGS = re.DOTALL
+
+# Regex for finding the named groups in a generated pattern.
+_GROUP_NAME_RE = re.compile(r'\(\?P<(\w+)>')
+
+
+class _PatternSetPart(object):
+    """
+    One of the patterns of a `_PatternSet`. Like a compiled regex, it has a
+    `groupindex` attribute, mapping the group names of the original pattern
+    to group indexes in the match of the combined pattern.
+    """
+    def __init__(self, pattern, groupindex):
+        self.pattern = pattern
+        self.groupindex = groupindex
+
+
+class _PatternSet(object):
+    """
+    Match a string against a list of regex patterns at once.
+
+    The patterns are combined into a single regex, in which every pattern is
+    an optional lookahead at the start of the input, followed by an empty
+    "tag" group::
+
+        ^(?:(?=PATTERN_0(?P<t0>))|)(?:(?=PATTERN_1(?P<t1>))|)...
+
+    A single call to `re.match` tries all patterns. (A lookahead that matches
+    keeps its groups, a lookahead that doesn't match is skipped by the empty
+    alternative.) The groups of every pattern are renamed, in order to keep
+    the names unique.
+
+    When the combined regex can't be compiled (Python 2 only supports 100
+    named groups), we fall back to matching each pattern separately.
+
+    :param patterns: List of regex strings. Each should match from the start
+        of the input.
+    """
+    def __init__(self, patterns):
+        self.patterns = patterns
+
+        parts = []
+        renamed_groups = []
+
+        for i, pattern in enumerate(patterns):
+            names = {}
+
+            def rename(m):
+                name = '%s_%i' % (m.group(1), i)
+                names[m.group(1)] = name
+                return '(?P<%s>' % name
+
+            parts.append('(?:(?=%s(?P<t%i>))|)' % (_GROUP_NAME_RE.sub(rename, pattern), i))
+            renamed_groups.append(names)
+
+        try:
+            self._re = re.compile('^%s' % ''.join(parts), _FLAGS)
+        except (re.error, AssertionError, OverflowError):
+            self._re = None
+            self._regexes = [re.compile(p, _FLAGS) for p in patterns]
+        else:
+            groupindex = self._re.groupindex
+            self._parts = [
+                ('t%i' % i, _PatternSetPart(pattern, dict(
+                    (name, groupindex[new_name]) for name, new_name in names.items())))
+                for i, (pattern, names) in enumerate(zip(patterns, renamed_groups))]
+
+    def match(self, string):
+        """
+        Return a list of (pattern, re_match) tuples for all the patterns that
+        match. (`pattern` has a `groupindex` attribute that is valid for
+        `re_match`.)
+        """
+        if self._re is None:
+            matches = [(r, r.match(string)) for r in self._regexes]
+            return [(r, m) for r, m in matches if m]
+
+        m = self._re.match(string)
+        return [(part, m) for tag, part in self._parts if m.start(tag) != -1]
+
 
 class _CompiledGrammar(object):
     """
@@ -64,8 +156,10 @@ class _CompiledGrammar(object):
     :param root_node: :class~`.regex_parser.Node` instance.
     :param escape_funcs: `dict` mapping variable names to escape callables.
     :param unescape_funcs: `dict` mapping variable names to unescape callables.
+    :param patterns: Patterns as returned by :meth:`.get_patterns` for the
+        same grammar. (When given, the tree walk is skipped.)
     """
-    def __init__(self, root_node, escape_funcs=None, unescape_funcs=None):
+    def __init__(self, root_node, escape_funcs=None, unescape_funcs=None, patterns=None):
         self.root_node = root_node
         self.escape_funcs = escape_funcs or {}
         self.unescape_funcs = unescape_funcs or {}
@@ -80,22 +174,78 @@ class _CompiledGrammar(object):
             counter[0] += 1
             return name
 
-        # Compile regex strings.
-        self._re_pattern = '^%s$' % self._transform(root_node, create_group_func)
-        self._re_prefix_patterns = list(self._transform_prefix(root_node, create_group_func))
+        self._create_group_func = create_group_func
 
-        # Compile the regex itself.
-        flags = re.DOTALL  # Note that we don't need re.MULTILINE! (^ and $
-                           # still represent the start and end of input text.)
-        self._re = re.compile(self._re_pattern, flags)
-        self._re_prefix = [re.compile(t, flags) for t in self._re_prefix_patterns]
+        # Compile regex strings. (The prefix patterns are only generated and
+        # compiled when they are needed. For grammars with many
+        # alternatives, there can be a lot of them.)
+        if patterns is None:
+            self._re_pattern = '^%s$' % self._transform(root_node, create_group_func)
+            self._prefix_patterns = None
+        else:
+            self._re_pattern = patterns['pattern']
+            self._prefix_patterns = patterns['prefix_patterns']
+            self._group_names_to_nodes.update(patterns['group_names'])
+
+        self._prefix_pattern_set = None
+        self._prefix_pattern_set_with_trailing_input = None
+
+        # Guards the lazy generation of the prefix patterns. (The lexer,
+        # completer and validator can run in different threads, and they
+        # share `create_group_func`.)
+        self._prefix_patterns_lock = threading.Lock()
 
+        # Compile the regex itself.
+        self._re = re.compile(self._re_pattern, _FLAGS)
+
+        # Matches for the most recent input strings. (The lexer, completer
+        # and validator usually ask for the same text.)
+        self._match_cache = SimpleCache(maxsize=8)
+        self._match_prefix_cache = SimpleCache(maxsize=8)
+
+    @property
+    def _re_prefix_patterns(self):
+        " The regex strings that match a prefix of the grammar. "
+        if self._prefix_patterns is None:
+            with self._prefix_patterns_lock:
+                if self._prefix_patterns is None:
+                    self._prefix_patterns = list(self._transform_prefix(
+                        self.root_node, self._create_group_func))
+        return self._prefix_patterns
+
+    @property
+    def _re_prefix(self):
+        " `_PatternSet` of all the prefix patterns. "
+        if self._prefix_pattern_set is None:
+            self._prefix_pattern_set = _PatternSet(self._re_prefix_patterns)
+        return self._prefix_pattern_set
+
+    @property
+    def _re_prefix_with_trailing_input(self):
         # We compile one more set of regexes, similar to `_re_prefix`, but accept any trailing
         # input. This will ensure that we can still highlight the input correctly, even when the
         # input contains some additional characters at the end that don't match the grammar.)
-        self._re_prefix_with_trailing_input = [
-            re.compile(r'(?:%s)(?P<%s>.*?)$' % (t.rstrip('$'), _INVALID_TRAILING_INPUT), flags)
-            for t in self._re_prefix_patterns]
+        if self._prefix_pattern_set_with_trailing_input is None:
+            self._prefix_pattern_set_with_trailing_input = _PatternSet([
+                r'(?:%s)(?P<%s>.*?)$' % (t.rstrip('$'), _INVALID_TRAILING_INPUT)
+                for t in self._re_prefix_patterns])
+        return self._prefix_pattern_set_with_trailing_input
+
+    def get_patterns(self):
+        """
+        Return a dictionary with the generated regex strings and the mapping
+        of the group names to the variable names. This can be serialized
+        (as JSON) and passed back as the `patterns` argument later.
+        """
+        # (Generate the prefix patterns first, this registers their group
+        # names.)
+        prefix_patterns = self._re_prefix_patterns
+
+        return {
+            'pattern': self._re_pattern,
+            'prefix_patterns': prefix_patterns,
+            'group_names': self._group_names_to_nodes,
+        }
 
     def escape(self, varname, value):
         """
@@ -236,6 +386,9 @@ class _CompiledGrammar(object):
 
         :param string: The input string.
         """
+        return self._match_cache.get(string, lambda: self._match(string))
+
+    def _match(self, string):
         m = self._re.match(string)
 
         if m:
@@ -250,11 +403,14 @@ class _CompiledGrammar(object):
 
         :param string: The input string.
         """
+        return self._match_prefix_cache.get(string, lambda: self._match_prefix(string))
+
+    def _match_prefix(self, string):
         # First try to match using `_re_prefix`. If nothing is found, use the patterns that
-        # also accept trailing characters.
-        for patterns in [self._re_prefix, self._re_prefix_with_trailing_input]:
-            matches = [(r, r.match(string)) for r in patterns]
-            matches = [(r, m) for r, m in matches if m]
+        # also accept trailing characters. (Each set of patterns is matched
+        # in one go.)
+        for pattern_set in [self._re_prefix, self._re_prefix_with_trailing_input]:
+            matches = pattern_set.match(string)
 
             if matches != []:
                 return Match(string, matches, self._group_names_to_nodes, self.unescape_funcs)
@@ -263,7 +419,9 @@ class _CompiledGrammar(object):
 class Match(object):
     """
     :param string: The input string.
-    :param re_matches: List of (compiled_re_pattern, re_match) tuples.
+    :param re_matches: List of (compiled_re_pattern, re_match) tuples. (The
+        pattern can also be a `_PatternSetPart`, anything with a `groupindex`
+        that is valid for the match.)
     :param group_names_to_nodes: Dictionary mapping all the re group names to the matching Node instances.
     """
     def __init__(self, string, re_matches, group_names_to_nodes, unescape_funcs):
@@ -271,11 +429,17 @@ class Match(object):
         self._re_matches = re_matches
         self._group_names_to_nodes = group_names_to_nodes
         self._unescape_funcs = unescape_funcs
+        self._regs = None
 
     def _nodes_to_regs(self):
         """
         Return a list of (varname, reg) tuples.
         """
+        # (Matches are cached and shared by the lexer, completer and
+        # validator, so compute this only once.)
+        if self._regs is not None:
+            return self._regs
+
         def get_tuples():
             for r, re_match in self._re_matches:
                 for group_name, group_index in r.groupindex.items():
@@ -284,7 +448,8 @@ class Match(object):
                         node = self._group_names_to_nodes[group_name]
                         yield (node, reg)
 
-        return list(get_tuples())
+        self._regs = list(get_tuples())
+        return self._regs
 
     def _nodes_to_values(self):
         """
@@ -389,16 +554,86 @@ class MatchVariable(object):
         return '%s(%r, %r)' % (self.__class__.__name__, self.varname, self.value)
 
 
-def compile(expression, escape_funcs=None, unescape_funcs=None):
+def compile(expression, escape_funcs=None, unescape_funcs=None, cache_directory=None):
     """
     Compile grammar (given as regex string), returning a `CompiledGrammar`
     instance.
+
+    :param cache_directory: When given, the generated regex strings are
+        stored in this directory, in a file named after a hash of the
+        grammar. Later calls with the same grammar load them from there,
+        instead of generating them again.
     """
-    return _compile_from_parse_tree(
-        parse_regex(tokenize_regex(expression)),
+    root_node = parse_regex(tokenize_regex(expression))
+
+    if cache_directory is None:
+        return _compile_from_parse_tree(
+            root_node,
+            escape_funcs=escape_funcs,
+            unescape_funcs=unescape_funcs)
+
+    key = '%s:%s' % (_CACHE_VERSION, expression)
+    filename = os.path.join(
+        cache_directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    # Load from cache.
+    try:
+        with open(filename, 'rb') as f:
+            patterns = json.loads(f.read().decode('utf-8'))
+    except (IOError, OSError, ValueError):
+        patterns = None
+
+    # (A file with another structure, e.g. written by an older version, or
+    # an invalid regex is ignored and overwritten.)
+    if _is_valid_patterns(patterns):
+        try:
+            return _CompiledGrammar(root_node, escape_funcs=escape_funcs,
+                                    unescape_funcs=unescape_funcs, patterns=patterns)
+        except re.error:
+            pass
+
+    # Compile and store in cache. (Failing to write the cache is not fatal.)
+    grammar = _compile_from_parse_tree(
+        root_node,
         escape_funcs=escape_funcs,
         unescape_funcs=unescape_funcs)
 
+    # Write to a temporary file first, so that other processes never see a
+    # partially written file.
+    tmp_filename = '%s.%s.tmp' % (filename, os.getpid())
+
+    try:
+        if not os.path.isdir(cache_directory):
+            os.makedirs(cache_directory)
+
+        with open(tmp_filename, 'wb') as f:
+            f.write(json.dumps(grammar.get_patterns()).encode('utf-8'))
+
+        # (`os.replace` also overwrites an existing file on Windows.
+        # Python 2 doesn't have it.)
+        getattr(os, 'replace', os.rename)(tmp_filename, filename)
+    except (IOError, OSError):
+        try:
+            os.remove(tmp_filename)
+        except OSError:
+            pass
+
+    return grammar
+
+
+def _is_valid_patterns(patterns):
+    """
+    True when `patterns` has the structure returned by
+    :meth:`_CompiledGrammar.get_patterns`.
+    """
+    return (
+        isinstance(patterns, dict) and
+        isinstance(patterns.get('pattern'), six.string_types) and
+        isinstance(patterns.get('prefix_patterns'), list) and
+        all(isinstance(p, six.string_types) for p in patterns['prefix_patterns']) and
+        isinstance(patterns.get('group_names'), dict) and
+        all(isinstance(v, six.string_types) for v in patterns['group_names'].values()))
+
 
 def _compile_from_parse_tree(root_node, *a, **kw):
     """
@@ -36,6 +36,8 @@ class GrammarCompleter(Completer):
             completions = self._remove_duplicates(
                 self._get_completions_for_match(m, complete_event))
 
+            # (This is lazy: completions are yielded as soon as the completers
+            # of the grammar variables produce them.)
             for c in completions:
                 yield c
 
@@ -69,7 +71,8 @@ class GrammarCompleter(Completer):
                         text=self.compiled_grammar.escape(varname, new_text),
                         start_position=start - len(match.string),
                         display=completion.display,
-                        display_meta=completion.display_meta)
+                        display_meta=completion.display_meta,
+                        match_positions=completion.match_positions)
 
     def _remove_duplicates(self, items):
         """
@@ -77,8 +80,8 @@ class GrammarCompleter(Completer):
         (Sometimes we have duplicates, because the there several matches of the
         same grammar, each yielding similar completions.)
         """
-        result = []
+        seen = set()
         for i in items:
-            if i not in result:
-                result.append(i)
-        return result
+            if i not in seen:
+                seen.add(i)
+                yield i
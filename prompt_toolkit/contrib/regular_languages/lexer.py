@@ -16,6 +16,47 @@ __all__ = (
 )
 
 
+def _overlay_spans(spans, new_spans, only_token=None):
+    """
+    Apply `new_spans` on top of `spans` and return the resulting spans.
+
+    Both are sorted lists of non-overlapping ``(start, stop, token)`` tuples.
+    `spans` covers the whole input, `new_spans` can leave gaps. When
+    `only_token` is given, only the parts of `spans` that have this token are
+    replaced.
+    """
+    points = set()
+    for start, stop, _ in spans:
+        points.add(start)
+        points.add(stop)
+    for start, stop, _ in new_spans:
+        points.add(start)
+        points.add(stop)
+    points = sorted(points)
+
+    result = []
+    i = j = 0
+
+    for start, stop in zip(points, points[1:]):
+        while spans[i][1] <= start:
+            i += 1
+        while j < len(new_spans) and new_spans[j][1] <= start:
+            j += 1
+
+        token = spans[i][2]
+        if (j < len(new_spans) and new_spans[j][0] <= start and
+                (only_token is None or token == only_token)):
+            token = new_spans[j][2]
+
+        # Merge with the previous span when the token is the same.
+        if result and result[-1][2] == token:
+            result[-1] = (result[-1][0], stop, token)
+        else:
+            result.append((start, stop, token))
+
+    return result
+
+
 class GrammarLexer(Lexer):
     """
     Lexer which can be used for highlighting of tokens according to variables in the grammar.
@@ -44,7 +85,8 @@ class GrammarLexer(Lexer):
         m = self.compiled_grammar.match_prefix(text)
 
         if m:
-            characters = [[self.default_token, c] for c in text]
+            # List of (start, stop, token) tuples, covering the whole input.
+            spans = [(0, len(text), self.default_token)]
 
             for v in m.variables():
                 # If we have a `Lexer` instance for this part of the input.
@@ -54,27 +96,29 @@ class GrammarLexer(Lexer):
                 if lexer:
                     document = Document(text[v.start:v.stop])
                     lexer_tokens_for_line = lexer.lex_document(cli, document)
-                    lexer_tokens = []
-                    for i in range(len(document.lines)):
-                        lexer_tokens.extend(lexer_tokens_for_line(i))
-                        lexer_tokens.append((Token, '\n'))
-                    if lexer_tokens:
-                        lexer_tokens.pop()
-
+                    lexer_spans = []
                     i = v.start
-                    for t, s in lexer_tokens:
-                        for c in s:
-                            if characters[i][0] == self.default_token:
-                                characters[i][0] = t
+
+                    for lineno in range(len(document.lines)):
+                        if lineno > 0:
+                            lexer_spans.append((i, i + 1, Token))
                             i += 1
 
+                        for t, s in lexer_tokens_for_line(lineno):
+                            if s:
+                                lexer_spans.append((i, i + len(s), t))
+                                i += len(s)
+
+                    # Characters that already got a token keep it.
+                    spans = _overlay_spans(spans, lexer_spans, only_token=self.default_token)
+
             # Highlight trailing input.
             trailing_input = m.trailing_input()
             if trailing_input:
-                for i in range(trailing_input.start, trailing_input.stop):
-                    characters[i][0] = Token.TrailingInput
+                spans = _overlay_spans(
+                    spans, [(trailing_input.start, trailing_input.stop, Token.TrailingInput)])
 
-            return characters
+            return [(token, text[start:stop]) for start, stop, token in spans]
         else:
             return [(Token, text)]
 
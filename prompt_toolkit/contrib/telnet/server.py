@@ -155,7 +155,8 @@ class TelnetConnection(object):
 
         # Create a parser, and parser callbacks.
         cb = self.cli.create_eventloop_callbacks()
-        inputstream = InputStream(cb.feed_key)
+        key_presses = []  # Collect the key presses of each data chunk.
+        inputstream = InputStream(key_presses.append)
 
         # Input decoder for stdin. (Required when working with multibyte
         # characters, like chinese input.)
@@ -173,6 +174,10 @@ class TelnetConnection(object):
             try:
                 result = stdin_decoder[0].decode(data)
                 inputstream.feed(result)
+
+                keys = key_presses[:]
+                del key_presses[:]
+                cb.feed_keys(keys)
             except UnicodeDecodeError:
                 stdin_decoder[0] = stdin_decoder_cls()
                 return ''
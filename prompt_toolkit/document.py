@@ -10,6 +10,7 @@ import string
 import weakref
 from six.moves import range, map
 
+from .cache import SimpleCache
 from .selection import SelectionType, SelectionState, PasteMode
 from .clipboard import ClipboardData
 
@@ -30,6 +31,10 @@ _FIND_BIG_WORD_RE = re.compile(r'([^\s]+)')
 _FIND_CURRENT_BIG_WORD_RE = re.compile(r'^([^\s]+)')
 _FIND_CURRENT_BIG_WORD_INCLUDE_TRAILING_WHITESPACE_RE = re.compile(r'^([^\s]+\s*)')
 
+# Bracket pairs that are matched by `find_matching_bracket_position`.
+_BRACKET_PAIRS = ('()', '[]', '{}', '<>')
+_FIND_BRACKET_RE = re.compile(r'[()\[\]{}<>]')
+
 # Share the Document._cache between all Document instances.
 # (Document instances are considered immutable. That means that if another
 # `Document` is constructed with the same text, it should have the same
@@ -56,6 +61,106 @@ class _ImmutableLineList(list):
     sort = _error
 
 
+class _SearchMatchIndex(object):
+    """
+    Positions of all the occurrences of a search string in a text. This is
+    built once, using a single compiled pattern, and shared by the search
+    highlighting and the search navigation.
+
+    :param text: The text to search in.
+    :param sub: The (non empty) string to search for.
+    :param ignore_case: If True, case-insensitive search.
+    """
+    def __init__(self, text, sub, ignore_case=False):
+        assert sub
+
+        flags = re.IGNORECASE if ignore_case else 0
+        pattern = re.compile(re.escape(sub), flags)
+
+        #: Sorted start and end positions of every match. (Matches can
+        #: overlap, like searching "aa" in "aaa".)
+        self.starts = []
+        self.ends = []
+
+        match = pattern.search(text)
+        while match:
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+            match = pattern.search(text, match.start() + 1)
+
+        self._non_overlapping_starts = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def non_overlapping_starts(self):
+        """
+        Start positions of the matches that `find`, `find_all` and the
+        highlighting visit: from the start of the text, skipping the matches
+        that overlap with the previous one.
+        """
+        if self._non_overlapping_starts is None:
+            result = []
+            previous_end = 0
+
+            for start, end in zip(self.starts, self.ends):
+                if start >= previous_end:
+                    result.append(start)
+                    previous_end = end
+
+            self._non_overlapping_starts = result
+        return self._non_overlapping_starts
+
+    def find_next(self, position, count=1):
+        """
+        Return the index of the `count`-th match starting at or after
+        `position`, skipping overlapping matches. `None` if there is none.
+        """
+        i = bisect.bisect_left(self.starts, position)
+
+        for _ in range(count - 1):
+            if i >= len(self.starts):
+                break
+            i = bisect.bisect_left(self.starts, self.ends[i], i + 1)
+
+        if i < len(self.starts):
+            return i
+
+    def find_previous(self, position, count=1):
+        """
+        Return the index of the `count`-th match ending at or before
+        `position`, skipping overlapping matches. `None` if there is none.
+        """
+        i = bisect.bisect_right(self.ends, position) - 1
+
+        for _ in range(count - 1):
+            if i < 0:
+                break
+            i = bisect.bisect_right(self.ends, self.starts[i], 0, i) - 1
+
+        if i >= 0:
+            return i
+
+    def get_spans(self, start, end):
+        """
+        Return a list of non-overlapping ``(start, end)`` tuples for the
+        matches that start in the range ``start:end``. The matches are
+        clipped to this range.
+        """
+        result = []
+        i = bisect.bisect_left(self.starts, start)
+        previous_end = start
+
+        while i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] >= previous_end:
+                previous_end = min(self.ends[i], end)
+                result.append((self.starts[i], previous_end))
+            i += 1
+
+        return result
+
+
 class _DocumentCache(object):
     def __init__(self):
         #: List of lines for the Document text.
@@ -64,6 +169,13 @@ class _DocumentCache(object):
         #: List of index positions, pointing to the start of all the lines.
         self.line_indexes = None
 
+        #: Maps (search_text, ignore_case) to `_SearchMatchIndex` instances.
+        self.search_matches = SimpleCache(maxsize=4)
+
+        #: Maps the position of every matched bracket to the position of its
+        #: partner.
+        self.bracket_pairs = None
+
 
 class Document(object):
     """
@@ -174,6 +286,35 @@ class Document(object):
 
         return self._cache.lines
 
+    @property
+    def _bracket_pairs(self):
+        """
+        Dictionary that maps the position of every bracket that has a match
+        to the position of the matching bracket. (Every kind of bracket is
+        matched independently from the others.)
+        """
+        if self._cache.bracket_pairs is None:
+            pairs = {}
+            stacks = dict((A, []) for A, B in _BRACKET_PAIRS)
+            opening = dict((B, A) for A, B in _BRACKET_PAIRS)
+
+            for match in _FIND_BRACKET_RE.finditer(self.text):
+                c = match.group(0)
+                pos = match.start()
+
+                if c in stacks:
+                    stacks[c].append(pos)
+                else:
+                    stack = stacks[opening[c]]
+                    if stack:
+                        partner = stack.pop()
+                        pairs[partner] = pos
+                        pairs[pos] = partner
+
+            self._cache.bracket_pairs = pairs
+
+        return self._cache.bracket_pairs
+
     @property
     def _line_start_indexes(self):
         """
@@ -345,6 +486,17 @@ class Document(object):
         """
         assert isinstance(ignore_case, bool)
 
+        if not in_current_line and sub:
+            matches = self.get_search_matches(sub, ignore_case=ignore_case)
+            if include_current_position:
+                i = matches.find_next(self.cursor_position, count=count)
+            else:
+                i = matches.find_next(self.cursor_position + 1, count=count)
+
+            if i is not None:
+                return matches.starts[i] - self.cursor_position
+            return
+
         if in_current_line:
             text = self.current_line_after_cursor
         else:
@@ -374,9 +526,36 @@ class Document(object):
         Find all occurances of the substring. Return a list of absolute
         positions in the document.
         """
+        if sub:
+            matches = self.get_search_matches(sub, ignore_case=ignore_case)
+            return [start for start, _ in matches.get_spans(0, len(self.text))]
+
         flags = re.IGNORECASE if ignore_case else 0
         return [a.start() for a in re.finditer(re.escape(sub), self.text, flags)]
 
+    def get_search_matches(self, sub, ignore_case=False):
+        """
+        Return the index of all the occurrences of the (non empty) substring
+        in this text. It is built lazily and shared by all `Document`
+        instances with the same text.
+        """
+        assert sub
+        return self._cache.search_matches.get(
+            (sub, ignore_case), lambda: _SearchMatchIndex(self.text, sub, ignore_case))
+
+    def get_search_match_count(self, sub, ignore_case=False):
+        """
+        Return a ``(k, n)`` tuple: there are `n` occurrences of the substring
+        in the text and the cursor is at, or after the `k`-th one. (`k` is 0
+        when the cursor is before the first occurrence.) Overlapping
+        occurrences are skipped, like `find_all` does.
+        """
+        if not sub:
+            return 0, 0
+
+        starts = self.get_search_matches(sub, ignore_case=ignore_case).non_overlapping_starts
+        return bisect.bisect_right(starts, self.cursor_position), len(starts)
+
     def find_backwards(self, sub, in_current_line=False, ignore_case=False, count=1):
         """
         Find `text` before the cursor, return position relative to the cursor
@@ -384,6 +563,14 @@ class Document(object):
 
         :param count: Find the n-th occurance.
         """
+        if not in_current_line and sub:
+            matches = self.get_search_matches(sub, ignore_case=ignore_case)
+            i = matches.find_previous(self.cursor_position, count=count)
+
+            if i is not None:
+                return matches.starts[i] - self.cursor_position
+            return
+
         if in_current_line:
             before_cursor = self.current_line_before_cursor[::-1]
         else:
@@ -712,15 +899,19 @@ class Document(object):
 
         When `start_pos` or `end_pos` are given. Don't look past the positions.
         """
+        # Look up the partner in the bracket index of this text.
+        pos = self._bracket_pairs.get(self.cursor_position)
 
-        # Look for a match.
-        for A, B in '()', '[]', '{}', '<>':
-            if self.current_char == A:
-                return self.find_enclosing_bracket_right(A, B, end_pos=end_pos) or 0
-            elif self.current_char == B:
-                return self.find_enclosing_bracket_left(A, B, start_pos=start_pos) or 0
+        if pos is None:
+            return 0
+
+        if pos > self.cursor_position:
+            if end_pos is not None and pos >= end_pos:
+                return 0
+        elif start_pos is not None and pos < start_pos:
+            return 0
 
-        return 0
+        return pos - self.cursor_position
 
     def get_start_of_document_position(self):
         """ Relative position for the start of the document. """
@@ -37,7 +37,16 @@ class PosixAsyncioEventLoop(EventLoop):
         if self.closed:
             raise Exception('Event loop already closed.')
 
-        inputstream = InputStream(callbacks.feed_key)
+        # Collect the key presses of each read, and feed them at once.
+        key_presses = []
+        inputstream = InputStream(key_presses.append)
+
+        def feed_key_presses():
+            " Pass the parsed key presses to the callbacks. "
+            if key_presses:
+                keys = key_presses[:]
+                del key_presses[:]
+                callbacks.feed_keys(keys)
 
         try:
             # Create a new Future every time.
@@ -50,6 +59,7 @@ class PosixAsyncioEventLoop(EventLoop):
                 flush the input stream and fire the timeout event.
                 """
                 inputstream.flush()
+                feed_key_presses()
 
                 callbacks.input_timeout()
 
@@ -65,6 +75,7 @@ class PosixAsyncioEventLoop(EventLoop):
             def stdin_ready():
                 data = stdin_reader.read()
                 inputstream.feed(data)
+                feed_key_presses()
                 timeout.reset()
 
                 # Quit when the input stream was closed.
@@ -53,8 +53,7 @@ class Win32AsyncioEventLoop(EventLoop):
                     keys = e.args[0]
 
                 # Feed keys to input processor.
-                for k in keys:
-                    callbacks.feed_key(k)
+                callbacks.feed_keys(keys)
         finally:
             timeout.stop()
 
@@ -27,3 +27,11 @@ class EventLoopCallbacks(with_metaclass(ABCMeta, object)):
     @abstractmethod
     def feed_key(self, key):
         pass
+
+    def feed_keys(self, keys):
+        """
+        Feed all the key presses that were read from the input at once.
+        (Override this for processing them as a batch.)
+        """
+        for key in keys:
+            self.feed_key(key)
@@ -3,9 +3,12 @@ import fcntl
 import os
 import random
 import signal
+import six
 import threading
 import time
 
+from prompt_toolkit.key_binding.input_processor import KeyPress
+from prompt_toolkit.keys import Keys
 from prompt_toolkit.terminal.vt100_input import InputStream
 from prompt_toolkit.utils import DummyContext, in_main_thread
 from prompt_toolkit.input import Input
@@ -22,15 +25,25 @@ __all__ = (
 
 _now = time.time
 
+# When one read returns this many characters, we consider the input to be
+# pasted. (Nobody types that fast.)
+PASTE_THRESHOLD = 1024
+
 
 class PosixEventLoop(EventLoop):
     """
     Event loop for posix systems (Linux, Mac os X).
+
+    :param recognize_paste: When True, try to discover paste actions for
+        terminals that don't support bracketed paste, and turn the pasted
+        text into `Keys.BracketedPaste` events. (Newlines in the pasted text
+        are inserted instead of accepting the input.)
     """
-    def __init__(self, inputhook=None, selector=AutoSelector):
+    def __init__(self, inputhook=None, selector=AutoSelector, recognize_paste=False):
         assert inputhook is None or callable(inputhook)
         assert issubclass(selector, Selector)
 
+        self.recognize_paste = recognize_paste
         self.running = False
         self.closed = False
         self._running = False
@@ -61,8 +74,11 @@ class PosixEventLoop(EventLoop):
         self._running = True
         self._callbacks = callbacks
 
-        inputstream = InputStream(callbacks.feed_key)
+        # Collect the key presses of each read, and feed them at once.
+        key_presses = []
+        inputstream = InputStream(key_presses.append)
         current_timeout = [INPUT_TIMEOUT]  # Nonlocal
+        is_pasting = [False]  # Nonlocal
 
         # Create reader class.
         stdin_reader = PosixStdinReader(stdin.fileno())
@@ -76,12 +92,33 @@ class PosixEventLoop(EventLoop):
         else:
             ctx = DummyContext()
 
+        def feed_key_presses(is_paste=False):
+            " Pass the parsed key presses to the callbacks. "
+            if key_presses:
+                keys = key_presses[:]
+                del key_presses[:]
+
+                # (A single key press is never a paste. Holding down a key
+                # can't be confused with pasting.)
+                if is_paste and len(keys) > 1:
+                    keys = list(_join_pasted_text(keys))
+
+                callbacks.feed_keys(keys)
+
         def read_from_stdin():
             " Read user input. "
-            # Feed input text.
+            # Feed input text. (Once a paste was detected, all input until the
+            # next input timeout belongs to it. The last read of a large paste
+            # is usually small.)
             data = stdin_reader.read()
             inputstream.feed(data)
 
+            if self.recognize_paste and (
+                    stdin_reader.last_chunk_count > 1 or len(data) >= PASTE_THRESHOLD):
+                is_pasting[0] = True
+
+            feed_key_presses(is_paste=is_pasting[0])
+
             # Set timeout again.
             current_timeout[0] = INPUT_TIMEOUT
 
@@ -176,6 +213,8 @@ class PosixEventLoop(EventLoop):
                     # important to flush the vt100 'Escape' key early when
                     # nothing else follows.)
                     inputstream.flush()
+                    feed_key_presses()
+                    is_pasting[0] = False
 
                     # Fire input timeout event.
                     callbacks.input_timeout()
@@ -309,3 +348,25 @@ class call_on_sigwinch(object):
             signal.signal(signal.SIGWINCH, 0)
         else:
             signal.signal(signal.SIGWINCH, self.previous_callback)
+
+
+def _join_pasted_text(key_presses):
+    """
+    Turn the runs of text, tabs and newlines in this list of `KeyPress`
+    instances into `Keys.BracketedPaste` events. (Like the Windows console
+    input does when it detects a paste.)
+    """
+    text_keys = (Keys.ControlI, Keys.ControlJ, Keys.ControlM)
+    data = []
+
+    for k in key_presses:
+        if isinstance(k.key, six.text_type) or k.key in text_keys:
+            data.append(k.data)
+        else:
+            if data:
+                yield KeyPress(Keys.BracketedPaste, ''.join(data))
+                data = []
+            yield k
+
+    if data:
+        yield KeyPress(Keys.BracketedPaste, ''.join(data))
@@ -4,6 +4,8 @@ from codecs import getincrementaldecoder
 import os
 import six
 
+from .select import select_fds
+
 __all__ = (
     'PosixStdinReader',
 )
@@ -12,7 +14,9 @@ __all__ = (
 class PosixStdinReader(object):
     """
     Wrapper around stdin which reads (nonblocking) the next available 1024
-    bytes and decodes it.
+    bytes and decodes it. When more input is waiting (for instance, because
+    something was pasted), it keeps reading bigger chunks, up to
+    `max_read_size` bytes.
 
     Note that you can't be sure that the input file is closed if the ``read``
     function returns an empty string. When ``errors=ignore`` is passed,
@@ -29,16 +33,21 @@ class PosixStdinReader(object):
         unrecognised bytes to the key bindings. Some terminals, like lxterminal
         and Guake, use the 'Mxx' notation to send mouse events, where each 'x'
         can be any possible byte.
+    :param max_read_size: The maximum amount of bytes returned by one `read`.
     """
     # By default, we want to 'ignore' errors here. The input stream can be full
     # of junk.  One occurrence of this that I had was when using iTerm2 on OS X,
     # with "Option as Meta" checked (You should choose "Option as +Esc".)
 
     def __init__(self, stdin_fd,
-                 errors=('ignore' if six.PY2 else 'surrogateescape')):
+                 errors=('ignore' if six.PY2 else 'surrogateescape'),
+                 max_read_size=64 * 1024):
         assert isinstance(stdin_fd, int)
+        assert isinstance(max_read_size, int)
+
         self.stdin_fd = stdin_fd
         self.errors = errors
+        self.max_read_size = max_read_size
 
         # Create incremental decoder for decoding stdin.
         # We can not just do `os.read(stdin.fileno(), 1024).decode('utf-8')`, because
@@ -49,11 +58,16 @@ class PosixStdinReader(object):
         #: True when there is nothing anymore to read.
         self.closed = False
 
+        #: Number of chunks that the last `read` call received. (More than one
+        #: means that the input arrived faster than anybody can type.)
+        self.last_chunk_count = 0
+
     def read(self, count=1024):
             # By default we choose a rather small chunk size, because reading
             # big amounts of input at once, causes the event loop to process
             # all these key bindings also at once without going back to the
             # loop. This will make the application feel unresponsive.
+            # (Only when a read fills the buffer, we continue reading.)
         """
         Read the input and return it as a string.
 
@@ -64,19 +78,37 @@ class PosixStdinReader(object):
         if self.closed:
             return b''
 
-        # Note: the following works better than wrapping `self.stdin` like
-        #       `codecs.getreader('utf-8')(stdin)` and doing `read(1)`.
-        #       Somehow that causes some latency when the escape
-        #       character is pressed. (Especially on combination with the `select`.)
-        try:
-            data = os.read(self.stdin_fd, count)
-
-            # Nothing more to read, stream is closed.
-            if data == b'':
-                self.closed = True
-                return ''
-        except OSError:
-            # In case of SIGWINCH
-            data = b''
-
-        return self._stdin_decoder.decode(data)
+        chunks = []
+        total = 0
+        self.last_chunk_count = 0
+
+        while True:
+            # Note: the following works better than wrapping `self.stdin` like
+            #       `codecs.getreader('utf-8')(stdin)` and doing `read(1)`.
+            #       Somehow that causes some latency when the escape
+            #       character is pressed. (Especially on combination with the `select`.)
+            try:
+                data = os.read(self.stdin_fd, count)
+
+                # Nothing more to read, stream is closed.
+                if data == b'':
+                    self.closed = True
+                    break
+            except OSError:
+                # In case of SIGWINCH or EAGAIN.
+                break
+
+            chunks.append(data)
+            total += len(data)
+
+            # When the buffer was filled, there is probably more input
+            # waiting. Read it using bigger chunks, as long as it's available
+            # right away.
+            if (len(data) < count or total >= self.max_read_size or
+                    not select_fds([self.stdin_fd], timeout=0)):
+                break
+
+            count = min(count * 2, self.max_read_size - total)
+
+        self.last_chunk_count = len(chunks)
+        return self._stdin_decoder.decode(b''.join(chunks))
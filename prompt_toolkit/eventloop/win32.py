@@ -77,8 +77,7 @@ class Win32EventLoop(EventLoop):
             if handle == self._console_input_reader.handle:
                 # When stdin is ready, read input and reset timeout timer.
                 keys = self._console_input_reader.read()
-                for k in keys:
-                    callbacks.feed_key(k)
+                callbacks.feed_keys(keys)
                 current_timeout = INPUT_TIMEOUT_MS
 
             elif handle == self._event:
@@ -1,23 +1,100 @@
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
+from functools import wraps
 from six import with_metaclass
 
 from prompt_toolkit.utils import test_callable_args
 
+import threading
+
 
 __all__ = (
     'Filter',
     'Never',
     'Always',
     'Condition',
+    'CachedFilterEvaluation',
 )
 
 
-class Filter(with_metaclass(ABCMeta, object)):
+class _CacheState(threading.local):
+    #: Dictionary that maps (filter, args) to the result, while a
+    #: `CachedFilterEvaluation` is active in this thread.
+    results = None
+
+
+_cache_state = _CacheState()
+
+
+class CachedFilterEvaluation(object):
+    """
+    Context manager that memoizes the result of every filter call while it's
+    active. We use this around the key matching for one key press and around
+    one render pass, where many of the same filters are evaluated again for
+    the same state. (Nested instances share the cache of the outer one.)
+
+    Filters that have the `cacheable` attribute set to False are evaluated
+    every time.
+    """
+    def __enter__(self):
+        self._outer = _cache_state.results is None
+
+        if self._outer:
+            _cache_state.results = {}
+
+    def __exit__(self, *a):
+        if self._outer:
+            _cache_state.results = None
+
+
+def _cached_call(call):
+    """
+    Wrap the `__call__` method of a filter, so that it uses the results of the
+    active `CachedFilterEvaluation`.
+    """
+    @wraps(call)
+    def __call__(self, *a, **kw):
+        results = _cache_state.results
+
+        if results is None or kw or not self.cacheable:
+            return call(self, *a, **kw)
+
+        key = (self, a)
+        try:
+            return results[key]
+        except KeyError:
+            result = results[key] = call(self, *a, **kw)
+            return result
+    return __call__
+
+
+class _FilterMeta(ABCMeta):
+    " Metaclass for filters, which wraps all `__call__` implementations. "
+    def __new__(cls, name, bases, attrs):
+        call = attrs.get('__call__')
+
+        if call is not None and not getattr(call, '__isabstractmethod__', False):
+            attrs['__call__'] = _cached_call(call)
+
+        return ABCMeta.__new__(cls, name, bases, attrs)
+
+
+class Filter(with_metaclass(_FilterMeta, object)):
     """
     Filter to activate/deactivate a feature, depending on a condition.
     The return value of ``__call__`` will tell if the feature should be active.
     """
+    #: When False, the result of this filter is never memoized by
+    #: `CachedFilterEvaluation`. (For filters with side effects or filters that
+    #: depend on time.)
+    cacheable = True
+
+    #: Relative evaluation cost. In a combination of filters, the cheaper ones
+    #: are evaluated first. (See `_compile_filter`.) `None` means unknown:
+    #: such a filter could have side effects or guard the evaluation of the
+    #: following filters, so nothing is moved across it.
+    cost = None
+
     @abstractmethod
     def __call__(self, *a, **kw):
         """
@@ -116,6 +193,69 @@ _or_cache = _OrCache()
 _invert_cache = _InvertCache()
 
 
+def _get_cost(filter):
+    " Return the evaluation cost of a filter, or `None` when it's unknown. "
+    if isinstance(filter, (_AndList, _OrList)):
+        costs = [_get_cost(f) for f in filter.filters]
+        if None in costs:
+            return None
+        return sum(costs)
+    elif isinstance(filter, _Invert):
+        return _get_cost(filter.filter)
+    else:
+        return filter.cost
+
+
+def _compile_filter(filter):
+    """
+    Turn a tree of &, | and ~ operations into one function. The same filter
+    is only included once in every & or | operation, and cheap filters go
+    before the expensive ones. (The order of filters with the same cost is
+    kept, because one `Condition` can guard the evaluation of another.
+    Filters without a cost, like user defined `Filter` classes, stay in
+    their position, and no filter is moved across them.)
+    """
+    namespace = {}
+    names = {}  # Maps filters to their name in the namespace.
+
+    def get_children(filters):
+        unique = []
+        for f in filters:
+            if f not in unique:
+                unique.append(f)
+
+        # Sort the runs of filters between the ones without a cost.
+        # (`sorted` is stable.)
+        result = []
+        run = []
+
+        for f in unique:
+            if _get_cost(f) is None:
+                result.extend(sorted(run, key=_get_cost))
+                result.append(f)
+                run = []
+            else:
+                run.append(f)
+
+        result.extend(sorted(run, key=_get_cost))
+        return result
+
+    def get_expression(f):
+        if isinstance(f, _AndList):
+            return '(%s)' % ' and '.join(get_expression(c) for c in get_children(f.filters))
+        elif isinstance(f, _OrList):
+            return '(%s)' % ' or '.join(get_expression(c) for c in get_children(f.filters))
+        elif isinstance(f, _Invert):
+            return '(not %s)' % get_expression(f.filter)
+        else:
+            if f not in names:
+                names[f] = 'f%i' % len(names)
+                namespace[names[f]] = f
+            return '%s(*a, **kw)' % names[f]
+
+    return eval('lambda *a, **kw: bool(%s)' % get_expression(filter), namespace)
+
+
 class _AndList(Filter):
     """
     Result of &-operation between several filters.
@@ -130,12 +270,15 @@ class _AndList(Filter):
                 all_filters.append(f)
 
         self.filters = all_filters
+        self._compiled = None
 
     def test_args(self, *args):
         return all(f.test_args(*args) for f in self.filters)
 
     def __call__(self, *a, **kw):
-        return all(f(*a, **kw) for f in self.filters)
+        if self._compiled is None:
+            self._compiled = _compile_filter(self)
+        return self._compiled(*a, **kw)
 
     def __repr__(self):
         return '&'.join(repr(f) for f in self.filters)
@@ -155,12 +298,15 @@ class _OrList(Filter):
                 all_filters.append(f)
 
         self.filters = all_filters
+        self._compiled = None
 
     def test_args(self, *args):
         return all(f.test_args(*args) for f in self.filters)
 
     def __call__(self, *a, **kw):
-        return any(f(*a, **kw) for f in self.filters)
+        if self._compiled is None:
+            self._compiled = _compile_filter(self)
+        return self._compiled(*a, **kw)
 
     def __repr__(self):
         return '|'.join(repr(f) for f in self.filters)
@@ -172,9 +318,12 @@ class _Invert(Filter):
     """
     def __init__(self, filter):
         self.filter = filter
+        self._compiled = None
 
     def __call__(self, *a, **kw):
-        return not self.filter(*a, **kw)
+        if self._compiled is None:
+            self._compiled = _compile_filter(self)
+        return self._compiled(*a, **kw)
 
     def __repr__(self):
         return '~%r' % self.filter
@@ -187,6 +336,9 @@ class Always(Filter):
     """
     Always enable feature.
     """
+    cacheable = False  # Nothing to gain.
+    cost = 0
+
     def __call__(self, *a, **kw):
         return True
 
@@ -198,6 +350,9 @@ class Never(Filter):
     """
     Never enable feature.
     """
+    cacheable = False  # Nothing to gain.
+    cost = 0
+
     def __call__(self, *a, **kw):
         return False
 
@@ -219,10 +374,17 @@ class Condition(Filter):
         :class:`~prompt_toolkit.interface.CommandLineInterface` or nothing and
         returns a boolean. (Depending on what it takes, this will become a
         :class:`.Filter` or :class:`~prompt_toolkit.filters.CLIFilter`.)
+    :param cacheable: Set to False if `func` has side effects or depends on
+        time. (See :class:`.CachedFilterEvaluation`.)
     """
-    def __init__(self, func):
+    cost = 10  # Unknown function, probably more expensive than the others.
+
+    def __init__(self, func, cacheable=True):
         assert callable(func)
+        assert isinstance(cacheable, bool)
+
         self.func = func
+        self.cacheable = cacheable
 
     def __call__(self, *a, **kw):
         return self.func(*a, **kw)
@@ -40,8 +40,17 @@ __all__ = (
 )
 
 
+class _CLIFilter(Filter):
+    """
+    Base class for the filters in this module. They only look at the state of
+    the `CommandLineInterface`: they are cheap and have no side effects, so
+    they can be evaluated before the other filters in a combination.
+    """
+    cost = 1
+
+
 @memoized()
-class HasFocus(Filter):
+class HasFocus(_CLIFilter):
     """
     Enable when this buffer has the focus.
     """
@@ -61,7 +70,7 @@ class HasFocus(Filter):
 
 
 @memoized()
-class InFocusStack(Filter):
+class InFocusStack(_CLIFilter):
     """
     Enable when this buffer appears on the focus stack.
     """
@@ -81,7 +90,7 @@ class InFocusStack(Filter):
 
 
 @memoized()
-class HasSelection(Filter):
+class HasSelection(_CLIFilter):
     """
     Enable when the current buffer has a selection.
     """
@@ -93,7 +102,7 @@ class HasSelection(Filter):
 
 
 @memoized()
-class HasCompletions(Filter):
+class HasCompletions(_CLIFilter):
     """
     Enable when the current buffer has completions.
     """
@@ -105,7 +114,7 @@ class HasCompletions(Filter):
 
 
 @memoized()
-class IsMultiline(Filter):
+class IsMultiline(_CLIFilter):
     """
     Enable in multiline mode.
     """
@@ -117,7 +126,7 @@ class IsMultiline(Filter):
 
 
 @memoized()
-class IsReadOnly(Filter):
+class IsReadOnly(_CLIFilter):
     """
     True when the current buffer is read only.
     """
@@ -129,7 +138,7 @@ class IsReadOnly(Filter):
 
 
 @memoized()
-class HasValidationError(Filter):
+class HasValidationError(_CLIFilter):
     """
     Current buffer has validation error.
     """
@@ -141,7 +150,7 @@ class HasValidationError(Filter):
 
 
 @memoized()
-class HasArg(Filter):
+class HasArg(_CLIFilter):
     """
     Enable when the input processor has an 'arg'.
     """
@@ -153,7 +162,7 @@ class HasArg(Filter):
 
 
 @memoized()
-class HasSearch(Filter):
+class HasSearch(_CLIFilter):
     """
     Incremental search is active.
     """
@@ -165,7 +174,7 @@ class HasSearch(Filter):
 
 
 @memoized()
-class IsReturning(Filter):
+class IsReturning(_CLIFilter):
     """
     When a return value has been set.
     """
@@ -177,7 +186,7 @@ class IsReturning(Filter):
 
 
 @memoized()
-class IsAborting(Filter):
+class IsAborting(_CLIFilter):
     """
     True when aborting. (E.g. Control-C pressed.)
     """
@@ -189,7 +198,7 @@ class IsAborting(Filter):
 
 
 @memoized()
-class IsExiting(Filter):
+class IsExiting(_CLIFilter):
     """
     True when exiting. (E.g. Control-D pressed.)
     """
@@ -201,7 +210,7 @@ class IsExiting(Filter):
 
 
 @memoized()
-class IsDone(Filter):
+class IsDone(_CLIFilter):
     """
     True when the CLI is returning, aborting or exiting.
     """
@@ -213,7 +222,7 @@ class IsDone(Filter):
 
 
 @memoized()
-class RendererHeightIsKnown(Filter):
+class RendererHeightIsKnown(_CLIFilter):
     """
     Only True when the renderer knows it's real height.
 
@@ -231,7 +240,7 @@ class RendererHeightIsKnown(Filter):
 
 
 @memoized()
-class InEditingMode(Filter):
+class InEditingMode(_CLIFilter):
     """
     Check whether a given editing mode is active. (Vi or Emacs.)
     """
@@ -251,7 +260,7 @@ class InEditingMode(Filter):
 
 
 @memoized()
-class ViMode(Filter):
+class ViMode(_CLIFilter):
     def __call__(self, cli):
         return cli.editing_mode == EditingMode.VI
 
@@ -260,7 +269,7 @@ class ViMode(Filter):
 
 
 @memoized()
-class ViNavigationMode(Filter):
+class ViNavigationMode(_CLIFilter):
     """
     Active when the set for Vi navigation key bindings are active.
     """
@@ -279,7 +288,7 @@ class ViNavigationMode(Filter):
 
 
 @memoized()
-class ViInsertMode(Filter):
+class ViInsertMode(_CLIFilter):
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.VI
                 or cli.vi_state.operator_func
@@ -295,7 +304,7 @@ class ViInsertMode(Filter):
 
 
 @memoized()
-class ViInsertMultipleMode(Filter):
+class ViInsertMultipleMode(_CLIFilter):
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.VI
                 or cli.vi_state.operator_func
@@ -311,7 +320,7 @@ class ViInsertMultipleMode(Filter):
 
 
 @memoized()
-class ViReplaceMode(Filter):
+class ViReplaceMode(_CLIFilter):
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.VI
                 or cli.vi_state.operator_func
@@ -327,7 +336,7 @@ class ViReplaceMode(Filter):
 
 
 @memoized()
-class ViSelectionMode(Filter):
+class ViSelectionMode(_CLIFilter):
     def __call__(self, cli):
         if cli.editing_mode != EditingMode.VI:
             return False
@@ -339,7 +348,7 @@ class ViSelectionMode(Filter):
 
 
 @memoized()
-class ViWaitingForTextObjectMode(Filter):
+class ViWaitingForTextObjectMode(_CLIFilter):
     def __call__(self, cli):
         if cli.editing_mode != EditingMode.VI:
             return False
@@ -351,7 +360,7 @@ class ViWaitingForTextObjectMode(Filter):
 
 
 @memoized()
-class ViDigraphMode(Filter):
+class ViDigraphMode(_CLIFilter):
     def __call__(self, cli):
         if cli.editing_mode != EditingMode.VI:
             return False
@@ -363,7 +372,7 @@ class ViDigraphMode(Filter):
 
 
 @memoized()
-class EmacsMode(Filter):
+class EmacsMode(_CLIFilter):
     " When the Emacs bindings are active. "
     def __call__(self, cli):
         return cli.editing_mode == EditingMode.EMACS
@@ -373,7 +382,7 @@ class EmacsMode(Filter):
 
 
 @memoized()
-class EmacsInsertMode(Filter):
+class EmacsInsertMode(_CLIFilter):
     def __call__(self, cli):
         if (cli.editing_mode != EditingMode.EMACS
                 or cli.current_buffer.selection_state
@@ -386,7 +395,7 @@ class EmacsInsertMode(Filter):
 
 
 @memoized()
-class EmacsSelectionMode(Filter):
+class EmacsSelectionMode(_CLIFilter):
     def __call__(self, cli):
         return (cli.editing_mode == EditingMode.EMACS
                 and cli.current_buffer.selection_state)
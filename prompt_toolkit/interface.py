@@ -23,7 +23,7 @@ from .completion import CompleteEvent, get_common_complete_suffix
 from .enums import SEARCH_BUFFER
 from .eventloop.base import EventLoop
 from .eventloop.callbacks import EventLoopCallbacks
-from .filters import Condition
+from .filters import Condition, CachedFilterEvaluation
 from .input import StdinInput, Input
 from .key_binding.input_processor import InputProcessor
 from .key_binding.input_processor import KeyPress
@@ -114,16 +114,18 @@ class CommandLineInterface(object):
         self._invalidated = False
 
         #: The `InputProcessor` instance.
-        self.input_processor = InputProcessor(application.key_bindings_registry, weakref.ref(self))
+        self.input_processor = InputProcessor(
+            application.key_bindings_registry, weakref.ref(self),
+            batch_self_insert=application.batch_self_insert)
 
         self._async_completers = {}  # Map buffer name to completer function.
 
         # Pointer to sub CLI. (In chain of CLI instances.)
         self._sub_cli = None  # None or other CommandLineInterface instance.
 
-        # Call `add_buffer` for each buffer.
-        for name, b in self.buffers.items():
-            self.add_buffer(name, b)
+        # While a batch of key presses is processed, this is a list of the
+        # functions to call once at the end. (See `_call_after_key_batch`.)
+        self._key_batch_calls = None
 
         # Events.
         self.on_buffer_changed = Event(self, application.on_buffer_changed)
@@ -135,6 +137,11 @@ class CommandLineInterface(object):
         self.on_start = Event(self, application.on_start)
         self.on_stop = Event(self, application.on_stop)
 
+        # Call `add_buffer` for each buffer. (After creating the events, the
+        # asynchronous validator uses `on_input_timeout`.)
+        for name, b in self.buffers.items():
+            self.add_buffer(name, b)
+
         # Trigger initialize callback.
         self.reset()
         self.on_initialize += self.application.on_initialize
@@ -165,6 +172,7 @@ class CommandLineInterface(object):
         # Create asynchronous completer / auto suggestion.
         auto_suggest_function = self._create_auto_suggest_function(buffer)
         completer_function = self._create_async_completer(buffer)
+        validator_function = self._create_async_validator(buffer)
         self._async_completers[name] = completer_function
 
         # Complete/suggest on text insert.
@@ -174,7 +182,7 @@ class CommandLineInterface(object):
             ensures that it's only called while typing if the
             `complete_while_typing` filter is enabled.
             """
-            def on_text_insert(_):
+            def complete_and_suggest():
                 # Only complete when "complete_while_typing" is enabled.
                 if buffer.completer and buffer.complete_while_typing():
                     completer_function()
@@ -183,10 +191,17 @@ class CommandLineInterface(object):
                 if buffer.auto_suggest:
                     auto_suggest_function()
 
+            def on_text_insert(_):
+                self._call_after_key_batch(complete_and_suggest)
+
             return on_text_insert
 
         buffer.on_text_insert += create_on_insert_handler()
 
+        def validate_while_typing():
+            if buffer.validator and buffer.validate_while_typing():
+                validator_function()
+
         def buffer_changed(_):
             """
             When the text in a buffer changes.
@@ -197,8 +212,23 @@ class CommandLineInterface(object):
             # Trigger on_buffer_changed.
             self.on_buffer_changed.fire()
 
+            # Validate while typing.
+            self._call_after_key_batch(validate_while_typing)
+
         buffer.on_text_changed += buffer_changed
 
+    def _call_after_key_batch(self, func):
+        """
+        Call `func` now, or when a batch of key presses is being processed,
+        once at the end of the batch. (Used for the completion, auto
+        suggestion and validation while typing, which should only run for the
+        final text.)
+        """
+        if self._key_batch_calls is None:
+            func()
+        elif func not in self._key_batch_calls:
+            self._key_batch_calls.append(func)
+
     def start_completion(self, buffer_name=None, select_first=False,
                          select_last=False, insert_common_part=False,
                          complete_event=None):
@@ -355,7 +385,11 @@ class CommandLineInterface(object):
         # Only draw when no sub application was started.
         if self._is_running and self._sub_cli is None:
             self.render_counter += 1
-            self.renderer.render(self, self.layout, is_done=self.is_done)
+
+            # (The state doesn't change while rendering, so evaluate every
+            # filter in the layout only once.)
+            with CachedFilterEvaluation():
+                self.renderer.render(self, self.layout, is_done=self.is_done)
 
             # Fire render event.
             self.on_render.fire()
@@ -967,6 +1001,63 @@ class CommandLineInterface(object):
             self.eventloop.run_in_executor(run)
         return async_suggestor
 
+    def _create_async_validator(self, buffer):
+        """
+        Create function for asynchronous validation.
+        (Validate in other thread, after the user stopped typing: at the next
+        input timeout of the event loop.)
+        """
+        validate_thread_running = [False]  # By ref.
+        validation_pending = [False]  # The text changed since the last validation.
+        input_timeout_missed = [False]  # Input timeout while the thread was running.
+
+        def start_thread():
+            validate_thread_running[0] = True
+            validation_pending[0] = False
+            input_timeout_missed[0] = False
+
+            document = buffer.document
+
+            def run():
+                result = []  # By ref.
+                try:
+                    result.append(buffer._run_validator(document))
+                finally:
+                    # Also when the validator raised an unexpected exception.
+                    validate_thread_running[0] = False
+
+                    def callback():
+                        # Store the result. (It's shown when the text didn't
+                        # change in the meantime.)
+                        if result and not validation_pending[0]:
+                            buffer.set_validation_result(document, result[0])
+                            self.invalidate()
+
+                        # When the user stopped typing while we were busy,
+                        # validate the new text right away.
+                        if input_timeout_missed[0]:
+                            input_timeout(self)
+
+                    if self.eventloop:
+                        self.eventloop.call_from_executor(callback)
+
+            self.eventloop.run_in_executor(run)
+
+        def input_timeout(_):
+            if validation_pending[0]:
+                if validate_thread_running[0]:
+                    input_timeout_missed[0] = True
+                elif buffer.validator and buffer.validate_while_typing():
+                    start_thread()
+
+        self.on_input_timeout += input_timeout
+
+        def async_validator():
+            # The text changed. Validate when the user stops typing.
+            validation_pending[0] = True
+
+        return async_validator
+
     def stdout_proxy(self, raw=False):
         """
         Create an :class:`_StdoutProxy` class which can be used as a patch for
@@ -1042,6 +1133,41 @@ class _InterfaceEventLoopCallbacks(EventLoopCallbacks):
             cli.input_processor.feed(key_press)
             cli.input_processor.process_keys()
 
+    def feed_keys(self, key_presses):
+        """
+        Feed all the key presses that were read at once to the
+        CommandLineInterface. The completion, auto suggestion and validation
+        while typing start only once, after all of them have been processed.
+        """
+        clis = []  # The CLIs that received a part of the key presses.
+
+        try:
+            while key_presses:
+                cli = self._active_cli
+
+                # Ignore all key presses once the CLI is done.
+                if cli.is_done:
+                    break
+
+                if cli._key_batch_calls is None:
+                    cli._key_batch_calls = []
+                    clis.append(cli)
+
+                cli.input_processor.feed_multiple(key_presses)
+                cli.input_processor.process_keys()
+
+                # When a key binding started a sub application, the keys that
+                # were not processed yet are meant for that application.
+                key_presses = list(cli.input_processor.input_queue)
+                cli.input_processor.input_queue.clear()
+        finally:
+            for cli in clis:
+                calls = cli._key_batch_calls
+                cli._key_batch_calls = None
+
+                for func in calls:
+                    func()
+
 
 class _PatchStdoutContext(object):
     def __init__(self, new_stdout, patch_stdout=True, patch_stderr=True):
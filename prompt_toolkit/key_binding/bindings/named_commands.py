@@ -543,7 +543,9 @@ def prefix_meta(event):
 
         registry.add_key_binding('j', 'j', filter=ViInsertMode())(prefix_meta)
     """
-    event.cli.input_processor.feed(KeyPress(Keys.Escape))
+    # ('first' means: make sure that this key press will be handled before
+    # the key presses that are still in the queue.)
+    event.cli.input_processor.feed(KeyPress(Keys.Escape), first=True)
 
 
 @register('operate-and-get-next')
@@ -5,7 +5,6 @@ from prompt_toolkit.document import Document
 from prompt_toolkit.enums import IncrementalSearchDirection, SEARCH_BUFFER, SYSTEM_BUFFER
 from prompt_toolkit.filters import Filter, Condition, HasArg, Always, IsReadOnly
 from prompt_toolkit.filters.cli import ViNavigationMode, ViInsertMode, ViInsertMultipleMode, ViReplaceMode, ViSelectionMode, ViWaitingForTextObjectMode, ViDigraphMode, ViMode
-from prompt_toolkit.key_binding.digraphs import DIGRAPHS
 from prompt_toolkit.key_binding.vi_state import CharacterFind, InputMode
 from prompt_toolkit.keys import Keys
 from prompt_toolkit.layout.utils import find_window_for_buffer_name
@@ -1686,6 +1685,9 @@ def load_vi_bindings(get_search_state=None):
     @handle(Keys.Any, filter=digraph_mode & digraph_symbol_1_given)
     def _(event):
         " Insert digraph. "
+        # (The digraph table is big, only import it when it's needed.)
+        from prompt_toolkit.key_binding.digraphs import DIGRAPHS
+
         try:
             # Lookup.
             code = (event.cli.vi_state.digraph_symbol1, event.data)
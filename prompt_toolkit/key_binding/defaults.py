@@ -5,11 +5,9 @@ Default key bindings.::
     app = Application(key_bindings_registry=registry)
 """
 from __future__ import unicode_literals
-from prompt_toolkit.key_binding.registry import ConditionalRegistry, MergedRegistry
+from prompt_toolkit.key_binding.registry import ConditionalRegistry, MergedRegistry, LazyRegistry
 from prompt_toolkit.key_binding.bindings.basic import load_basic_bindings, load_abort_and_exit_bindings, load_basic_system_bindings, load_auto_suggestion_bindings, load_mouse_bindings
-from prompt_toolkit.key_binding.bindings.emacs import load_emacs_bindings, load_emacs_system_bindings, load_emacs_search_bindings, load_emacs_open_in_editor_bindings, load_extra_emacs_page_navigation_bindings
-from prompt_toolkit.key_binding.bindings.vi import load_vi_bindings, load_vi_system_bindings, load_vi_search_bindings, load_vi_open_in_editor_bindings, load_extra_vi_page_navigation_bindings
-from prompt_toolkit.filters import to_cli_filter
+from prompt_toolkit.filters import to_cli_filter, EmacsMode, ViMode
 
 __all__ = (
     'load_key_bindings',
@@ -50,46 +48,61 @@ def load_key_bindings(
     enable_extra_page_navigation = to_cli_filter(enable_extra_page_navigation)
     enable_auto_suggest_bindings = to_cli_filter(enable_auto_suggest_bindings)
 
-    registry = MergedRegistry([
-        # Load basic bindings.
-        load_basic_bindings(),
-        load_mouse_bindings(),
+    def load_emacs():
+        from prompt_toolkit.key_binding.bindings.emacs import load_emacs_bindings, load_emacs_system_bindings, load_emacs_search_bindings, load_emacs_open_in_editor_bindings, load_extra_emacs_page_navigation_bindings
 
-        ConditionalRegistry(load_abort_and_exit_bindings(),
-                            enable_abort_and_exit_bindings),
+        return MergedRegistry([
+            load_emacs_bindings(),
 
-        ConditionalRegistry(load_basic_system_bindings(),
-                            enable_system_bindings),
+            ConditionalRegistry(load_emacs_open_in_editor_bindings(),
+                                enable_open_in_editor),
 
-        # Load emacs bindings.
-        load_emacs_bindings(),
+            ConditionalRegistry(load_emacs_search_bindings(get_search_state=get_search_state),
+                                enable_search),
 
-        ConditionalRegistry(load_emacs_open_in_editor_bindings(),
-                            enable_open_in_editor),
+            ConditionalRegistry(load_emacs_system_bindings(),
+                                enable_system_bindings),
 
-        ConditionalRegistry(load_emacs_search_bindings(get_search_state=get_search_state),
-                            enable_search),
+            ConditionalRegistry(load_extra_emacs_page_navigation_bindings(),
+                                enable_extra_page_navigation),
+        ])
 
-        ConditionalRegistry(load_emacs_system_bindings(),
-                            enable_system_bindings),
+    def load_vi():
+        from prompt_toolkit.key_binding.bindings.vi import load_vi_bindings, load_vi_system_bindings, load_vi_search_bindings, load_vi_open_in_editor_bindings, load_extra_vi_page_navigation_bindings
+
+        return MergedRegistry([
+            load_vi_bindings(get_search_state=get_search_state),
 
-        ConditionalRegistry(load_extra_emacs_page_navigation_bindings(),
-                            enable_extra_page_navigation),
+            ConditionalRegistry(load_vi_open_in_editor_bindings(),
+                                enable_open_in_editor),
 
-        # Load Vi bindings.
-        load_vi_bindings(get_search_state=get_search_state),
+            ConditionalRegistry(load_vi_search_bindings(get_search_state=get_search_state),
+                                enable_search),
 
-        ConditionalRegistry(load_vi_open_in_editor_bindings(),
-                            enable_open_in_editor),
+            ConditionalRegistry(load_vi_system_bindings(),
+                                enable_system_bindings),
 
-        ConditionalRegistry(load_vi_search_bindings(get_search_state=get_search_state),
-                            enable_search),
+            ConditionalRegistry(load_extra_vi_page_navigation_bindings(),
+                                enable_extra_page_navigation),
+        ])
 
-        ConditionalRegistry(load_vi_system_bindings(),
+    registry = MergedRegistry([
+        # Load basic bindings.
+        load_basic_bindings(),
+        load_mouse_bindings(),
+
+        ConditionalRegistry(load_abort_and_exit_bindings(),
+                            enable_abort_and_exit_bindings),
+
+        ConditionalRegistry(load_basic_system_bindings(),
                             enable_system_bindings),
 
-        ConditionalRegistry(load_extra_vi_page_navigation_bindings(),
-                            enable_extra_page_navigation),
+        # Load emacs bindings. (Only the first time that Emacs mode is
+        # active.)
+        LazyRegistry(load_emacs, EmacsMode()),
+
+        # Load Vi bindings. (Idem, most users never switch to Vi mode.)
+        LazyRegistry(load_vi, ViMode()),
 
         # Suggestion bindings.
         # (This has to come at the end, because the Vi bindings also have an
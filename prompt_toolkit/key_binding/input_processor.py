@@ -8,6 +8,7 @@ correct callbacks when new key presses are feed through `feed`.
 """
 from __future__ import unicode_literals
 from prompt_toolkit.buffer import EditReadOnlyBuffer
+from prompt_toolkit.filters.base import CachedFilterEvaluation
 from prompt_toolkit.filters.cli import ViNavigationMode
 from prompt_toolkit.keys import Keys, Key
 from prompt_toolkit.utils import Event
@@ -69,12 +70,25 @@ class InputProcessor(object):
 
     :param registry: `BaseRegistry` instance.
     :param cli_ref: weakref to `CommandLineInterface`.
+    :param batch_self_insert: When True, a run of characters in the input
+        queue that would all be handled by the default 'self-insert' binding
+        is delivered as one multi-character key press. (This makes pasting
+        much faster for terminals without bracketed paste support.) Note that
+        `event.data` is the whole run in that case, that `beforeKeyPress` and
+        `afterKeyPress` fire once for the run, that macros record the run as
+        one key press, and that the filters are evaluated for every character
+        in the state before the run is inserted.
     """
-    def __init__(self, registry, cli_ref):
+    def __init__(self, registry, cli_ref, batch_self_insert=False):
         assert isinstance(registry, BaseRegistry)
+        assert isinstance(batch_self_insert, bool)
 
         self._registry = registry
         self._cli_ref = cli_ref
+        self.batch_self_insert = batch_self_insert
+
+        # (registry version, set of keys) for `_get_prefix_keys`.
+        self._prefix_keys = (None, None)
 
         self.beforeKeyPress = Event(self)
         self.afterKeyPress = Event(self)
@@ -113,8 +127,7 @@ class InputProcessor(object):
         self.record_macro = False
 
     def call_macro(self):
-        for k in self.macro:
-            self.feed(k)
+        self.feed_multiple(self.macro, first=True)
 
     def _get_matches(self, key_presses):
         """
@@ -127,11 +140,33 @@ class InputProcessor(object):
         # Try match, with mode flag
         return [b for b in self._registry.get_bindings_for_keys(keys) if b.filter(cli)]
 
+    def _get_prefix_keys(self):
+        """
+        Return the set of keys that are the first key of a key binding that
+        consists of multiple keys. (Only computed again when the registry
+        changes.)
+        """
+        version = self._registry._version
+
+        if self._prefix_keys[0] != version:
+            keys = set(b.keys[0] for b in self._registry.key_bindings if len(b.keys) > 1)
+            self._prefix_keys = (version, keys)
+
+        return self._prefix_keys[1]
+
     def _is_prefix_of_longer_match(self, key_presses):
         """
         For a list of :class:`KeyPress` instances. Return True if there is any
         handler that is bound to a suffix of this keys.
         """
+        # Most keys can't start a longer key sequence. For those, we don't
+        # have to look at the bindings and their filters.
+        if len(key_presses) == 1:
+            prefix_keys = self._get_prefix_keys()
+
+            if key_presses[0].key not in prefix_keys and Keys.Any not in prefix_keys:
+                return False
+
         keys = tuple(k.key for k in key_presses)
         cli = self._cli_ref()
 
@@ -159,13 +194,15 @@ class InputProcessor(object):
                 buffer.append((yield))
 
             # If we have some key presses, check for matches.
+            # (Many bindings share the same filters, evaluate them only once.)
             if buffer:
-                is_prefix_of_longer_match = self._is_prefix_of_longer_match(buffer)
-                matches = self._get_matches(buffer)
+                with CachedFilterEvaluation():
+                    is_prefix_of_longer_match = self._is_prefix_of_longer_match(buffer)
+                    matches = self._get_matches(buffer)
 
-                # When eager matches were found, give priority to them and also
-                # ignore all the longer matches.
-                eager_matches = [m for m in matches if m.eager(self._cli_ref())]
+                    # When eager matches were found, give priority to them and
+                    # also ignore all the longer matches.
+                    eager_matches = [m for m in matches if m.eager(self._cli_ref())]
 
                 if eager_matches:
                     matches = eager_matches
@@ -193,13 +230,33 @@ class InputProcessor(object):
                     if not found:
                         del buffer[:1]
 
-    def feed(self, key_press):
+    def feed(self, key_press, first=False):
         """
         Add a new :class:`KeyPress` to the input queue.
         (Don't forget to call `process_keys` in order to process the queue.)
+
+        :param first: If true, insert before everything else.
         """
         assert isinstance(key_press, KeyPress)
-        self.input_queue.append(key_press)
+
+        if first:
+            self.input_queue.appendleft(key_press)
+        else:
+            self.input_queue.append(key_press)
+
+    def feed_multiple(self, key_presses, first=False):
+        """
+        Add multiple :class:`KeyPress` instances to the input queue.
+        (Runs of text among them can be handled at once by `process_keys`.)
+
+        :param first: If true, insert before everything else.
+        """
+        assert all(isinstance(k, KeyPress) for k in key_presses)
+
+        if first:
+            self.input_queue.extendleft(reversed(key_presses))
+        else:
+            self.input_queue.extend(key_presses)
 
     def process_keys(self):
         """
@@ -208,11 +265,24 @@ class InputProcessor(object):
 
         Note: because of the `feed`/`process_keys` separation, it is
               possible to call `feed` from inside a key binding.
-              This function keeps looping until the queue is empty.
+              This function keeps looping until the queue is empty, or until
+              a key binding made the `CommandLineInterface` done (then the
+              remaining keys are ignored) or started a sub application (then
+              the remaining keys stay in the queue, so that they can be
+              passed on to the sub application).
         """
         while self.input_queue:
             key_press = self.input_queue.popleft()
 
+            # Create the key bindings that became active since the previous
+            # key press. (E.g. the Vi bindings, after switching to Vi mode.)
+            cli = self._cli_ref()
+            if cli:
+                self._registry.load_lazy_bindings(cli)
+
+            if self.batch_self_insert and self._process_text_run(key_press):
+                continue
+
             if key_press.key != Keys.CPRResponse:
                 self.beforeKeyPress.fire()
 
@@ -221,11 +291,91 @@ class InputProcessor(object):
             if key_press.key != Keys.CPRResponse:
                 self.afterKeyPress.fire()
 
+            if cli and cli.is_done:
+                self.input_queue.clear()
+            elif cli and cli._sub_cli:
+                break
+
         # Invalidate user interface.
         cli = self._cli_ref()
         if cli:
             cli.invalidate()
 
+    def _get_self_insert_binding(self, key_press):
+        """
+        Return the binding for this :class:`KeyPress` if it would immediately
+        be handled by the default 'self-insert' command, otherwise `None`.
+        """
+        from .bindings.named_commands import get_by_name
+
+        key = key_press.key
+        if (self.key_buffer or self.arg is not None or
+                isinstance(key, Key) or len(key) != 1):
+            return
+
+        # Don't evaluate any filters when 'self-insert' is not a candidate.
+        # (Then the key is matched only once, by `_process`.)
+        self_insert = get_by_name('self-insert')
+        if not any(b.handler is self_insert for b in
+                   self._registry.get_bindings_for_keys((key, ))):
+            return
+
+        key_presses = [key_press]
+
+        with CachedFilterEvaluation():
+            matches = self._get_matches(key_presses)
+            eager_matches = [m for m in matches if m.eager(self._cli_ref())]
+
+            if eager_matches:
+                binding = eager_matches[-1]
+            elif matches and not self._is_prefix_of_longer_match(key_presses):
+                binding = matches[-1]
+            else:
+                return
+
+        if binding.handler is self_insert:
+            return binding
+
+    def _process_text_run(self, key_press):
+        """
+        When this :class:`KeyPress` would be handled by 'self-insert', handle
+        it, and take the following characters from the input queue that would
+        be handled by 'self-insert' as well. Those are handled as one key
+        press. Return True when this was done.
+        """
+        binding = self._get_self_insert_binding(key_press)
+        if binding is None:
+            return False
+
+        # Insert the first character on its own: this changes the state of
+        # the buffer, so the filters are evaluated again for the following
+        # characters.
+        self._call_text_run_handler(binding, [key_press.data])
+
+        input_queue = self.input_queue
+
+        while input_queue:
+            binding = self._get_self_insert_binding(input_queue[0])
+            if binding is None:
+                break
+
+            data = [input_queue.popleft().data]
+
+            with CachedFilterEvaluation():
+                while input_queue and self._get_self_insert_binding(input_queue[0]) is binding:
+                    data.append(input_queue.popleft().data)
+
+            self._call_text_run_handler(binding, data)
+
+        return True
+
+    def _call_text_run_handler(self, binding, data):
+        data = ''.join(data)
+
+        self.beforeKeyPress.fire()
+        self._call_handler(binding, key_sequence=[KeyPress(data, data)])
+        self.afterKeyPress.fire()
+
     def _call_handler(self, handler, key_sequence=None):
         was_recording = self.record_macro
         arg = self.arg
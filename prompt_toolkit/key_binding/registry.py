@@ -21,12 +21,12 @@ others contain the Vi bindings. They are merged together using a
 `MergedRegistry`.
 
 We also have a `ConditionalRegistry` object that can enable/disable a group of
-key bindings at once.
+key bindings at once, and a `LazyRegistry` that only creates a group of key
+bindings the first time they can become active.
 """
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 
-from prompt_toolkit.cache import SimpleCache
 from prompt_toolkit.filters import CLIFilter, to_cli_filter, Never
 from prompt_toolkit.keys import Key, Keys
 
@@ -37,6 +37,7 @@ __all__ = (
     'Registry',
     'ConditionalRegistry',
     'MergedRegistry',
+    'LazyRegistry',
 )
 
 
@@ -65,6 +66,31 @@ class _Binding(object):
             self.__class__.__name__, self.keys, self.handler)
 
 
+class _TrieNode(object):
+    """
+    Node in the trie of key sequences of a `Registry`.
+    """
+    __slots__ = ('children', 'bindings', '_longer_bindings')
+
+    def __init__(self):
+        self.children = {}  # Maps a key to the next `_TrieNode`.
+        self.bindings = []  # (index, binding) tuples ending at this node.
+
+        # (Cached) list of (index, binding) tuples for all the longer key
+        # sequences below this node.
+        self._longer_bindings = None
+
+    @property
+    def longer_bindings(self):
+        if self._longer_bindings is None:
+            result = []
+            for child in self.children.values():
+                result.extend(child.bindings)
+                result.extend(child.longer_bindings)
+            self._longer_bindings = result
+        return self._longer_bindings
+
+
 class BaseRegistry(with_metaclass(ABCMeta, object)):
     """
     Interface for a Registry.
@@ -79,6 +105,13 @@ class BaseRegistry(with_metaclass(ABCMeta, object)):
     def get_bindings_starting_with_keys(self, keys):
         pass
 
+    def load_lazy_bindings(self, cli):
+        """
+        Create the key bindings of the `LazyRegistry` objects in here which
+        became active for this CLI. (Called for every key press by the
+        `InputProcessor`.)
+        """
+
     # `add_binding` and `remove_binding` don't have to be part of this
     # interface.
 
@@ -89,14 +122,82 @@ class Registry(BaseRegistry):
     """
     def __init__(self):
         self.key_bindings = []
-        self._get_bindings_for_keys_cache = SimpleCache(maxsize=10000)
-        self._get_bindings_starting_with_keys_cache = SimpleCache(maxsize=1000)
         self._version = 0  # For cache invalidation.
 
-    def _clear_cache(self):
-        self._version += 1
-        self._get_bindings_for_keys_cache.clear()
-        self._get_bindings_starting_with_keys_cache.clear()
+        # Trie of all the key sequences, with `Keys.Any` edges for the
+        # wildcards. (Created on the first lookup, and kept up to date by
+        # `add_binding` and `remove_binding`.)
+        self._trie = None
+        self._binding_index = 0  # Registration order of the bindings.
+
+    def _get_trie(self):
+        if self._trie is None:
+            self._trie = _TrieNode()
+            self._binding_index = 0
+
+            for b in self.key_bindings:
+                self._add_to_trie(b)
+
+        return self._trie
+
+    def _add_to_trie(self, binding):
+        node = self._trie
+        node._longer_bindings = None
+
+        for key in binding.keys:
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _TrieNode()
+
+            node = child
+            node._longer_bindings = None
+
+        node.bindings.append((self._binding_index, binding))
+        self._binding_index += 1
+
+    def _remove_from_trie(self, binding):
+        path = [self._trie]
+        for key in binding.keys:
+            path.append(path[-1].children[key])
+
+        for node in path:
+            node._longer_bindings = None
+
+        node = path[-1]
+        node.bindings = [item for item in node.bindings if item[1] is not binding]
+
+        # Remove the nodes that became empty.
+        for parent, key, node in reversed(list(zip(path, binding.keys, path[1:]))):
+            if node.bindings or node.children:
+                break
+            del parent.children[key]
+
+    def _find_nodes(self, keys):
+        """
+        Return a list of (node, any_count) tuples for all the nodes in the
+        trie that match this key sequence. `any_count` is the number of
+        `Keys.Any` edges on the path.
+        """
+        nodes = [(self._get_trie(), 0)]
+
+        for key in keys:
+            next_nodes = []
+
+            for node, any_count in nodes:
+                child = node.children.get(key)
+                if child is not None:
+                    next_nodes.append((child, any_count + (key == Keys.Any)))
+
+                if key != Keys.Any:
+                    child = node.children.get(Keys.Any)
+                    if child is not None:
+                        next_nodes.append((child, any_count + 1))
+
+            nodes = next_nodes
+            if not nodes:
+                break
+
+        return nodes
 
     def add_binding(self, *keys, **kwargs):
         """
@@ -132,10 +233,13 @@ class Registry(BaseRegistry):
                 return func
         else:
             def decorator(func):
-                self.key_bindings.append(
-                    _Binding(keys, func, filter=filter, eager=eager,
-                             save_before=save_before))
-                self._clear_cache()
+                binding = _Binding(keys, func, filter=filter, eager=eager,
+                                   save_before=save_before)
+                self.key_bindings.append(binding)
+                self._version += 1
+
+                if self._trie is not None:
+                    self._add_to_trie(binding)
 
                 return func
         return decorator
@@ -153,7 +257,10 @@ class Registry(BaseRegistry):
         for b in self.key_bindings:
             if b.handler == function:
                 self.key_bindings.remove(b)
-                self._clear_cache()
+                self._version += 1
+
+                if self._trie is not None:
+                    self._remove_from_trie(b)
                 return
 
         # No key binding found for this function. Raise ValueError.
@@ -167,30 +274,16 @@ class Registry(BaseRegistry):
 
         :param keys: tuple of keys.
         """
-        def get():
-            result = []
-            for b in self.key_bindings:
-                if len(keys) == len(b.keys):
-                    match = True
-                    any_count = 0
-
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
+        result = []
+        for node, any_count in self._find_nodes(keys):
+            for index, b in node.bindings:
+                result.append((-any_count, index, b))
 
-                        if i == Keys.Any:
-                            any_count += 1
+        # Place bindings that have more 'Any' occurences in them at the
+        # beginning, and keep the registration order otherwise.
+        result.sort(key=lambda item: item[:2])
 
-                    if match:
-                        result.append((any_count, b))
-
-            # Place bindings that have more 'Any' occurences in them at the end.
-            result = sorted(result, key=lambda item: -item[0])
-
-            return [item[1] for item in result]
-
-        return self._get_bindings_for_keys_cache.get(keys, get)
+        return [item[2] for item in result]
 
     def get_bindings_starting_with_keys(self, keys):
         """
@@ -201,20 +294,17 @@ class Registry(BaseRegistry):
 
         :param keys: tuple of keys.
         """
-        def get():
+        nodes = self._find_nodes(keys)
+
+        if len(nodes) == 1:
+            result = nodes[0][0].longer_bindings
+        else:
             result = []
-            for b in self.key_bindings:
-                if len(keys) < len(b.keys):
-                    match = True
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
-                    if match:
-                        result.append(b)
-            return result
+            for node, _ in nodes:
+                result.extend(node.longer_bindings)
 
-        return self._get_bindings_starting_with_keys_cache.get(keys, get)
+        # Keep the registration order.
+        return [b for index, b in sorted(result, key=lambda item: item[0])]
 
 
 class _AddRemoveMixin(BaseRegistry):
@@ -311,6 +401,11 @@ class ConditionalRegistry(_AddRemoveMixin):
             self._registry2 = registry2
             self._last_version = expected_version
 
+    def load_lazy_bindings(self, cli):
+        # Bindings that are disabled don't have to be loaded yet.
+        if self.filter(cli):
+            self.registry.load_lazy_bindings(cli)
+
 
 class MergedRegistry(_AddRemoveMixin):
     """
@@ -348,3 +443,73 @@ class MergedRegistry(_AddRemoveMixin):
 
             self._registry2 = registry2
             self._last_version = expected_version
+
+    def load_lazy_bindings(self, cli):
+        for r in self.registries:
+            r.load_lazy_bindings(cli)
+
+
+class LazyRegistry(_AddRemoveMixin):
+    """
+    Registry of which the key bindings are only created the first time that
+    the given filter becomes active. Until then, it behaves as an empty
+    registry. This avoids importing and setting up (for instance) all the Vi
+    key bindings for people who only use Emacs mode.::
+
+        def load():
+            from prompt_toolkit.key_binding.bindings.vi import load_vi_bindings
+            return load_vi_bindings()
+
+        registry = LazyRegistry(load, ViMode())
+
+    :param load_func: Callable that returns a `BaseRegistry`.
+    :param filter: `CLIFilter` object. Once it returns `True` for a key press,
+        `load_func` is called.
+    """
+    def __init__(self, load_func, filter=True):
+        assert callable(load_func)
+
+        _AddRemoveMixin.__init__(self)
+
+        self.load_func = load_func
+        self.filter = to_cli_filter(filter)
+        self.registry = None
+
+    @property
+    def loaded(self):
+        return self.registry is not None
+
+    def load(self):
+        """
+        Create the key bindings now. (If that didn't happen yet.)
+        """
+        if self.registry is None:
+            registry = self.load_func()
+            assert isinstance(registry, BaseRegistry)
+            self.registry = registry
+
+    def load_lazy_bindings(self, cli):
+        if self.registry is None:
+            if self.filter(cli):
+                self.load()
+        else:
+            self.registry.load_lazy_bindings(cli)
+
+    def _update_cache(self):
+        """
+        If the registry was loaded or changed. Update our copy.
+        """
+        registries = [self._extra_registry]
+        if self.registry is not None:
+            registries.insert(0, self.registry)
+
+        expected_version = tuple(r._version for r in registries)
+
+        if self._last_version != expected_version:
+            registry2 = Registry()
+
+            for reg in registries:
+                registry2.key_bindings.extend(reg.key_bindings)
+
+            self._registry2 = registry2
+            self._last_version = expected_version
@@ -20,7 +20,7 @@ from prompt_toolkit.utils import get_cwidth
 from .lexers import Lexer, SimpleLexer
 from .processors import Processor
 from .screen import Char, Point
-from .utils import token_list_width, split_lines, token_list_to_text
+from .utils import token_list_width, split_lines, token_list_to_text, apply_token_overlays
 
 import six
 import time
@@ -463,6 +463,11 @@ class BufferControl(UIControl):
         #: lexed. This is a faily easy way to cache such an expensive operation.
         self._token_cache = SimpleCache(maxsize=8)
 
+        #: Processed lines, kept between renders of the same document text.
+        #: (See `Processor.get_cache_key`.)
+        self._processed_lines_text = None
+        self._processed_lines = {}
+
         self._xy_to_cursor_position = None
         self._last_click_timestamp = None
         self._last_get_processed_line = None
@@ -553,7 +558,10 @@ class BufferControl(UIControl):
                     i = f(i)
                 return i
 
-            # Apply each processor.
+            # Apply each processor. Overlays are collected (and moved along
+            # when a processor changes the positions), and applied only once.
+            overlays = []
+
             for p in self.input_processors:
                 transformation = p.apply_transformation(
                     cli, document, lineno, source_to_display, tokens)
@@ -562,9 +570,16 @@ class BufferControl(UIControl):
                 if cursor_column:
                     cursor_column = transformation.source_to_display(cursor_column)
 
+                if overlays:
+                    f = transformation.source_to_display
+                    overlays = [(f(start), f(end), suffix) for start, end, suffix in overlays]
+                overlays.extend(transformation.overlays)
+
                 display_to_source_functions.append(transformation.display_to_source)
                 source_to_display_functions.append(transformation.source_to_display)
 
+            tokens = apply_token_overlays(tokens, overlays)
+
             def display_to_source(i):
                 for f in reversed(display_to_source_functions):
                     i = f(i)
@@ -572,15 +587,47 @@ class BufferControl(UIControl):
 
             return _ProcessedLine(tokens, source_to_display, display_to_source)
 
+        def get_cache_key(lineno):
+            " Combined cache key of all processors, or `None`. "
+            keys = []
+            for p in self.input_processors:
+                key = p.get_cache_key(cli, document, lineno)
+                if key is None:
+                    return None
+                keys.append(key)
+            return keys
+
         def create_func():
             get_line = self._get_tokens_for_line_func(cli, document)
             cache = {}
 
+            # Lines that were processed during previous renders of the same
+            # text: {lineno: (cache_key, source_tokens, processed_line)}.
+            if self._processed_lines_text != document.text:
+                self._processed_lines_text = document.text
+                self._processed_lines = {}
+            processed_lines = self._processed_lines
+
             def get_processed_line(i):
                 try:
                     return cache[i]
                 except KeyError:
-                    processed_line = transform(i, get_line(i))
+                    tokens = get_line(i)
+                    key = get_cache_key(i)
+
+                    # Reuse the line from the previous render when the input
+                    # tokens and the state of all processors are unchanged.
+                    # (Compare tokens by value, the lexer can return a new
+                    # list for the same line.)
+                    previous = processed_lines.get(i)
+                    if (key is not None and previous is not None and
+                            previous[0] == key and previous[1] == tokens):
+                        processed_line = previous[2]
+                    else:
+                        processed_line = transform(i, tokens)
+                        if key is not None:
+                            processed_lines[i] = (key, tokens, processed_line)
+
                     cache[i] = processed_line
                     return processed_line
             return get_processed_line
@@ -13,6 +13,7 @@ from .utils import split_lines
 
 import re
 import six
+import threading
 
 __all__ = (
     'Lexer',
@@ -21,6 +22,7 @@ __all__ = (
     'SyntaxSync',
     'SyncFromStart',
     'RegexSync',
+    'ThreadedLexer',
 )
 
 
@@ -169,6 +171,15 @@ class PygmentsLexer(Lexer):
         recommended to disable this for inputs that are expected to be more
         than 1,000 lines.
     :param syntax_sync: `SyntaxSync` object.
+    :param incremental: Keep the lexer state at the start of every line
+        between documents. After an edit, lexing restarts from the closest
+        line before the change and stops as soon as the lexer is back in the
+        same state as before at an unchanged line. The remaining lines are
+        taken from the previous document. This always lexes from the start of
+        the document (like `sync_from_start`), but typing in big documents
+        only costs the lexing of a few lines. (Only for Pygments lexers that
+        use the standard `RegexLexer` implementation. Other lexers ignore
+        this flag.)
     """
     # Minimum amount of lines to go backwards when starting the parser.
     # This is important when the lines are retrieved in reverse order, or when
@@ -182,8 +193,10 @@ class PygmentsLexer(Lexer):
     # (This should probably be bigger than MIN_LINES_BACKWARDS.)
     REUSE_GENERATOR_MAX_DISTANCE = 100
 
-    def __init__(self, pygments_lexer_cls, sync_from_start=True, syntax_sync=None):
+    def __init__(self, pygments_lexer_cls, sync_from_start=True, syntax_sync=None,
+                 incremental=False):
         assert syntax_sync is None or isinstance(syntax_sync, SyntaxSync)
+        assert isinstance(incremental, bool)
 
         self.pygments_lexer_cls = pygments_lexer_cls
         self.sync_from_start = to_cli_filter(sync_from_start)
@@ -197,6 +210,10 @@ class PygmentsLexer(Lexer):
         # Create syntax sync instance.
         self.syntax_sync = syntax_sync or RegexSync.from_pygments_lexer_cls(pygments_lexer_cls)
 
+        # Incremental lexing.
+        self.incremental = incremental and _supports_incremental_lexing(self.pygments_lexer)
+        self._last_incremental_run = None
+
     @classmethod
     def from_filename(cls, filename, sync_from_start=True):
         """
@@ -218,6 +235,12 @@ class PygmentsLexer(Lexer):
         Create a lexer function that takes a line number and returns the list
         of (Token, text) tuples as the Pygments lexer returns for that line.
         """
+        if self.incremental:
+            run = _IncrementalLexRun(self.pygments_lexer, document.lines,
+                                     previous=self._last_incremental_run)
+            self._last_incremental_run = run
+            return run.get_line
+
         # Cache of already lexed lines.
         cache = {}
 
@@ -318,3 +341,395 @@ class PygmentsLexer(Lexer):
             return []
 
         return get_line
+
+
+class ThreadedLexer(Lexer):
+    """
+    Wrapper that runs another lexer in a background thread, so that lexing
+    never blocks the rendering. Lines that are not lexed yet are displayed
+    immediately, using the tokens of the previous document when the line did
+    not change, or else using `token`. The requested lines are lexed using
+    `run_in_executor`, and the interface is invalidated each time a new range
+    of lines becomes available.
+
+    Example::
+
+        lexer = ThreadedLexer(PygmentsLexer(PythonLexer, incremental=True))
+
+    :param lexer: The `Lexer` to wrap.
+    :param token: Token for the lines that are not lexed yet.
+    :param lookahead: Amount of lines to lex at once, starting at the first
+        requested line.
+    """
+    def __init__(self, lexer, token=Token, lookahead=200):
+        assert isinstance(lexer, Lexer)
+        assert isinstance(lookahead, int) and lookahead > 0
+
+        self.lexer = lexer
+        self.token = token
+        self.lookahead = lookahead
+
+        # Only the most recently used document is lexed in the background.
+        self._current_run = None
+
+        # The worker of a previous run can still be busy when a new run
+        # starts. Never call into `lexer` from two threads at the same time.
+        # (An incremental `PygmentsLexer` reuses the state of its previous
+        # run.)
+        self._lexer_lock = threading.Lock()
+
+    def lex_document(self, cli, document):
+        run = _ThreadedLexRun(self, cli, document, previous_run=self._current_run)
+        self._current_run = run
+        return run.get_line
+
+
+class _ThreadedLexRun(object):
+    """
+    The lexed lines of one document, for `ThreadedLexer`.
+    """
+    def __init__(self, threaded_lexer, cli, document, previous_run=None):
+        self.threaded_lexer = threaded_lexer
+        self.cli = cli
+        self.document = document
+        self.lines = document.lines
+
+        self._get_line = None  # Created in the worker.
+        self._results = {}  # Maps line numbers to tokens.
+        self._previous_results = self._get_previous_results(previous_run)
+        self._pending = set()  # Requested line numbers.
+        self._running = False
+        self._lock = threading.Lock()
+
+    def get_line(self, lineno):
+        " Return the tokens for a given line number. "
+        try:
+            return self._results[lineno]
+        except KeyError:
+            pass
+
+        if lineno >= len(self.lines):
+            return []
+
+        # Without event loop, lex synchronously.
+        if self.cli is None or self.cli.eventloop is None:
+            with self.threaded_lexer._lexer_lock:
+                if self._get_line is None:
+                    self._get_line = self.threaded_lexer.lexer.lex_document(self.cli, self.document)
+                return self._get_line(lineno)
+
+        self.threaded_lexer._current_run = self
+
+        with self._lock:
+            self._pending.add(lineno)
+            start_worker = not self._running
+            self._running = True
+
+        if start_worker:
+            self.cli.eventloop.run_in_executor(self._run)
+
+        try:
+            return self._previous_results[lineno]
+        except KeyError:
+            return [(self.threaded_lexer.token, self.lines[lineno])]
+
+    def _get_previous_results(self, previous_run):
+        """
+        Map line numbers to the tokens that the previous run had for the same
+        text, either at the same position or shifted by the amount of
+        inserted/removed lines. These are displayed until the new tokens are
+        available, so that the highlighting doesn't flicker after each edit.
+        """
+        if previous_run is None:
+            return {}
+
+        result = {}
+        lines = self.lines
+        previous_lines = previous_run.lines
+        delta = len(lines) - len(previous_lines)
+
+        known = dict(previous_run._previous_results)
+        known.update(list(previous_run._results.items()))
+
+        for lineno, tokens in known.items():
+            text = previous_lines[lineno]
+
+            for new_lineno in (lineno, lineno + delta):
+                if 0 <= new_lineno < len(lines) and lines[new_lineno] == text:
+                    result.setdefault(new_lineno, tokens)
+                    break
+
+        return result
+
+    def _run(self):
+        " Lex the pending lines. (Runs in a background thread.) "
+        try:
+            self._lex_pending_lines()
+        except:
+            with self._lock:
+                self._running = False
+            raise
+
+    def _lex_pending_lines(self):
+        lookahead = self.threaded_lexer.lookahead
+        lexer_lock = self.threaded_lexer._lexer_lock
+
+        while True:
+            with self._lock:
+                # Stop when there is nothing to do, or when another document
+                # has to be lexed.
+                if not self._pending or self.threaded_lexer._current_run is not self:
+                    self._running = False
+                    return
+                start = min(self._pending)
+
+            end = min(len(self.lines), start + lookahead)
+
+            with lexer_lock:
+                if self._get_line is None:
+                    self._get_line = self.threaded_lexer.lexer.lex_document(self.cli, self.document)
+
+                for i in range(start, end):
+                    if i not in self._results:
+                        self._results[i] = self._get_line(i)
+
+            with self._lock:
+                self._pending = set(i for i in self._pending
+                                    if i not in self._results)
+
+            self.cli.invalidate()
+
+
+def _supports_incremental_lexing(pygments_lexer):
+    """
+    True when this Pygments lexer uses the standard `RegexLexer` main loop,
+    which `_lex_lines` reimplements.
+    """
+    from pygments.lexer import RegexLexer
+
+    return (isinstance(pygments_lexer, RegexLexer) and
+            six.get_unbound_function(type(pygments_lexer).get_tokens_unprocessed) is
+            six.get_unbound_function(RegexLexer.get_tokens_unprocessed))
+
+
+def _lex_lines(pygments_lexer, text, stack, start_lineno):
+    """
+    Lex `text` with a Pygments `RegexLexer`, starting in the given state.
+    Yield a ``(lineno, start_stack, tokens)`` tuple for every line, where
+    `start_stack` is the state of the lexer at the start of that line, or
+    `None` when the line starts in the middle of a token.
+
+    (This is the main loop of `RegexLexer.get_tokens_unprocessed`, which
+    doesn't expose the state of the lexer.)
+    """
+    from pygments.token import Error, Text, _TokenType
+
+    tokendefs = pygments_lexer._tokens
+    statestack = list(stack)
+    statetokens = tokendefs[statestack[-1]]
+    pos = 0
+
+    lineno = start_lineno
+    line = []
+    line_stack = tuple(statestack)
+
+    while True:
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, pos)
+            if m:
+                if action is None:
+                    tokens = []
+                elif type(action) is _TokenType:
+                    tokens = [(action, m.group())]
+                else:
+                    tokens = [(t, v) for _, t, v in action(pygments_lexer, m)]
+
+                pos = m.end()
+
+                if new_state is not None:
+                    # State transition.
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == '#pop':
+                                if len(statestack) > 1:
+                                    statestack.pop()
+                            elif state == '#push':
+                                statestack.append(statestack[-1])
+                            else:
+                                statestack.append(state)
+                    elif isinstance(new_state, int):
+                        if abs(new_state) >= len(statestack):
+                            del statestack[1:]
+                        else:
+                            del statestack[new_state:]
+                    elif new_state == '#push':
+                        statestack.append(statestack[-1])
+                    else:
+                        assert False, 'wrong state def: %r' % (new_state, )
+                    statetokens = tokendefs[statestack[-1]]
+                break
+        else:
+            # No match: consume one character.
+            if pos >= len(text):
+                break
+
+            if text[pos] == '\n':
+                # At EOL, reset state to "root".
+                statestack = ['root']
+                statetokens = tokendefs['root']
+                tokens = [(Text, '\n')]
+            else:
+                tokens = [(Error, text[pos])]
+            pos += 1
+
+        # Split the tokens into lines.
+        for t, v in tokens:
+            parts = v.split('\n')
+
+            for part in parts[:-1]:
+                if part:
+                    line.append((t, part))
+                yield lineno, line_stack, line
+
+                lineno += 1
+                line = []
+                line_stack = None  # Starts in the middle of a token.
+
+            # (Like `split_lines`, keep the empty part.)
+            line.append((t, parts[-1]))
+
+        # When this match ended at the start of a line, remember the state.
+        if line_stack is None and text[pos - 1:pos] == '\n':
+            line_stack = tuple(statestack)
+
+    yield lineno, line_stack, line
+
+
+class _IncrementalLexRun(object):
+    """
+    The lexed lines of one document, for `PygmentsLexer` in incremental mode.
+    Lines are lexed on demand, and as much as possible is taken from the
+    previous run.
+
+    :param pygments_lexer: Pygments `RegexLexer` instance.
+    :param lines: The lines of the document.
+    :param previous: The `_IncrementalLexRun` of the previous document, or
+        `None`.
+    """
+    def __init__(self, pygments_lexer, lines, previous=None):
+        self.pygments_lexer = pygments_lexer
+        self.lines = lines
+
+        #: The tokens of the lines that have been lexed so far.
+        self.token_lines = []
+
+        #: The state of the lexer at the start of every lexed line (or `None`
+        #: when the line starts in the middle of a token.) This can contain
+        #: one item more than `token_lines`.
+        self.checkpoints = [('root', )]
+
+        self._generator = None
+
+        # (previous_run, line_delta, first_unchanged_line), for reusing the
+        # lines after the change.
+        self._reuse = None
+
+        if previous is not None:
+            self._reuse_previous(previous)
+
+    def _reuse_previous(self, previous):
+        old_lines = previous.lines
+        new_lines = self.lines
+
+        # Count the unchanged lines at the start and at the end.
+        max_common = min(len(old_lines), len(new_lines))
+
+        prefix = 0
+        while prefix < max_common and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+
+        suffix = 0
+        while suffix < max_common - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+            suffix += 1
+
+        # Keep everything before the last checkpoint that comes before the
+        # change. (The state at the start of the first changed line is still
+        # correct.)
+        c = min(prefix, len(previous.checkpoints) - 1)
+        while c > 0 and previous.checkpoints[c] is None:
+            c -= 1
+
+        self.token_lines = previous.token_lines[:c]
+        self.checkpoints = previous.checkpoints[:c + 1]
+
+        if suffix:
+            self._reuse = (previous, len(new_lines) - len(old_lines), len(new_lines) - suffix)
+
+        # Don't keep a chain of old runs in memory.
+        previous._reuse = None
+
+    def _create_generator(self):
+        """
+        Start lexing at the last line that starts at a token boundary.
+        """
+        c = min(len(self.token_lines), len(self.checkpoints) - 1)
+        while c > 0 and self.checkpoints[c] is None:
+            c -= 1
+
+        del self.token_lines[c:]
+        stack = self.checkpoints[c]
+
+        return _lex_lines(self.pygments_lexer, '\n'.join(self.lines[c:]), stack, c)
+
+    def _try_reuse(self, lineno, stack):
+        """
+        When the lexer is at an unchanged line in the same state as in the
+        previous run, take the remaining lines from there. Returns `True` on
+        success.
+        """
+        previous, delta, first_unchanged_line = self._reuse
+
+        if lineno < first_unchanged_line:
+            return False
+
+        old_lineno = lineno - delta
+
+        if old_lineno >= len(previous.token_lines):
+            # Nothing left to reuse.
+            self._reuse = None
+            return False
+
+        if previous.checkpoints[old_lineno] == stack:
+            del self.checkpoints[lineno:]
+            self.token_lines.extend(previous.token_lines[old_lineno:])
+            self.checkpoints.extend(previous.checkpoints[old_lineno:])
+
+            self._generator = None
+            self._reuse = None
+            return True
+
+        return False
+
+    def get_line(self, lineno):
+        " Return the tokens for a given line number. "
+        if lineno >= len(self.lines):
+            return []
+
+        while len(self.token_lines) <= lineno:
+            if self._generator is None:
+                self._generator = self._create_generator()
+
+            try:
+                i, stack, tokens = next(self._generator)
+            except StopIteration:
+                self._generator = None
+                return []
+
+            if stack is not None and self._reuse and self._try_reuse(i, stack):
+                continue
+
+            del self.checkpoints[i:]
+            self.checkpoints.append(stack)
+            self.token_lines.append(tokens)
+
+        return self.token_lines[lineno]
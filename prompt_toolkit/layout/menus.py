@@ -1,6 +1,6 @@
 from __future__ import unicode_literals
 
-from six.moves import zip_longest, range
+from six.moves import range
 from prompt_toolkit.filters import HasCompletions, IsDone, Condition, to_cli_filter
 from prompt_toolkit.mouse_events import MouseEventType
 from prompt_toolkit.token import Token
@@ -53,7 +53,7 @@ class CompletionsMenuControl(UIControl):
     def preferred_height(self, cli, width, max_available_height, wrap_lines):
         complete_state = cli.current_buffer.complete_state
         if complete_state:
-            return len(complete_state.current_completions)
+            return min(len(complete_state.current_completions), max_available_height)
         else:
             return 0
 
@@ -91,22 +91,22 @@ class CompletionsMenuControl(UIControl):
         """
         Return ``True`` if we need to show a column with meta information.
         """
-        return any(c.display_meta for c in complete_state.current_completions)
+        return _get_statistics(complete_state).has_meta
 
     def _get_menu_width(self, max_width, complete_state):
         """
         Return the width of the main column.
         """
-        return min(max_width, max(self.MIN_WIDTH, max(get_cwidth(c.display)
-                   for c in complete_state.current_completions) + 2))
+        statistics = _get_statistics(complete_state)
+        return min(max_width, max(self.MIN_WIDTH, statistics.max_display_width + 2))
 
     def _get_menu_meta_width(self, max_width, complete_state):
         """
         Return the width of the meta column.
         """
-        if self._show_meta(complete_state):
-            return min(max_width, max(get_cwidth(c.display_meta)
-                       for c in complete_state.current_completions) + 2)
+        statistics = _get_statistics(complete_state)
+        if statistics.has_meta:
+            return min(max_width, statistics.max_meta_width + 2)
         else:
             return 0
 
@@ -118,6 +118,11 @@ class CompletionsMenuControl(UIControl):
 
         text, tw = _trim_text(completion.display, width - 2)
         padding = ' ' * (width - 2 - tw)
+
+        if completion.match_positions:
+            return ([(token, ' ')] +
+                    _highlight_match_positions(token, text, completion) +
+                    [(token, '%s ' % padding)])
         return [(token, ' %s%s ' % (text, padding))]
 
     def _get_menu_item_meta_tokens(self, completion, is_current_completion, width):
@@ -150,6 +155,42 @@ class CompletionsMenuControl(UIControl):
             b.complete_previous(count=3, disable_wrap_around=True)
 
 
+class _CompletionStatistics(object):
+    """
+    Width statistics for a list of completions.
+    """
+    def __init__(self, completions):
+        self.completions = completions
+        self.max_display_width = 0
+        self.max_meta_width = 0
+        self.has_meta = False
+
+        for c in completions:
+            self.max_display_width = max(self.max_display_width, get_cwidth(c.display))
+
+            meta = c.display_meta
+            if meta:
+                self.has_meta = True
+                self.max_meta_width = max(self.max_meta_width, get_cwidth(meta))
+
+
+def _get_statistics(complete_state):
+    """
+    Return the `_CompletionStatistics` for the completions of this
+    `CompletionState`. Computing them requires a pass over all the
+    completions, so we do this only once for every list instead of on every
+    render. (They are stored on the state and shared with the states that it
+    creates for the other completion indexes.)
+    """
+    statistics = complete_state._statistics[0]
+
+    if statistics is None or statistics.completions is not complete_state.current_completions:
+        statistics = _CompletionStatistics(complete_state.current_completions)
+        complete_state._statistics[0] = statistics
+
+    return statistics
+
+
 def _trim_text(text, max_width):
     """
     Trim the text to `max_width`, append dots when the text is too long.
@@ -178,6 +219,34 @@ def _trim_text(text, max_width):
         return text, width
 
 
+def _highlight_match_positions(token, text, completion):
+    """
+    Split `text` (the trimmed display text of `completion`) into (token, text)
+    tuples, using `token.Match` for the characters at the completion's
+    `match_positions`. Positions that were trimmed away are ignored.
+    """
+    result = []
+    start = 0
+
+    # Don't highlight the dots that `_trim_text` appended.
+    if text == completion.display:
+        visible_length = len(text)
+    else:
+        visible_length = len(text) - 3
+
+    for position in sorted(completion.match_positions):
+        if position >= visible_length:
+            break
+        if position > start:
+            result.append((token, text[start:position]))
+        result.append((token.Match, text[position]))
+        start = position + 1
+
+    if start < len(text):
+        result.append((token, text[start:]))
+    return result
+
+
 class CompletionsMenu(ConditionalContainer):
     def __init__(self, max_height=None, scroll_offset=0, extra_filter=True, display_arrows=False):
         extra_filter = to_cli_filter(extra_filter)
@@ -233,7 +302,8 @@ class MultiColumnCompletionMenuControl(UIControl):
         self._rendered_rows = 0
         self._rendered_columns = 0
         self._total_columns = 0
-        self._render_pos_to_completion = {}
+        self._render_columns = []
+        self._render_column_width = 0
         self._render_left_arrow = False
         self._render_right_arrow = False
         self._render_width = 0
@@ -251,14 +321,15 @@ class MultiColumnCompletionMenuControl(UIControl):
         """
         complete_state = cli.current_buffer.complete_state
         column_width = self._get_column_width(complete_state)
-        result = int(column_width * math.ceil(len(complete_state.current_completions) / float(self.min_rows)))
+        column_count = int(math.ceil(len(complete_state.current_completions) / float(self.min_rows)))
 
         # When the desired width is still more than the maximum available,
         # reduce by removing columns until we are less than the available
         # width.
-        while result > column_width and result > max_available_width - self._required_margin:
-            result -= column_width
-        return result + self._required_margin
+        max_column_count = (max_available_width - self._required_margin) // column_width
+        column_count = max(1, min(column_count, max_column_count))
+
+        return column_width * column_count + self._required_margin
 
     def preferred_height(self, cli, width, max_available_height, wrap_lines):
         """
@@ -273,25 +344,21 @@ class MultiColumnCompletionMenuControl(UIControl):
     def create_content(self, cli, width, height):
         """
         Create a UIContent object for this menu.
+
+        Only the completions in the visible columns are rendered, so this
+        doesn't depend on the total amount of completions.
         """
         complete_state = cli.current_buffer.complete_state
         column_width = self._get_column_width(complete_state)
-        self._render_pos_to_completion = {}
-
-        def grouper(n, iterable, fillvalue=None):
-            " grouper(3, 'ABCDEFG', 'x') --> ABC DEF Gxx "
-            args = [iter(iterable)] * n
-            return zip_longest(fillvalue=fillvalue, *args)
-
-        def is_current_completion(completion):
-            " Returns True when this completion is the currently selected one. "
-            return complete_state.complete_index is not None and c == complete_state.current_completion
 
         # Space required outside of the regular columns, for displaying the
         # left and right arrow.
         HORIZONTAL_MARGIN_REQUIRED = 3
 
         if complete_state:
+            completions = complete_state.current_completions
+            complete_index = complete_state.complete_index  # Can be None!
+
             # There should be at least one column, but it cannot be wider than
             # the available width.
             column_width = min(width - HORIZONTAL_MARGIN_REQUIRED, column_width)
@@ -304,36 +371,39 @@ class MultiColumnCompletionMenuControl(UIControl):
                 column_width //= (column_width // self.suggested_max_column_width)
 
             visible_columns = max(1, (width - self._required_margin) // column_width)
-
-            columns_ = list(grouper(height, complete_state.current_completions))
-            rows_ = list(zip(*columns_))
+            total_columns = int(math.ceil(len(completions) / float(height)))
 
             # Make sure the current completion is always visible: update scroll offset.
-            selected_column = (complete_state.complete_index or 0) // height
+            selected_column = (complete_index or 0) // height
             self.scroll = min(selected_column, max(self.scroll, selected_column - visible_columns + 1))
 
             render_left_arrow = self.scroll > 0
-            render_right_arrow = self.scroll < len(rows_[0]) - visible_columns
+            render_right_arrow = self.scroll < total_columns - visible_columns
+
+            # The completions of every visible column. (Column `i` contains
+            # the completions `i * height` up to `(i + 1) * height`.)
+            first_column = self.scroll
+            last_column = min(total_columns, self.scroll + visible_columns)
+            columns = [completions[i * height:(i + 1) * height]
+                       for i in range(first_column, last_column)]
 
             # Write completions to screen.
             tokens_for_line = []
 
-            for row_index, row in enumerate(rows_):
+            for row_index in range(height):
                 tokens = []
-                middle_row = row_index == len(rows_) // 2
+                middle_row = row_index == height // 2
 
                 # Draw left arrow if we have hidden completions on the left.
                 if render_left_arrow:
                     tokens += [(Token.Scrollbar, '<' if middle_row else ' ')]
 
                 # Draw row content.
-                for column_index, c in enumerate(row[self.scroll:][:visible_columns]):
-                    if c is not None:
-                        tokens += self._get_menu_item_tokens(c, is_current_completion(c), column_width)
-
-                        # Remember render position for mouse click handler.
-                        for x in range(column_width):
-                            self._render_pos_to_completion[(column_index * column_width + x, row_index)] = c
+                for column_index, column in enumerate(columns, first_column):
+                    if row_index < len(column):
+                        is_current_completion = (column_index * height + row_index == complete_index)
+                        tokens += self._get_menu_item_tokens(
+                            column[row_index], is_current_completion, column_width)
                     else:
                         tokens += [(self.token.Completion, ' ' * column_width)]
 
@@ -348,11 +418,17 @@ class MultiColumnCompletionMenuControl(UIControl):
                 tokens_for_line.append(tokens)
 
         else:
-            tokens = []
+            tokens_for_line = []
+            columns = []
+            visible_columns = total_columns = 0
+            render_left_arrow = render_right_arrow = False
 
+        # Remember the visible columns for the mouse click handler.
         self._rendered_rows = height
         self._rendered_columns = visible_columns
-        self._total_columns = len(columns_)
+        self._total_columns = total_columns
+        self._render_columns = columns
+        self._render_column_width = column_width
         self._render_left_arrow = render_left_arrow
         self._render_right_arrow = render_right_arrow
         self._render_width = column_width * visible_columns + render_left_arrow + render_right_arrow + 1
@@ -360,13 +436,13 @@ class MultiColumnCompletionMenuControl(UIControl):
         def get_line(i):
             return tokens_for_line[i]
 
-        return UIContent(get_line=get_line, line_count=len(rows_))
+        return UIContent(get_line=get_line, line_count=len(tokens_for_line))
 
     def _get_column_width(self, complete_state):
         """
         Return the width of each column.
         """
-        return max(get_cwidth(c.display) for c in complete_state.current_completions) + 1
+        return _get_statistics(complete_state).max_display_width + 1
 
     def _get_menu_item_tokens(self, completion, is_current_completion, width):
         if is_current_completion:
@@ -377,6 +453,10 @@ class MultiColumnCompletionMenuControl(UIControl):
         text, tw = _trim_text(completion.display, width)
         padding = ' ' * (width - tw - 1)
 
+        if completion.match_positions:
+            return ([(token, ' ')] +
+                    _highlight_match_positions(token, text, completion) +
+                    [(token, padding)])
         return [(token, ' %s%s' % (text, padding))]
 
     def mouse_handler(self, cli, mouse_event):
@@ -415,10 +495,24 @@ class MultiColumnCompletionMenuControl(UIControl):
 
             # Mouse click on completion.
             else:
-                completion = self._render_pos_to_completion.get((x, y))
+                completion = self._get_completion_at_position(x, y)
                 if completion:
                     b.apply_completion(completion)
 
+    def _get_completion_at_position(self, x, y):
+        """
+        Return the completion that was rendered at this position, or `None`.
+        """
+        if self._render_left_arrow:
+            x -= 1
+
+        column_index = x // self._render_column_width if self._render_column_width else -1
+
+        if 0 <= column_index < len(self._render_columns):
+            column = self._render_columns[column_index]
+            if 0 <= y < len(column):
+                return column[y]
+
 
 class MultiColumnCompletionsMenu(HSplit):
     """
@@ -435,7 +529,7 @@ class MultiColumnCompletionsMenu(HSplit):
         full_filter = HasCompletions() & ~IsDone() & extra_filter
 
         any_completion_has_meta = Condition(lambda cli:
-                any(c.display_meta for c in cli.current_buffer.complete_state.current_completions))
+                _get_statistics(cli.current_buffer.complete_state).has_meta)
 
         # Create child windows.
         completions_window = ConditionalContainer(
@@ -471,7 +565,7 @@ class _SelectedCompletionMetaControl(UIControl):
         """
         if cli.current_buffer.complete_state:
             state = cli.current_buffer.complete_state
-            return 2 + max(get_cwidth(c.display_meta) for c in state.current_completions)
+            return 2 + _get_statistics(state).max_meta_width
         else:
             return 0
 
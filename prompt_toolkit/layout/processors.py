@@ -8,7 +8,6 @@ token types.
 from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 from six import with_metaclass
-from six.moves import range
 
 from prompt_toolkit.cache import SimpleCache
 from prompt_toolkit.document import Document
@@ -18,9 +17,9 @@ from prompt_toolkit.layout.utils import token_list_to_text
 from prompt_toolkit.reactive import Integer
 from prompt_toolkit.token import Token
 
-from .utils import token_list_len, explode_tokens
+from .utils import token_list_len
 
-import re
+from bisect import bisect_right
 
 __all__ = (
     'Processor',
@@ -41,6 +40,35 @@ __all__ = (
 )
 
 
+def _split_tokens(tokens, position):
+    """
+    Split a list of (token, text) tuples in two at the given character
+    position. (`Token.ZeroWidthEscape` fragments don't count as characters.)
+    """
+    ZeroWidthEscape = Token.ZeroWidthEscape
+    before = []
+    pos = 0
+
+    for i, item in enumerate(tokens):
+        if item[0] == ZeroWidthEscape:
+            before.append(item)
+            continue
+
+        end = pos + len(item[1])
+
+        if end > position:
+            cut = position - pos
+            if cut > 0:
+                before.append((item[0], item[1][:cut]) + item[2:])
+                return before, [(item[0], item[1][cut:]) + item[2:]] + tokens[i + 1:]
+            return before, tokens[i:]
+
+        before.append(item)
+        pos = end
+
+    return before, []
+
+
 class Processor(with_metaclass(ABCMeta, object)):
     """
     Manipulate the tokens for a given line in a
@@ -61,6 +89,21 @@ class Processor(with_metaclass(ABCMeta, object)):
         """
         return Transformation(tokens)
 
+    def get_cache_key(self, cli, document, lineno):
+        """
+        Return a key that captures everything, apart from the document text
+        and the input tokens, that the output of :meth:`.apply_transformation`
+        depends on for this line. (Like the search text, the selection or the
+        cursor position, if the output depends on it.) Keys are compared
+        using ``==``.
+
+        While the key and the input tokens don't change, the
+        :class:`~prompt_toolkit.layout.controls.BufferControl` reuses the
+        processed line from a previous render. Return `None` (the default)
+        when the output can't be cached.
+        """
+        return None
+
     def has_focus(self, cli):
         """
         Processors can override the focus.
@@ -82,11 +125,21 @@ class Transformation(object):
         transformed string.
     :param display_to_source: Cursor position transformed from source string to
         original string.
+    :param overlays: List of ``(start, end, token_suffix)`` tuples. Style
+        additions for ranges of the transformed tokens, for processors that
+        only highlight text. (See
+        :func:`~prompt_toolkit.layout.utils.apply_token_overlays`.) The
+        :class:`~prompt_toolkit.layout.controls.BufferControl` passes the
+        overlays through the following processors and applies all of them
+        at once at the end. This way, the token list doesn't have to be
+        exploded into single characters.
     """
-    def __init__(self, tokens, source_to_display=None, display_to_source=None):
+    def __init__(self, tokens, source_to_display=None, display_to_source=None,
+                 overlays=None):
         self.tokens = tokens
         self.source_to_display = source_to_display or (lambda i: i)
         self.display_to_source = display_to_source or (lambda i: i)
+        self.overlays = overlays or []
 
 
 class HighlightSearchProcessor(Processor):
@@ -115,44 +168,66 @@ class HighlightSearchProcessor(Processor):
         else:
             return self.get_search_state(cli).text
 
+    def get_cache_key(self, cli, document, lineno):
+        search_text = self._get_search_text(cli)
+
+        if search_text and not cli.is_returning:
+            if document.cursor_position_row == lineno:
+                cursor_column = document.cursor_position_col
+            else:
+                cursor_column = None
+
+            return search_text, cli.is_ignoring_case, cursor_column
+        return ()
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         search_text = self._get_search_text(cli)
         searchmatch_current_token = (':', ) + Token.SearchMatch.Current
         searchmatch_token = (':', ) + Token.SearchMatch
 
+        overlays = []
+
         if search_text and not cli.is_returning:
-            # For each search match, replace the Token.
-            line_text = token_list_to_text(tokens)
-            tokens = explode_tokens(tokens)
+            # Take the matches for this line from the index of the whole
+            # document.
+            matches = document.get_search_matches(
+                search_text, ignore_case=bool(cli.is_ignoring_case))
 
-            flags = re.IGNORECASE if cli.is_ignoring_case else 0
+            line_start = document.translate_row_col_to_index(lineno, 0)
+            line_end = line_start + len(document.lines[lineno])
 
             # Get cursor column.
             if document.cursor_position_row == lineno:
-                cursor_column = source_to_display(document.cursor_position_col)
+                cursor_column = document.cursor_position_col
             else:
                 cursor_column = None
 
-            for match in re.finditer(re.escape(search_text), line_text, flags=flags):
+            for start, end in matches.get_spans(line_start, line_end):
+                start -= line_start
+                end -= line_start
+
                 if cursor_column is not None:
-                    on_cursor = match.start() <= cursor_column < match.end()
+                    on_cursor = start <= cursor_column < end
                 else:
                     on_cursor = False
 
-                for i in range(match.start(), match.end()):
-                    old_token, text = tokens[i]
-                    if on_cursor:
-                        tokens[i] = (old_token + searchmatch_current_token, tokens[i][1])
-                    else:
-                        tokens[i] = (old_token + searchmatch_token, tokens[i][1])
+                if on_cursor:
+                    token_suffix = searchmatch_current_token
+                else:
+                    token_suffix = searchmatch_token
 
-        return Transformation(tokens)
+                overlays.append((source_to_display(start), source_to_display(end), token_suffix))
+
+        return Transformation(tokens, overlays=overlays)
 
 
 class HighlightSelectionProcessor(Processor):
     """
     Processor that highlights the selection in the document.
     """
+    def get_cache_key(self, cli, document, lineno):
+        return document.selection_range_at_line(lineno)
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         selected_token = (':', ) + Token.SelectedText
 
@@ -164,17 +239,15 @@ class HighlightSelectionProcessor(Processor):
             from_ = source_to_display(from_)
             to = source_to_display(to)
 
-            tokens = explode_tokens(tokens)
+            line_length = token_list_len(tokens)
 
-            if from_ == 0 and to == 0 and len(tokens) == 0:
+            if from_ == 0 and to == 0 and line_length == 0:
                 # When this is an empty line, insert a space in order to
                 # visualiase the selection.
                 return Transformation([(Token.SelectedText, ' ')])
             else:
-                for i in range(from_, to + 1):
-                    if i < len(tokens):
-                        old_token, old_text = tokens[i]
-                        tokens[i] = (old_token + selected_token, old_text)
+                return Transformation(tokens, overlays=[
+                    (from_, min(to + 1, line_length), selected_token)])
 
         return Transformation(tokens)
 
@@ -188,6 +261,9 @@ class PasswordProcessor(Processor):
     def __init__(self, char='*'):
         self.char = char
 
+    def get_cache_key(self, cli, document, lineno):
+        return self.char
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         tokens = [(token, self.char * len(text)) for token, text in tokens]
         return Transformation(tokens)
@@ -199,14 +275,13 @@ class HighlightMatchingBracketProcessor(Processor):
     bracket.
 
     :param max_cursor_distance: Only highlight matching brackets when the
-        cursor is within this distance. (From inside a `Processor`, we can't
-        know which lines will be visible on the screen. But we also don't want
-        to scan the whole document for matching brackets on each key press, so
-        we limit to this value.)
+        cursor is within this distance. (`None` for no limit. Matching
+        brackets are looked up in an index that is built once for the
+        document text, so the distance doesn't matter for performance.)
     """
     _closing_braces = '])}>'
 
-    def __init__(self, chars='[](){}<>', max_cursor_distance=1000):
+    def __init__(self, chars='[](){}<>', max_cursor_distance=None):
         self.chars = chars
         self.max_cursor_distance = max_cursor_distance
 
@@ -216,20 +291,23 @@ class HighlightMatchingBracketProcessor(Processor):
         """
         Return a list of (row, col) tuples that need to be highlighted.
         """
-        # Try for the character under the cursor.
-        if document.current_char and document.current_char in self.chars:
-            pos = document.find_matching_bracket_position(
+        def find_matching_bracket_position(document):
+            if self.max_cursor_distance is None:
+                return document.find_matching_bracket_position()
+            else:
+                return document.find_matching_bracket_position(
                     start_pos=document.cursor_position - self.max_cursor_distance,
                     end_pos=document.cursor_position + self.max_cursor_distance)
 
+        # Try for the character under the cursor.
+        if document.current_char and document.current_char in self.chars:
+            pos = find_matching_bracket_position(document)
+
         # Try for the character before the cursor.
         elif (document.char_before_cursor and document.char_before_cursor in
               self._closing_braces and document.char_before_cursor in self.chars):
             document = Document(document.text, document.cursor_position - 1)
-
-            pos = document.find_matching_bracket_position(
-                    start_pos=document.cursor_position - self.max_cursor_distance,
-                    end_pos=document.cursor_position + self.max_cursor_distance)
+            pos = find_matching_bracket_position(document)
         else:
             pos = None
 
@@ -241,28 +319,32 @@ class HighlightMatchingBracketProcessor(Processor):
         else:
             return []
 
-    def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
-        # Get the highlight positions.
+    def _get_positions(self, cli, document):
         key = (cli.render_counter, document.text, document.cursor_position)
-        positions = self._positions_cache.get(
+        return self._positions_cache.get(
             key, lambda: self._get_positions_to_highlight(document))
 
+    def get_cache_key(self, cli, document, lineno):
+        return [(col, col == document.cursor_position_col)
+                for row, col in self._get_positions(cli, document) if row == lineno]
+
+    def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
+        # Get the highlight positions.
+        positions = self._get_positions(cli, document)
+
         # Apply if positions were found at this line.
-        if positions:
-            for row, col in positions:
-                if row == lineno:
-                    col = source_to_display(col)
-                    tokens = explode_tokens(tokens)
-                    token, text = tokens[col]
+        overlays = []
 
-                    if col == document.cursor_position_col:
-                        token += (':', ) + Token.MatchingBracket.Cursor
-                    else:
-                        token += (':', ) + Token.MatchingBracket.Other
+        for row, col in positions:
+            if row == lineno:
+                col = source_to_display(col)
 
-                    tokens[col] = (token, text)
+                if col == document.cursor_position_col:
+                    overlays.append((col, col + 1, (':', ) + Token.MatchingBracket.Cursor))
+                else:
+                    overlays.append((col, col + 1, (':', ) + Token.MatchingBracket.Other))
 
-        return Transformation(tokens)
+        return Transformation(tokens, overlays=overlays)
 
 
 class DisplayMultipleCursors(Processor):
@@ -274,12 +356,21 @@ class DisplayMultipleCursors(Processor):
     def __init__(self, buffer_name):
         self.buffer_name = buffer_name
 
+    def get_cache_key(self, cli, document, lineno):
+        if self._insert_multiple(cli):
+            start_pos = document.translate_row_col_to_index(lineno, 0)
+            end_pos = start_pos + len(document.lines[lineno])
+
+            return [p - start_pos for p in cli.buffers[self.buffer_name].multiple_cursor_positions
+                    if start_pos <= p <= end_pos]
+        return False
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         buff = cli.buffers[self.buffer_name]
 
         if self._insert_multiple(cli):
             positions = buff.multiple_cursor_positions
-            tokens = explode_tokens(tokens)
+            overlays = []
 
             # If any cursor appears on the current line, highlight that.
             start_pos = document.translate_row_col_to_index(lineno, 0)
@@ -290,15 +381,11 @@ class DisplayMultipleCursors(Processor):
             for p in positions:
                 if start_pos <= p < end_pos:
                     column = source_to_display(p - start_pos)
-
-                    # Replace token.
-                    token, text = tokens[column]
-                    token += token_suffix
-                    tokens[column] = (token, text)
+                    overlays.append((column, column + 1, token_suffix))
                 elif p == end_pos:
-                    tokens.append((token_suffix, ' '))
+                    tokens = tokens + [(token_suffix, ' ')]
 
-            return Transformation(tokens)
+            return Transformation(tokens, overlays=overlays)
         else:
             return Transformation(tokens)
 
@@ -315,6 +402,11 @@ class BeforeInput(Processor):
         assert callable(get_tokens)
         self.get_tokens = get_tokens
 
+    def get_cache_key(self, cli, document, lineno):
+        if lineno == 0:
+            return self.get_tokens(cli)
+        return ()
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         if lineno == 0:
             tokens_before = self.get_tokens(cli)
@@ -357,6 +449,11 @@ class AfterInput(Processor):
         assert callable(get_tokens)
         self.get_tokens = get_tokens
 
+    def get_cache_key(self, cli, document, lineno):
+        if lineno == document.line_count - 1:
+            return self.get_tokens(cli)
+        return ()
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         # Insert tokens after the last line.
         if lineno == document.line_count - 1:
@@ -397,16 +494,23 @@ class AppendAutoSuggestion(Processor):
         else:
             return cli.current_buffer
 
+    def _get_suggestion(self, cli):
+        buffer = self._get_buffer(cli)
+
+        if buffer.suggestion and buffer.document.is_cursor_at_the_end:
+            return buffer.suggestion.text
+        else:
+            return ''
+
+    def get_cache_key(self, cli, document, lineno):
+        if lineno == document.line_count - 1:
+            return self._get_suggestion(cli)
+        return ()
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         # Insert tokens after the last line.
         if lineno == document.line_count - 1:
-            buffer = self._get_buffer(cli)
-
-            if buffer.suggestion and buffer.document.is_cursor_at_the_end:
-                suggestion = buffer.suggestion.text
-            else:
-                suggestion = ''
-
+            suggestion = self._get_suggestion(cli)
             return Transformation(tokens=tokens + [(self.token, suggestion)])
         else:
             return Transformation(tokens=tokens)
@@ -433,17 +537,17 @@ class ShowLeadingWhiteSpaceProcessor(Processor):
         self.token = token
         self.get_char = get_char
 
+    def get_cache_key(self, cli, document, lineno):
+        return self.get_char(cli)
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
-        # Walk through all te tokens.
-        if tokens and token_list_to_text(tokens).startswith(' '):
-            t = (self.token, self.get_char(cli))
-            tokens = explode_tokens(tokens)
-
-            for i in range(len(tokens)):
-                if tokens[i][1] == ' ':
-                    tokens[i] = t
-                else:
-                    break
+        if tokens:
+            text = token_list_to_text(tokens)
+
+            if text.startswith(' '):
+                count = len(text) - len(text.lstrip(' '))
+                _, after = _split_tokens(tokens, count)
+                tokens = [(self.token, self.get_char(cli) * count)] + after
 
         return Transformation(tokens)
 
@@ -469,19 +573,15 @@ class ShowTrailingWhiteSpaceProcessor(Processor):
         self.token = token
         self.get_char = get_char
 
+    def get_cache_key(self, cli, document, lineno):
+        return self.get_char(cli)
 
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         if tokens and tokens[-1][1].endswith(' '):
-            t = (self.token, self.get_char(cli))
-            tokens = explode_tokens(tokens)
-
-            # Walk backwards through all te tokens and replace whitespace.
-            for i in range(len(tokens) - 1, -1, -1):
-                char = tokens[i][1]
-                if char == ' ':
-                    tokens[i] = t
-                else:
-                    break
+            text = token_list_to_text(tokens)
+            count = len(text) - len(text.rstrip(' '))
+            before, _ = _split_tokens(tokens, len(text) - count)
+            tokens = before + [(self.token, self.get_char(cli) * count)]
 
         return Transformation(tokens)
 
@@ -507,6 +607,9 @@ class TabsProcessor(Processor):
         self.tabstop = tabstop
         self.token = token
 
+    def get_cache_key(self, cli, document, lineno):
+        return int(self.tabstop), self.get_char1(cli), self.get_char2(cli)
+
     def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
         tabstop = int(self.tabstop)
         token = self.token
@@ -516,45 +619,72 @@ class TabsProcessor(Processor):
         separator2 = self.get_char2(cli)
 
         # Transform tokens.
-        tokens = explode_tokens(tokens)
-
-        position_mappings = {}
         result_tokens = []
         pos = 0
-
-        for i, token_and_text in enumerate(tokens):
-            position_mappings[i] = pos
-
-            if token_and_text[1] == '\t':
-                # Calculate how many characters we have to insert.
-                count = tabstop - (pos % tabstop)
-                if count == 0:
-                    count = tabstop
-
-                # Insert tab.
-                result_tokens.append((token, separator1))
-                result_tokens.append((token, separator2 * (count - 1)))
-                pos += count
-            else:
-                result_tokens.append(token_and_text)
-                pos += 1
-
-        position_mappings[len(tokens)] = pos
+        source_pos = 0
+
+        # For every tab: the source position, the display position and the
+        # amount of characters that it takes.
+        tab_source_positions = []
+        tab_display_positions = []
+        tab_widths = []
+
+        for item in tokens:
+            text = item[1]
+
+            if '\t' not in text:
+                result_tokens.append(item)
+                pos += len(text)
+                source_pos += len(text)
+                continue
+
+            for i, part in enumerate(text.split('\t')):
+                if i > 0:
+                    # Calculate how many characters we have to insert.
+                    count = tabstop - (pos % tabstop)
+                    if count == 0:
+                        count = tabstop
+
+                    # Insert tab.
+                    result_tokens.append((token, separator1))
+                    result_tokens.append((token, separator2 * (count - 1)))
+
+                    tab_source_positions.append(source_pos)
+                    tab_display_positions.append(pos)
+                    tab_widths.append(count)
+                    pos += count
+                    source_pos += 1
+
+                if part:
+                    result_tokens.append((item[0], part) + item[2:])
+                    pos += len(part)
+                    source_pos += len(part)
+
+        source_length = source_pos
 
         def source_to_display(from_position):
             " Maps original cursor position to the new one. "
-            return position_mappings[from_position]
+            # Number of tabs before this position.
+            i = bisect_right(tab_source_positions, from_position - 1)
+            if i:
+                return from_position - tab_source_positions[i - 1] + tab_display_positions[i - 1] + tab_widths[i - 1] - 1
+            return from_position
 
         def display_to_source(display_pos):
             " Maps display cursor position to the original one. "
-            position_mappings_reversed = dict((v, k) for k, v in position_mappings.items())
-
-            while display_pos >= 0:
-                try:
-                    return position_mappings_reversed[display_pos]
-                except KeyError:
-                    display_pos -= 1
-            return 0
+            if display_pos < 0:
+                return 0
+
+            # Number of tabs that start before or at this position.
+            i = bisect_right(tab_display_positions, display_pos)
+            if i:
+                offset = display_pos - tab_display_positions[i - 1]
+                if offset < tab_widths[i - 1]:
+                    return tab_source_positions[i - 1]
+                result = tab_source_positions[i - 1] + 1 + offset - tab_widths[i - 1]
+            else:
+                result = display_pos
+            return min(result, source_length)
 
         return Transformation(
             result_tokens,
@@ -594,6 +724,15 @@ class ConditionalProcessor(Processor):
         else:
             return Transformation(tokens)
 
+    def get_cache_key(self, cli, document, lineno):
+        if self.filter(cli):
+            key = self.processor.get_cache_key(cli, document, lineno)
+            if key is not None:
+                return True, key
+            return None
+        else:
+            return False
+
     def has_focus(self, cli):
         if self.filter(cli):
             return self.processor.has_focus(cli)
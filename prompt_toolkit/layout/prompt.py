@@ -45,16 +45,24 @@ class DefaultPrompt(Processor):
             return [(Token.Prompt, message)]
         return cls(get_message_tokens)
 
-    def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
+    def _get_tokens_before(self, cli):
         # Get text before cursor.
         if cli.is_searching:
-            before = _get_isearch_tokens(cli)
+            return _get_isearch_tokens(cli)
 
         elif cli.input_processor.arg is not None:
-            before = _get_arg_tokens(cli)
+            return _get_arg_tokens(cli)
 
         else:
-            before = self.get_tokens(cli)
+            return self.get_tokens(cli)
+
+    def get_cache_key(self, cli, document, lineno):
+        # The width of the prompt is used for the indentation of the
+        # following lines.
+        return self._get_tokens_before(cli)
+
+    def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
+        before = self._get_tokens_before(cli)
 
         # Insert before buffer text.
         shift_position = token_list_len(before)
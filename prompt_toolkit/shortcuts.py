@@ -55,13 +55,6 @@ import textwrap
 import threading
 import time
 
-try:
-    from pygments.lexer import Lexer as pygments_Lexer
-    from pygments.style import Style as pygments_Style
-except ImportError:
-    pygments_Lexer = None
-    pygments_Style = None
-
 if is_windows():
     from .terminal.win32_output import Win32Output
     from .terminal.conemu_output import ConEmuOutput
@@ -84,18 +77,23 @@ __all__ = (
 )
 
 
-def create_eventloop(inputhook=None, recognize_win32_paste=True):
+def create_eventloop(inputhook=None, recognize_win32_paste=True,
+                     recognize_posix_paste=False):
     """
     Create and return an
     :class:`~prompt_toolkit.eventloop.base.EventLoop` instance for a
     :class:`~prompt_toolkit.interface.CommandLineInterface`.
+
+    :param recognize_posix_paste: Detect pastes on terminals without
+        bracketed paste support. (See
+        :class:`~prompt_toolkit.eventloop.posix.PosixEventLoop`.)
     """
     if is_windows():
         from prompt_toolkit.eventloop.win32 import Win32EventLoop as Loop
         return Loop(inputhook=inputhook, recognize_paste=recognize_win32_paste)
     else:
         from prompt_toolkit.eventloop.posix import PosixEventLoop as Loop
-        return Loop(inputhook=inputhook)
+        return Loop(inputhook=inputhook, recognize_paste=recognize_posix_paste)
 
 
 def create_output(stdout=None, true_color=False, ansi_colors_only=None):
@@ -145,6 +143,17 @@ def create_asyncio_eventloop(loop=None):
     return AsyncioEventLoop(loop)
 
 
+def _is_pygments_subclass(cls, module_name, class_name):
+    """
+    True when `cls` is a subclass of the given Pygments class.
+
+    (This doesn't import Pygments. When `cls` is a Pygments class, its module
+    has been imported already.) Raises `TypeError` when `cls` is not a class.
+    """
+    module = sys.modules.get(module_name)
+    return module is not None and issubclass(cls, getattr(module, class_name))
+
+
 def _split_multiline_prompt(get_prompt_tokens):
     """
     Take a `get_prompt_tokens` function and return three new functions instead.
@@ -245,7 +254,7 @@ def create_prompt_layout(message='', lexer=None, is_password=False,
     # class is given, turn it into a PygmentsLexer. (Important for
     # backwards-compatibility.)
     try:
-        if pygments_Lexer and issubclass(lexer, pygments_Lexer):
+        if _is_pygments_subclass(lexer, 'pygments.lexer', 'Lexer'):
             lexer = PygmentsLexer(lexer, sync_from_start=True)
     except TypeError: # Happens when lexer is `None` or an instance of something else.
         pass
@@ -373,6 +382,7 @@ def create_prompt_application(
         enable_system_bindings=False,
         enable_open_in_editor=False,
         validator=None,
+        validate_while_typing=False,
         completer=None,
         reserve_space_for_menu=8,
         auto_suggest=None,
@@ -392,6 +402,7 @@ def create_prompt_application(
         on_exit=AbortAction.RAISE_EXCEPTION,
         accept_action=AcceptAction.RETURN_DOCUMENT,
         erase_when_done=False,
+        batch_self_insert=False,
         default=''):
     """
     Create an :class:`~Application` instance for a prompt.
@@ -419,6 +430,9 @@ def create_prompt_application(
         the syntax highlighting.
     :param validator: :class:`~prompt_toolkit.validation.Validator` instance
         for input validation.
+    :param validate_while_typing: `bool` or
+        :class:`~prompt_toolkit.filters.SimpleFilter`. Validate in a background
+        thread while typing, and show errors as they are found.
     :param completer: :class:`~prompt_toolkit.completion.Completer` instance
         for input completion.
     :param reserve_space_for_menu: Space to be reserved for displaying the menu.
@@ -445,6 +459,9 @@ def create_prompt_application(
         terminal.
     :param mouse_support: `bool` or :class:`~prompt_toolkit.filters.CLIFilter`
         to enable mouse support.
+    :param batch_self_insert: `bool`. Insert runs of typed or pasted
+        characters as one key press. (Faster pasting in terminals without
+        bracketed paste support.)
     :param default: The default text to be shown in the input buffer. (This can
         be edited by the user.)
     """
@@ -468,7 +485,7 @@ def create_prompt_application(
 
     # Accept Pygments styles as well for backwards compatibility.
     try:
-        if pygments_Style and issubclass(style, pygments_Style):
+        if _is_pygments_subclass(style, 'pygments.style', 'Style'):
             style = style_from_dict(style.styles)
     except TypeError:  # Happens when style is `None` or an instance of something else.
         pass
@@ -494,6 +511,7 @@ def create_prompt_application(
             is_multiline=multiline,
             history=(history or InMemoryHistory()),
             validator=validator,
+            validate_while_typing=validate_while_typing,
             completer=completer,
             auto_suggest=auto_suggest,
             accept_action=accept_action,
@@ -507,6 +525,7 @@ def create_prompt_application(
         editing_mode=editing_mode,
         erase_when_done=erase_when_done,
         reverse_vi_search_direction=True,
+        batch_self_insert=batch_self_insert,
         on_abort=on_abort,
         on_exit=on_exit)
 
@@ -10,12 +10,17 @@ from .from_pygments import *
 from .utils import *
 
 
+_default_style = []  # Created on first use. (Importing the Pygments style is slow.)
+
+
+def _get_default_style():
+    if not _default_style:
+        # Without Pygments, this contains only the prompt_toolkit extensions.
+        _default_style.append(style_from_pygments())
+    return _default_style[0]
+
+
 #: The default built-in style.
 #: (For backwards compatibility, when Pygments is installed, this includes the
 #: default Pygments style.)
-try:
-    import pygments
-except ImportError:
-    DEFAULT_STYLE = style_from_dict(DEFAULT_STYLE_EXTENSIONS)
-else:
-    DEFAULT_STYLE = style_from_pygments()
+DEFAULT_STYLE = DynamicStyle(_get_default_style)
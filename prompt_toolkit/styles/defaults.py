@@ -69,6 +69,8 @@ DEFAULT_STYLE_EXTENSIONS = {
     Token.Menu.Completions:                       'bg:#bbbbbb #000000',
     Token.Menu.Completions.Completion:            '',
     Token.Menu.Completions.Completion.Current:    'bg:#888888 #ffffff',
+    Token.Menu.Completions.Completion.Match:      'underline',
+    Token.Menu.Completions.Completion.Current.Match: 'underline',
     Token.Menu.Completions.Meta:                  'bg:#999999 #000000',
     Token.Menu.Completions.Meta.Current:          'bg:#aaaaaa #000000',
     Token.Menu.Completions.MultiColumnMeta:       'bg:#aaaaaa #000000',
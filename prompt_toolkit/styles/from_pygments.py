@@ -17,16 +17,30 @@ __all__ = (
 )
 
 
-# Following imports are only needed when a ``PygmentsStyle`` class is used.
-try:
+# Pygments is only imported when a Pygments style is used. (Importing
+# `pygments.styles` is slow, because it looks for plugins.)
+_DEFAULT = object()
+
+
+def _get_pygments_default_style():
+    """
+    Return the `DefaultStyle` class of Pygments, or `None` when Pygments is not
+    installed.
+    """
+    try:
+        from pygments.styles.default import DefaultStyle
+    except ImportError:
+        return None
+    else:
+        return DefaultStyle
+
+
+def _is_pygments_style(style_cls):
     from pygments.style import Style as pygments_Style
-    from pygments.styles.default import DefaultStyle as pygments_DefaultStyle
-except ImportError:
-    pygments_Style = None
-    pygments_DefaultStyle = None
+    return issubclass(style_cls, pygments_Style)
 
 
-def style_from_pygments(style_cls=pygments_DefaultStyle,
+def style_from_pygments(style_cls=_DEFAULT,
                         style_dict=None,
                         include_defaults=True):
     """
@@ -39,12 +53,16 @@ def style_from_pygments(style_cls=pygments_DefaultStyle,
         from pygments.styles import get_style_by_name
         style = style_from_pygments(get_style_by_name('monokai'))
 
-    :param style_cls: Pygments style class to start from.
+    :param style_cls: Pygments style class to start from. (The default Pygments
+        style, if not given.)
     :param style_dict: Dictionary for this style. `{Token: style}`.
     :param include_defaults: (`bool`) Include prompt_toolkit extensions.
     """
+    if style_cls is _DEFAULT:
+        style_cls = _get_pygments_default_style()
+
     assert style_dict is None or isinstance(style_dict, dict)
-    assert style_cls is None or issubclass(style_cls, pygments_Style)
+    assert style_cls is None or _is_pygments_style(style_cls)
 
     styles_dict = {}
 
@@ -60,7 +78,7 @@ def style_from_pygments(style_cls=pygments_DefaultStyle,
 class PygmentsStyle(Style):
     " Deprecated. "
     def __new__(cls, pygments_style_cls):
-        assert issubclass(pygments_style_cls, pygments_Style)
+        assert _is_pygments_style(pygments_style_cls)
         return style_from_dict(pygments_style_cls.styles)
 
     def invalidation_hash(self):
@@ -68,7 +86,7 @@ class PygmentsStyle(Style):
 
     @classmethod
     def from_defaults(cls, style_dict=None,
-                      pygments_style_cls=pygments_DefaultStyle,
+                      pygments_style_cls=_DEFAULT,
                       include_extensions=True):
         " Deprecated. "
         return style_from_pygments(
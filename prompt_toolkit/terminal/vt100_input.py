@@ -217,6 +217,15 @@ class _IsPrefixOfLongerMatchCache(dict):
 _IS_PREFIX_OF_LONGER_MATCH_CACHE = _IsPrefixOfLongerMatchCache()
 
 
+# Regex matching any complete escape sequence at a given position: the CPR
+# responses, mouse events and all the escape sequences of `ANSI_SEQUENCES`,
+# longest first.
+_escape_sequence_re = re.compile('|'.join(
+    [re.escape('\x1b[') + r'(?:\d+;\d+R|<?[\d;]+[mM]|M...)'] +
+    [re.escape(k) for k in sorted(ANSI_SEQUENCES, key=len, reverse=True)
+     if k.startswith('\x1b') and len(k) > 1]))
+
+
 class InputStream(object):
     """
     Parser for VT100 input stream.
@@ -254,7 +263,7 @@ class InputStream(object):
         Start the parser coroutine.
         """
         self._input_parser = self._input_parser_generator()
-        self._input_parser.send(None)
+        self._parser_prefix = self._input_parser.send(None)
 
     def _get_match(self, prefix):
         """
@@ -289,8 +298,8 @@ class InputStream(object):
             if retry:
                 retry = False
             else:
-                # Get next character.
-                c = yield
+                # Get next character. (Tell the caller what's still pending.)
+                c = yield prefix
 
                 if c == _Flush:
                     flush = True
@@ -372,30 +381,86 @@ class InputStream(object):
 
                 self.feed(remaining)
 
-        # Handle normal input character by character.
+        # Handle normal input.
         else:
-            for i, c in enumerate(data):
-                if self._in_bracketed_paste:
-                    # Quit loop and process from this position when the parser
-                    # entered bracketed paste.
-                    self.feed(data[i:])
-                    break
-                else:
-                    # Replace \r by \n. (Some clients send \r instead of \n
-                    # when enter is pressed. E.g. telnet and some other
-                    # terminals.)
-
-                    # XXX: We should remove this in a future version. It *is*
-                    #      now possible to recognise the difference.
-                    #      (We remove ICRNL/INLCR/IGNCR below.)
-                    #      However, this breaks IPython and maybe other applications,
-                    #      because they bind ControlJ (\n) for handling the Enter key.
-
-                    #      When this is removed, replace Enter=ControlJ by
-                    #      Enter=ControlM in keys.py.
-                    if c == '\r':
-                        c = '\n'
-                    self._input_parser.send(c)
+            self._feed_chunk(data)
+
+    def _feed_chunk(self, data):
+        """
+        Parse a chunk of normal (not bracketed paste) input.
+
+        Runs of text without escape characters and complete escape sequences
+        are handled at once. Everything else (like an escape sequence that is
+        split over several chunks) goes character by character through the
+        parser coroutine, which takes care of the escape key and `flush`.
+        """
+        find_escape = data.find
+        match_escape_sequence = _escape_sequence_re.match
+        feed_key_callback = self.feed_key_callback
+        pos = 0
+        end = len(data)
+
+        while pos < end:
+            if self._in_bracketed_paste:
+                # Quit loop and process from this position when the parser
+                # entered bracketed paste.
+                self.feed(data[pos:])
+                return
+
+            # The parser is in the middle of a sequence. Feed it the next
+            # character.
+            elif self._parser_prefix:
+                self._send_to_parser(data[pos])
+                pos += 1
+
+            # A run of characters without escape. None of these can be the
+            # start of a longer sequence.
+            elif data[pos] != '\x1b':
+                next_escape = find_escape('\x1b', pos)
+                if next_escape == -1:
+                    next_escape = end
+
+                # Replace \r by \n. (See `_send_to_parser`.)
+                for c in data[pos:next_escape].replace('\r', '\n'):
+                    feed_key_callback(KeyPress(ANSI_SEQUENCES.get(c, c), c))
+
+                pos = next_escape
+
+            # A complete escape sequence.
+            else:
+                m = match_escape_sequence(data, pos)
+
+                if m:
+                    sequence = m.group(0)
+                    key = self._get_match(sequence)
+
+                    if key and not _IS_PREFIX_OF_LONGER_MATCH_CACHE[sequence]:
+                        self._call_handler(key, sequence)
+                        pos = m.end()
+                        continue
+
+                # Unknown or incomplete sequence.
+                self._send_to_parser(data[pos])
+                pos += 1
+
+    def _send_to_parser(self, c):
+        """
+        Send a single character to the parser coroutine.
+        """
+        # Replace \r by \n. (Some clients send \r instead of \n when enter
+        # is pressed. E.g. telnet and some other terminals.)
+
+        # XXX: We should remove this in a future version. It *is* now
+        #      possible to recognise the difference.
+        #      (We remove ICRNL/INLCR/IGNCR below.)
+        #      However, this breaks IPython and maybe other applications,
+        #      because they bind ControlJ (\n) for handling the Enter key.
+
+        #      When this is removed, replace Enter=ControlJ by
+        #      Enter=ControlM in keys.py.
+        if c == '\r':
+            c = '\n'
+        self._parser_prefix = self._input_parser.send(c)
 
     def flush(self):
         """
@@ -409,7 +474,7 @@ class InputStream(object):
         timeout, and processes everything that's still in the buffer as-is, so
         without assuming any characters will folow.
         """
-        self._input_parser.send(_Flush)
+        self._parser_prefix = self._input_parser.send(_Flush)
 
     def feed_and_flush(self, data):
         """
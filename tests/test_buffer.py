@@ -109,3 +109,65 @@ def test_swap_characters_before_cursor(_buffer):
     _buffer.swap_characters_before_cursor()
 
     assert _buffer.text == 'hello wrold'
+
+
+def test_background_validation_results_are_reused():
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.filters import to_simple_filter
+    from prompt_toolkit.validation import Validator, ValidationError
+
+    validated = []
+
+    class _Validator(Validator):
+        def validate(self, document):
+            validated.append(document.text)
+            if 'x' in document.text:
+                raise ValidationError(cursor_position=0, message='No x')
+
+    b = Buffer(validator=_Validator())
+    b.insert_text('abc')
+    assert b.validate()
+
+    b.insert_text('x')
+    assert not b.validate()
+    assert b.cursor_position == 0
+
+    # Without validating while typing, the validator is always called.
+    # (It could depend on some other state.)
+    b.text = 'abc'
+    assert b.validate()
+    assert validated == ['abc', 'abcx', 'abc']
+
+    # A result from the background: shown without moving the cursor, and
+    # reused on accept, as long as the text didn't change.
+    b.validate_while_typing = to_simple_filter(True)
+    b.text = 'abx'
+    b.cursor_position = 1
+    b.set_validation_result(Document('abx', 1), ValidationError(cursor_position=2, message='No x'))
+    assert b.validation_error.message == 'No x'
+    assert b.cursor_position == 1
+
+    assert not b.validate()
+    assert b.cursor_position == 2
+    assert validated == ['abc', 'abcx', 'abc']
+
+    # Editing away and back: the validator is called again.
+    b.text = 'ab'
+    b.text = 'abx'
+    b.cursor_position = 1
+    b.set_validation_result(Document('abx', 1), None)
+    b.text = 'abxx'
+    b.text = 'abx'
+    assert not b.validate()
+    assert validated == ['abc', 'abcx', 'abc', 'abx']
+
+    # A result for a text that changed in the meantime is ignored.
+    b.set_validation_result(Document('other'), None)
+    assert b._async_validation_result is None
+
+    # Assigning another validator drops the result.
+    b.text = 'abc'
+    b.set_validation_result(Document('abc', 3), ValidationError(message='Invalid'))
+    b.validator = None
+    assert b.validation_error is None
+    assert b.validate()
@@ -13,6 +13,7 @@ from prompt_toolkit.history import InMemoryHistory
 from prompt_toolkit.input import PipeInput
 from prompt_toolkit.interface import CommandLineInterface
 from prompt_toolkit.key_binding.manager import KeyBindingManager
+from prompt_toolkit.keys import Keys
 from prompt_toolkit.output import DummyOutput
 from prompt_toolkit.terminal.vt100_input import ANSI_SEQUENCES
 from functools import partial
@@ -29,7 +30,8 @@ def _history():
 
 def _feed_cli_with_input(text, editing_mode=EditingMode.EMACS, clipboard=None,
                          history=None, multiline=False, check_line_ending=True,
-                         pre_run_callback=None):
+                         pre_run_callback=None, batch_self_insert=False,
+                         recognize_paste=False):
     """
     Create a CommandLineInterface, feed it with the given user input and return
     the CLI object.
@@ -40,7 +42,7 @@ def _feed_cli_with_input(text, editing_mode=EditingMode.EMACS, clipboard=None,
     if check_line_ending:
         assert text.endswith('\n')
 
-    loop = PosixEventLoop()
+    loop = PosixEventLoop(recognize_paste=recognize_paste)
     try:
         inp = PipeInput()
         inp.send_text(text)
@@ -51,6 +53,7 @@ def _feed_cli_with_input(text, editing_mode=EditingMode.EMACS, clipboard=None,
                 editing_mode=editing_mode,
                 clipboard=clipboard or InMemoryClipboard(),
                 key_bindings_registry=KeyBindingManager.for_prompt().registry,
+                batch_self_insert=batch_self_insert,
             ),
             eventloop=loop,
             input=inp,
@@ -456,6 +459,199 @@ def test_prefix_meta():
     assert result.text == 'Xhello'
 
 
+def test_feed_keys_completes_once_per_batch():
+    from prompt_toolkit.contrib.completers import WordCompleter
+    from prompt_toolkit.filters import Condition
+    from prompt_toolkit.key_binding.input_processor import KeyPress
+
+    complete_while_typing_calls = []
+
+    def complete_while_typing():
+        complete_while_typing_calls.append(cli.current_buffer.text)
+        return False
+
+    loop = PosixEventLoop()
+    inp = PipeInput()
+    try:
+        cli = CommandLineInterface(
+            application=Application(
+                buffer=Buffer(completer=WordCompleter(['hello']),
+                              complete_while_typing=Condition(complete_while_typing)),
+                key_bindings_registry=KeyBindingManager.for_prompt().registry),
+            eventloop=loop,
+            input=inp,
+            output=DummyOutput())
+        callbacks = cli.create_eventloop_callbacks()
+
+        callbacks.feed_keys([KeyPress(c, c) for c in 'helo'] + [
+            KeyPress(Keys.Left), KeyPress('l', 'l')])
+
+        assert cli.current_buffer.text == 'hello'
+        assert complete_while_typing_calls == ['hello']
+    finally:
+        loop.close()
+        inp.close()
+
+
+def test_feed_keys_stops_when_done():
+    # A character binding that returns. The keys after it, that were read at
+    # the same time, are ignored.
+    def add_binding(cli):
+        cli.application.key_bindings_registry.add_binding('q')(
+            lambda event: event.cli.set_return_value('returned'))
+
+    result, cli = _feed_cli_with_input(
+        'abqxyz', check_line_ending=False, pre_run_callback=add_binding)
+    assert result == 'returned'
+    assert cli.current_buffer.text == 'ab'
+    assert not cli.input_processor.input_queue
+
+
+def test_feed_keys_passes_remaining_keys_to_sub_application():
+    # The keys after the one that started a sub application, that were read
+    # at the same time, go to the sub application.
+    def add_binding(cli):
+        @cli.application.key_bindings_registry.add_binding('q')
+        def _(event):
+            event.cli.run_sub_application(
+                Application(buffer=Buffer(accept_action=AcceptAction.RETURN_DOCUMENT)),
+                done_callback=lambda result: event.cli.set_return_value(result.text))
+
+    result, cli = _feed_cli_with_input(
+        'abqxyz\n', pre_run_callback=add_binding)
+    assert result == 'xyz'
+    assert cli.current_buffer.text == 'ab'
+
+
+def test_paste_without_bracketed_paste():
+    # When a lot of input arrives at once, it's considered pasted: the
+    # newlines are inserted instead of accepting the input.
+    def setup_keybindings(cli):
+        @cli.application.key_bindings_registry.add_binding(Keys.ControlQ)
+        def _(event):
+            event.cli.set_return_value(event.current_buffer.document)
+
+    text = 'hello world\n' * 100
+    result, cli = _feed_cli_with_input(
+        text + '\x11', pre_run_callback=setup_keybindings, check_line_ending=False,
+        recognize_paste=True)
+    assert result.text == text
+
+    # Tabs and carriage returns are pasted as well.
+    text = 'hello\tworld\r' * 100
+    result, cli = _feed_cli_with_input(
+        text + '\x11', pre_run_callback=setup_keybindings, check_line_ending=False,
+        recognize_paste=True)
+    assert result.text == 'hello\tworld\n' * 100
+
+    # Unless paste recognition is enabled, the first newline accepts.
+    result, cli = _feed_cli_with_input('hello world\n' * 100)
+    assert result.text == 'hello world'
+
+
+def test_paste_lasts_until_input_timeout():
+    # The last read of a large paste is small. It's still part of the paste.
+    import threading
+    import time
+
+    loop = PosixEventLoop(recognize_paste=True)
+    inp = PipeInput()
+
+    def send():
+        inp.send_text('hello world\n' * 100)
+        time.sleep(.05)
+        inp.send_text('last\n')
+
+        # After the input timeout, the newline accepts again.
+        time.sleep(1)
+        inp.send_text('\n')
+
+    try:
+        cli = CommandLineInterface(
+            application=Application(
+                buffer=Buffer(accept_action=AcceptAction.RETURN_DOCUMENT),
+                key_bindings_registry=KeyBindingManager.for_prompt().registry),
+            eventloop=loop,
+            input=inp,
+            output=DummyOutput())
+
+        t = threading.Thread(target=send)
+        t.start()
+        result = cli.run()
+        t.join()
+    finally:
+        loop.close()
+        inp.close()
+
+    assert result.text == 'hello world\n' * 100 + 'last\n'
+
+
+def test_batch_self_insert():
+    def count_key_presses(key_presses, cli):
+        def handler(input_processor):
+            key_presses.append(True)
+        cli.input_processor.beforeKeyPress += handler
+
+    key_presses = []
+    result, cli = _feed_cli_with_input(
+        'hello world\n', pre_run_callback=partial(count_key_presses, key_presses))
+    assert result.text == 'hello world'
+    assert not cli.input_processor.batch_self_insert
+    assert len(key_presses) == 12
+
+    # The first character is inserted separately, the others in one run.
+    key_presses = []
+    result, cli = _feed_cli_with_input(
+        'hello world\n', batch_self_insert=True,
+        pre_run_callback=partial(count_key_presses, key_presses))
+    assert result.text == 'hello world'
+    assert len(key_presses) == 3
+
+
+def test_fast_typing_is_not_a_paste():
+    # Lots of input, but in small reads, like when holding down a key. Enter
+    # still accepts the input.
+    import threading
+    import time
+
+    loop = PosixEventLoop(recognize_paste=True)
+    inp = PipeInput()
+    done = threading.Event()
+
+    def send():
+        for _ in range(3):
+            inp.send_text('a' * 600)
+            time.sleep(.05)
+        inp.send_text('\n')
+
+        # (Don't hang when the newline was not accepted.)
+        if not done.wait(2):
+            inp.send_text('\x11')
+
+    try:
+        registry = KeyBindingManager.for_prompt().registry
+        registry.add_binding(Keys.ControlQ)(lambda event: event.cli.set_return_value(None))
+
+        cli = CommandLineInterface(
+            application=Application(
+                buffer=Buffer(accept_action=AcceptAction.RETURN_DOCUMENT),
+                key_bindings_registry=registry),
+            eventloop=loop,
+            input=inp,
+            output=DummyOutput())
+
+        t = threading.Thread(target=send)
+        t.start()
+        result = cli.run()
+        done.set()
+        t.join()
+    finally:
+        loop.close()
+        inp.close()
+
+    assert result.text == 'a' * 1800
+
+
 def test_bracketed_paste():
     result, cli = _feed_cli_with_input('\x1b[200~hello world\x1b[201~\n')
     assert result.text == 'hello world'
@@ -627,3 +823,63 @@ def test_vi_character_paste():
     result, cli = feed('abcde\x1bhhxP\n')
     assert result.text == 'abcde'
     assert result.cursor_position == 2
+
+
+def test_validate_while_typing():
+    from prompt_toolkit.key_binding.input_processor import KeyPress
+    from prompt_toolkit.validation import Validator, ValidationError
+
+    class _Validator(Validator):
+        def validate(self, document):
+            if document.text == 'boom':
+                raise RuntimeError
+            if 'x' in document.text:
+                raise ValidationError(message='No x')
+
+    class _EventLoop(PosixEventLoop):
+        def __init__(self):
+            PosixEventLoop.__init__(self)
+            self.executor_calls = []
+            self.calls = []
+
+        def run_in_executor(self, callback):
+            self.executor_calls.append(callback)
+
+        def call_from_executor(self, callback, _max_postpone_until=None):
+            self.calls.append(callback)
+
+    loop = _EventLoop()
+    inp = PipeInput()
+    try:
+        cli = CommandLineInterface(
+            application=Application(
+                buffer=Buffer(validator=_Validator(), validate_while_typing=True),
+                key_bindings_registry=KeyBindingManager.for_prompt().registry),
+            eventloop=loop,
+            input=inp,
+            output=DummyOutput())
+        callbacks = cli.create_eventloop_callbacks()
+
+        # Nothing happens until the user stops typing.
+        callbacks.feed_keys([KeyPress(c, c) for c in 'boom'])
+        assert loop.executor_calls == []
+
+        callbacks.input_timeout()
+        assert len(loop.executor_calls) == 1
+
+        # A validator that crashes doesn't disable the validation.
+        with pytest.raises(RuntimeError):
+            loop.executor_calls.pop()()
+
+        callbacks.feed_keys([KeyPress('x', 'x')])
+        callbacks.input_timeout()
+        assert len(loop.executor_calls) == 1
+
+        loop.executor_calls.pop()()
+        for c in loop.calls:
+            c()
+
+        assert cli.current_buffer.validation_error.message == 'No x'
+    finally:
+        loop.close()
+        inp.close()
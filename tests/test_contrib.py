@@ -10,7 +10,9 @@ from six import text_type
 
 from prompt_toolkit.completion import CompleteEvent
 from prompt_toolkit.document import Document
-from prompt_toolkit.contrib.completers.filesystem import PathCompleter
+from prompt_toolkit.contrib.completers.base import WordCompleter
+from prompt_toolkit.contrib.completers.filesystem import PathCompleter, ExecutableCompleter, _DirectoryCache, _ExecutableIndex
+from prompt_toolkit.contrib.completers.fuzzy import FuzzyCompleter
 
 
 @contextmanager
@@ -251,3 +253,143 @@ def test_pathcompleter_get_paths_constrains_path():
 
     # cleanup
     shutil.rmtree(test_dir)
+
+
+def test_pathcompleter_sees_new_files():
+    test_dir = tempfile.mkdtemp()
+    write_test_files(test_dir, ['a1', 'a2'])
+
+    completer = PathCompleter()
+    doc_text = os.path.join(test_dir, 'a')
+    doc = Document(doc_text, len(doc_text))
+    event = CompleteEvent()
+
+    completions = list(completer.get_completions(doc, event))
+    assert ['1', '2'] == [c.text for c in completions]
+
+    write_test_files(test_dir, ['a0', 'a3'])
+    completions = list(completer.get_completions(doc, event))
+    assert ['0', '1', '2', '3'] == [c.text for c in completions]
+
+    # cleanup
+    shutil.rmtree(test_dir)
+
+
+def test_directory_cache_is_invalidated_by_mtime():
+    test_dir = tempfile.mkdtemp()
+    write_test_files(test_dir, ['b', 'a'])
+
+    # Pretend that the directory was last modified a while ago.
+    os.utime(test_dir, (0, 0))
+
+    cache = _DirectoryCache()
+    listing = cache.get_listing(test_dir)
+    assert listing.names == ['a', 'b']
+    assert cache.get_listing(test_dir) is listing
+
+    write_test_files(test_dir, ['c'])
+    listing2 = cache.get_listing(test_dir)
+    assert listing2 is not listing
+    assert listing2.names == ['a', 'b', 'c']
+
+    # cleanup
+    shutil.rmtree(test_dir)
+
+
+def test_executablecompleter_completes_from_path():
+    test_dir = tempfile.mkdtemp()
+    write_test_files(test_dir, ['prog1', 'prog2', 'other', 'prog-data'])
+    os.mkdir(os.path.join(test_dir, 'prog-dir'))
+    for name in ['prog1', 'prog2', 'other']:
+        os.chmod(os.path.join(test_dir, name), 0o755)
+
+    orig_path = os.environ.get('PATH', '')
+    os.environ['PATH'] = test_dir
+
+    try:
+        completer = ExecutableCompleter()
+        doc_text = 'pro'
+        doc = Document(doc_text, len(doc_text))
+        event = CompleteEvent()
+
+        completions = list(completer.get_completions(doc, event))
+        assert ['prog1', 'prog2'] == [c.display for c in completions]
+        assert ['g1', 'g2'] == [c.text for c in completions]
+
+        # The index is refreshed when the directory changes.
+        write_test_files(test_dir, ['prog3'])
+        os.chmod(os.path.join(test_dir, 'prog3'), 0o755)
+        completions = list(completer.get_completions(doc, event))
+        assert ['prog1', 'prog2', 'prog3'] == [c.display for c in completions]
+    finally:
+        os.environ['PATH'] = orig_path
+
+    # cleanup
+    shutil.rmtree(test_dir)
+
+
+def test_executable_index_rebuilds_recently_modified_directories():
+    test_dir = tempfile.mkdtemp()
+    write_test_files(test_dir, ['prog1'])
+    os.chmod(os.path.join(test_dir, 'prog1'), 0o755)
+    mtime = os.stat(test_dir).st_mtime
+
+    orig_path = os.environ.get('PATH', '')
+    os.environ['PATH'] = test_dir
+
+    try:
+        index = _ExecutableIndex()
+        assert index.get_names() == ['prog1']
+
+        # Installed in the same mtime tick: still found.
+        write_test_files(test_dir, ['prog2'])
+        os.chmod(os.path.join(test_dir, 'prog2'), 0o755)
+        os.utime(test_dir, (mtime, mtime))
+        assert index.get_names() == ['prog1', 'prog2']
+    finally:
+        os.environ['PATH'] = orig_path
+
+    # cleanup
+    shutil.rmtree(test_dir)
+
+
+def test_fuzzycompleter_matches_subsequences():
+    completer = FuzzyCompleter(WordCompleter(['leopard', 'gorilla', 'dinosaur', 'cat', 'bee']))
+
+    doc_text = 'oar'
+    doc = Document(doc_text, len(doc_text))
+    completions = list(completer.get_completions(doc, CompleteEvent()))
+
+    assert [c.text for c in completions] == ['leopard', 'dinosaur']
+    assert all(c.start_position == -3 for c in completions)
+    assert completions[0].match_positions == [2, 4, 5]
+
+
+def test_fuzzycompleter_orders_compact_matches_first():
+    completer = FuzzyCompleter(WordCompleter(['a_b_c', 'xabc', 'abc', 'ABCD']))
+
+    doc_text = 'abc'
+    doc = Document(doc_text, len(doc_text))
+    completions = list(completer.get_completions(doc, CompleteEvent()))
+
+    assert [c.text for c in completions] == ['abc', 'ABCD', 'xabc', 'a_b_c']
+
+
+def test_fuzzycompleter_keeps_max_results():
+    words = ['item%i' % i for i in range(100)]
+    completer = FuzzyCompleter(WordCompleter(words), max_results=5)
+
+    doc_text = 'i9'
+    doc = Document(doc_text, len(doc_text))
+    completions = list(completer.get_completions(doc, CompleteEvent()))
+
+    assert [c.text for c in completions] == ['item9', 'item90', 'item91', 'item92', 'item93']
+
+
+def test_fuzzycompleter_without_input_returns_all_completions():
+    completer = FuzzyCompleter(WordCompleter(['a', 'b']))
+
+    doc = Document('', 0)
+    completions = list(completer.get_completions(doc, CompleteEvent()))
+
+    assert [c.text for c in completions] == ['a', 'b']
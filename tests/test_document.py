@@ -72,3 +72,47 @@ def test_translate_index_to_position(document):
 
     pos = document.translate_index_to_position(0)
     assert pos == (0, 0)
+
+
+def test_find_uses_search_match_index():
+    document = Document('aaa bAb aab', 4)
+
+    assert document.find('b') == 2
+    assert document.find('b', include_current_position=True) == 0
+    assert document.find('b', count=2) == 6
+    assert document.find('ab', ignore_case=True) == 1
+    assert document.find('x') is None
+
+    assert document.find_backwards('a') == -2
+    assert document.find_backwards('aa', count=2) is None
+    assert document.find_backwards('AA', ignore_case=True) == -3
+
+    # Overlapping occurrences are all found.
+    assert Document('aaaa', 0).find('aa') == 1
+    assert Document('aaaa', 0).find_all('aa') == [0, 2]
+
+    assert document.get_search_matches('b') is document.get_search_matches('b')
+    assert document.get_search_match_count('b') == (1, 3)
+    assert document.get_search_match_count('x') == (0, 0)
+
+    # The count agrees with `find_all`.
+    assert Document('aaaa', 0).get_search_match_count('aa') == (1, 2)
+    assert Document('aaaa', 3).get_search_match_count('aa') == (2, 2)
+
+
+def test_find_matching_bracket_position():
+    text = '(a [b] <c) d] ' + 'x' * 2000 + ')'
+    document = Document(text, 0)
+
+    assert document.find_matching_bracket_position() == 9
+    assert Document(text, 9).find_matching_bracket_position() == -9
+    assert Document(text, 3).find_matching_bracket_position() == 2
+
+    # Unmatched brackets.
+    assert Document(text, 7).find_matching_bracket_position() == 0
+    assert Document(text, 12).find_matching_bracket_position() == 0
+    assert Document(text, len(text) - 1).find_matching_bracket_position() == 0
+
+    # Limits.
+    assert document.find_matching_bracket_position(end_pos=9) == 0
+    assert Document('(' + 'x' * 2000 + ')', 0).find_matching_bracket_position() == 2001
@@ -166,3 +166,98 @@ def test_cli_filters():
     assert isinstance(HasArg(), CLIFilter)
     assert isinstance(HasFocus('BUFFER_NAME'), CLIFilter)
     assert isinstance(HasSelection(), CLIFilter)
+
+
+def test_cached_filter_evaluation():
+    from prompt_toolkit.filters import CachedFilterEvaluation
+
+    calls = []
+
+    def func(a):
+        calls.append(a)
+        return a > 1
+
+    c = Condition(func)
+    not_cached = Condition(func, cacheable=False)
+    combined = ~c & Condition(lambda a: True)
+
+    with CachedFilterEvaluation():
+        assert c(1) is False
+        assert c(1) is False
+        assert c(2) is True
+        assert combined(1) is True
+
+        with CachedFilterEvaluation():
+            assert c(1) is False
+
+        assert c(1) is False
+        assert calls == [1, 2]
+
+        assert not_cached(1) is False
+        assert not_cached(1) is False
+        assert calls == [1, 2, 1, 1]
+
+    # Outside of the scope, nothing is cached.
+    assert c(1) is False
+    assert calls == [1, 2, 1, 1, 1]
+
+
+def test_compiled_filter_order():
+    calls = []
+
+    class _Cheap(Filter):
+        cost = 1
+
+        def __call__(self):
+            calls.append('cheap')
+            return False
+
+    def expensive(name):
+        def func():
+            calls.append(name)
+            return True
+        return Condition(func)
+
+    e1 = expensive('e1')
+    e2 = expensive('e2')
+    cheap = _Cheap()
+
+    # The cheap filter goes first. The others keep their order.
+    f = e1 & (e2 | e1) & cheap
+    assert f() is False
+    assert calls == ['cheap']
+
+    del calls[:]
+    assert (~cheap & e1 & e2 & e1)() is True
+    assert calls == ['cheap', 'e1', 'e2']
+
+
+def test_compiled_filter_keeps_position_of_filters_without_cost():
+    calls = []
+
+    class _Guarded(Filter):
+        def __call__(self):
+            calls.append('guarded')
+            return True
+
+    class _Cheap(Filter):
+        cost = 1
+
+        def __call__(self):
+            calls.append('cheap')
+            return True
+
+    def guard():
+        calls.append('guard')
+        return False
+
+    # A filter without cost is never evaluated before the `Condition` that
+    # guards it, and the cheap filter doesn't move across it.
+    f = Condition(guard) & _Guarded() & _Cheap()
+    assert f() is False
+    assert calls == ['guard']
+
+    del calls[:]
+    f = _Guarded() & Condition(guard) & _Cheap()
+    assert f() is False
+    assert calls == ['guarded', 'cheap', 'guard']
@@ -1,8 +1,10 @@
 from __future__ import unicode_literals
 
+from prompt_toolkit.eventloop.posix_utils import PosixStdinReader
 from prompt_toolkit.terminal.vt100_input import InputStream
 from prompt_toolkit.keys import Keys
 
+import os
 import pytest
 
 
@@ -140,3 +142,58 @@ def test_cpr_response_2(processor, stream):
     assert len(processor.keys) == 2
     assert processor.keys[0].key == Keys.CPRResponse
     assert processor.keys[1].key == Keys.ControlJ
+
+
+def test_chunk_with_text_and_sequences(processor, stream):
+    stream.feed('ab\r\x1b[A\x1b[<64;85;12Mc\x1b[1;3D\x1b')
+
+    assert [k.key for k in processor.keys] == [
+        'a', 'b', Keys.ControlJ, Keys.Up, Keys.Vt100MouseEvent, 'c',
+        Keys.Escape, Keys.Left]
+    assert processor.keys[2].data == '\n'
+    assert processor.keys[4].data == '\x1b[<64;85;12M'
+
+    # The trailing escape is kept until we know what follows.
+    stream.feed('[B')
+    assert processor.keys[-1].key == Keys.Down
+    assert processor.keys[-1].data == '\x1b[B'
+
+    stream.feed('\x1b')
+    stream.flush()
+    assert processor.keys[-1].key == Keys.Escape
+
+
+def test_bracketed_paste_in_chunk(processor, stream):
+    stream.feed('a\x1b[200~x\ry\x1b[201~b')
+
+    assert len(processor.keys) == 3
+    assert processor.keys[0].key == 'a'
+    assert processor.keys[1].key == Keys.BracketedPaste
+    assert processor.keys[1].data == 'x\ry'
+    assert processor.keys[2].key == 'b'
+
+
+def test_posix_stdin_reader_reads_everything_available():
+    r, w = os.pipe()
+    try:
+        os.write(w, b'x' * 10000)
+        reader = PosixStdinReader(r, max_read_size=8000)
+
+        assert reader.read() == 'x' * 8000
+        assert reader.last_chunk_count == 4
+        assert reader.read() == 'x' * 2000
+        assert reader.last_chunk_count == 2
+
+        # What's typed arrives in one chunk.
+        os.write(w, b'j')
+        assert reader.read() == 'j'
+        assert reader.last_chunk_count == 1
+
+        os.close(w)
+        w = None
+        assert reader.read() == ''
+        assert reader.closed
+    finally:
+        os.close(r)
+        if w is not None:
+            os.close(w)
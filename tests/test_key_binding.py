@@ -138,3 +138,176 @@ def test_previous_key_sequence(processor, handlers):
     assert events[1].previous_key_sequence[0].data == 'a'
     assert events[1].previous_key_sequence[1].key == 'a'
     assert events[1].previous_key_sequence[1].data == 'a'
+
+
+def test_text_run_is_inserted_at_once(handlers):
+    from prompt_toolkit.buffer import Buffer
+    from prompt_toolkit.enums import EditingMode
+    from prompt_toolkit.key_binding.bindings.named_commands import get_by_name
+
+    class _CLI(object):
+        editing_mode = EditingMode.EMACS
+        current_buffer = Buffer()
+        is_done = False
+        _sub_cli = None
+
+        def invalidate(self):
+            pass
+
+    registry = Registry()
+    registry.add_binding(Keys.Any)(get_by_name('self-insert'))
+    registry.add_binding('x', 'y')(handlers.x_y)
+
+    cli = _CLI()
+    processor = InputProcessor(registry, lambda: cli, batch_self_insert=True)
+
+    key_presses = []
+    processor.beforeKeyPress += lambda sender: key_presses.append(True)
+
+    for c in 'hello worxld':
+        processor.feed(KeyPress(c, c))
+    processor.process_keys()
+
+    # The first character is inserted on its own. The 'x' can start a longer
+    # binding, so it ends the run.
+    assert cli.current_buffer.text == 'hello worxld'
+    assert len(key_presses) == 5
+    assert processor._previous_key_sequence[0].data == 'd'
+
+    # Without batching.
+    processor.batch_self_insert = False
+    for c in 'abc':
+        processor.feed(KeyPress(c, c))
+    processor.process_keys()
+
+    assert cli.current_buffer.text == 'hello worxldabc'
+    assert len(key_presses) == 8
+
+
+def test_text_run_evaluates_filters_after_insert(handlers):
+    from prompt_toolkit.buffer import Buffer
+    from prompt_toolkit.enums import EditingMode
+    from prompt_toolkit.filters import Condition
+    from prompt_toolkit.key_binding.bindings.named_commands import get_by_name
+
+    class _CLI(object):
+        editing_mode = EditingMode.EMACS
+        current_buffer = Buffer()
+        is_done = False
+        _sub_cli = None
+
+        def invalidate(self):
+            pass
+
+    registry = Registry()
+    registry.add_binding(Keys.Any)(get_by_name('self-insert'))
+    registry.add_binding(Keys.Any, filter=Condition(lambda cli: cli.current_buffer.text != ''))(
+        handlers.not_empty)
+
+    cli = _CLI()
+    processor = InputProcessor(registry, lambda: cli, batch_self_insert=True)
+
+    for c in 'abc':
+        processor.feed(KeyPress(c, c))
+    processor.process_keys()
+
+    assert cli.current_buffer.text == 'a'
+    assert handlers.called == ['not_empty', 'not_empty']
+
+
+def test_registry_lookups(handlers):
+    from prompt_toolkit.key_binding.registry import MergedRegistry, ConditionalRegistry
+
+    registry = Registry()
+    registry.add_binding(Keys.Any)(handlers.any)
+    registry.add_binding('a')(handlers.a)
+    registry.add_binding(Keys.ControlX, Keys.Any)(handlers.control_x_any)
+    registry.add_binding(Keys.ControlX, 'e')(handlers.control_x_e)
+
+    assert [b.keys for b in registry.get_bindings_for_keys(('a', ))] == [(Keys.Any, ), ('a', )]
+    assert registry.get_bindings_for_keys(('b', ))[0].keys == (Keys.Any, )
+    assert [b.keys for b in registry.get_bindings_for_keys((Keys.ControlX, 'e'))] == [
+        (Keys.ControlX, Keys.Any), (Keys.ControlX, 'e')]
+    assert [b.keys for b in registry.get_bindings_starting_with_keys((Keys.ControlX, ))] == [
+        (Keys.ControlX, Keys.Any), (Keys.ControlX, 'e')]
+    assert registry.get_bindings_starting_with_keys(('a', )) == []
+
+    # The lookups are updated when bindings are added or removed.
+    registry.add_binding('a', 'b')(handlers.a_b)
+    assert [b.keys for b in registry.get_bindings_starting_with_keys(('a', ))] == [('a', 'b')]
+
+    registry.remove_binding(registry.key_bindings[-1].handler)
+    assert registry.get_bindings_starting_with_keys(('a', )) == []
+
+    # Also through a `MergedRegistry`.
+    registry2 = Registry()
+    registry2.add_binding('a', 'c')(handlers.a_c)
+    merged = MergedRegistry([ConditionalRegistry(registry), registry2])
+
+    assert [b.keys for b in merged.get_bindings_for_keys(('a', ))] == [(Keys.Any, ), ('a', )]
+    assert [b.keys for b in merged.get_bindings_starting_with_keys(('a', ))] == [('a', 'c')]
+
+
+def test_keys_without_longer_bindings(processor, registry, handlers):
+    starting_with_keys = []
+
+    def get_bindings_starting_with_keys(keys):
+        starting_with_keys.append(keys)
+        return Registry.get_bindings_starting_with_keys(registry, keys)
+
+    registry.get_bindings_starting_with_keys = get_bindings_starting_with_keys
+
+    assert not processor._is_prefix_of_longer_match([KeyPress('a')])
+    assert not processor._is_prefix_of_longer_match([KeyPress(Keys.ControlD)])
+    assert processor._is_prefix_of_longer_match([KeyPress(Keys.ControlX)])
+    assert starting_with_keys == [(Keys.ControlX, )]
+
+    # After adding a binding, the keys are computed again.
+    registry.add_binding('a', 'b')(handlers.a_b)
+    assert processor._is_prefix_of_longer_match([KeyPress('a')])
+
+
+def test_lazy_registry(handlers):
+    from prompt_toolkit.buffer import Buffer
+    from prompt_toolkit.enums import EditingMode
+    from prompt_toolkit.filters import ViMode
+    from prompt_toolkit.key_binding.registry import MergedRegistry, LazyRegistry
+    from prompt_toolkit.key_binding.vi_state import ViState
+
+    class _CLI(object):
+        editing_mode = EditingMode.EMACS
+        current_buffer = Buffer()
+        is_done = False
+        _sub_cli = None
+        vi_state = ViState()
+
+        def invalidate(self):
+            pass
+
+    loaded = []
+
+    def load():
+        loaded.append(True)
+        registry = Registry()
+        registry.add_binding(Keys.ControlX)(handlers.control_x)
+        return registry
+
+    lazy = LazyRegistry(load, ViMode())
+    cli = _CLI()
+    processor = InputProcessor(MergedRegistry([lazy]), lambda: cli)
+
+    # Not loaded as long as the filter is not active.
+    processor.feed(KeyPress(Keys.ControlX, ''))
+    processor.process_keys()
+
+    assert loaded == []
+    assert handlers.called == []
+
+    # Loaded once, at the first key press after switching to Vi mode.
+    cli.editing_mode = EditingMode.VI
+    processor.feed(KeyPress(Keys.ControlX, ''))
+    processor.feed(KeyPress(Keys.ControlX, ''))
+    processor.process_keys()
+
+    assert loaded == [True]
+    assert handlers.called == ['control_x', 'control_x']
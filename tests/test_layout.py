@@ -58,3 +58,318 @@ def test_split_lines_3():
     assert lines == [
         [(Token.A, '')],
     ]
+
+
+class _FakeBuffer(object):
+    def __init__(self, complete_state):
+        self.complete_state = complete_state
+
+
+class _FakeCLI(object):
+    def __init__(self, complete_state):
+        self.current_buffer = _FakeBuffer(complete_state)
+
+
+def test_multi_column_completion_menu_renders_visible_columns():
+    from prompt_toolkit.buffer import CompletionState
+    from prompt_toolkit.completion import Completion
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.menus import MultiColumnCompletionMenuControl
+
+    completions = [Completion('c%03i' % i) for i in range(1000)]
+    cli = _FakeCLI(CompletionState(Document(), completions, complete_index=502))
+    control = MultiColumnCompletionMenuControl()
+
+    # Columns of 5 characters wide, 4 rows: the selected completion is in
+    # column 125.
+    content = control.create_content(cli, width=23, height=4)
+
+    assert content.line_count == 4
+    assert control.scroll == 122
+    assert control._get_completion_at_position(1, 0).text == 'c488'
+    assert control._get_completion_at_position(20, 2).text == 'c502'
+
+    line = content.get_line(2)
+    assert line[0] == (Token.Scrollbar, '<')
+    assert (Token.Menu.Completions.Completion.Current, ' c502') in line
+
+
+def test_completion_statistics_are_stored_on_the_completion_state():
+    from prompt_toolkit.buffer import CompletionState
+    from prompt_toolkit.completion import Completion
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.menus import _get_statistics
+
+    state1 = CompletionState(Document(), [Completion('abc'), Completion('abcdef', display_meta='m')])
+    state2 = CompletionState(Document(), [Completion('a')])
+
+    statistics = _get_statistics(state1)
+    assert statistics.max_display_width == 6
+    assert statistics.has_meta
+    assert _get_statistics(state2).max_display_width == 1
+
+    # Shared with the states for the other indexes of the same completions.
+    assert _get_statistics(state1.go_to_index(1)) is statistics
+
+
+def test_incremental_pygments_lexer():
+    from pygments.lexers import PythonLexer
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.lexers import PygmentsLexer
+
+    def lex_all(lexer, text):
+        document = Document(text)
+        get_line = lexer.lex_document(None, document)
+
+        # (Ignore empty tokens, they depend on where lexing started.)
+        return [[(t, v) for t, v in get_line(i) if v] for i in range(len(document.lines))]
+
+    text = '\n'.join('def f%i():\n    return "%i"\n' % (i, i) for i in range(50))
+    incremental_lexer = PygmentsLexer(PythonLexer, incremental=True)
+    lexer = PygmentsLexer(PythonLexer)
+
+    assert lex_all(incremental_lexer, text) == lex_all(lexer, text)
+
+    # Open a multiline string: all the following lines change.
+    text2 = text.replace('def f10', '"""def f10', 1)
+    assert lex_all(incremental_lexer, text2) == lex_all(lexer, text2)
+
+    # Edit a single line: the lines after the change are reused.
+    assert lex_all(incremental_lexer, text) == lex_all(lexer, text)
+    previous_run = incremental_lexer._last_incremental_run
+
+    text3 = text.replace('def f10', 'def g10', 1)
+    assert lex_all(incremental_lexer, text3) == lex_all(lexer, text3)
+
+    run = incremental_lexer._last_incremental_run
+    assert run.token_lines[90] is previous_run.token_lines[90]
+
+
+def test_threaded_lexer():
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.lexers import SimpleLexer, ThreadedLexer
+
+    executor_calls = []
+    invalidate_calls = []
+
+    class _EventLoop(object):
+        def run_in_executor(self, callback):
+            executor_calls.append(callback)
+
+    class _CLI(object):
+        eventloop = _EventLoop()
+
+        def invalidate(self):
+            invalidate_calls.append(True)
+
+    lexer = ThreadedLexer(SimpleLexer(Token.Name), token=Token.Placeholder, lookahead=10)
+    get_line = lexer.lex_document(_CLI(), Document('\n'.join('line%i' % i for i in range(40))))
+
+    # Placeholder, until the worker did its job.
+    assert get_line(5) == [(Token.Placeholder, 'line5')]
+    assert get_line(20) == [(Token.Placeholder, 'line20')]
+    assert len(executor_calls) == 1
+
+    executor_calls[0]()
+    assert get_line(5) == [(Token.Name, 'line5')]
+    assert get_line(14) == [(Token.Name, 'line14')]
+    assert get_line(20) == [(Token.Name, 'line20')]
+    assert get_line(35) == [(Token.Placeholder, 'line35')]
+    assert len(invalidate_calls) == 2
+
+
+def test_threaded_lexer_reuses_tokens_of_unchanged_lines():
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.lexers import SimpleLexer, ThreadedLexer
+
+    executor_calls = []
+
+    class _EventLoop(object):
+        def run_in_executor(self, callback):
+            executor_calls.append(callback)
+
+    class _CLI(object):
+        eventloop = _EventLoop()
+
+        def invalidate(self):
+            pass
+
+    lexer = ThreadedLexer(SimpleLexer(Token.Name), token=Token.Placeholder, lookahead=10)
+    lines = ['line%i' % i for i in range(10)]
+    get_line = lexer.lex_document(_CLI(), Document('\n'.join(lines)))
+    get_line(0)
+    executor_calls[0]()
+
+    # Insert a line: the other lines keep their tokens until the new worker
+    # is done.
+    get_line = lexer.lex_document(_CLI(), Document('\n'.join(lines[:3] + ['new'] + lines[3:])))
+    assert get_line(0) == [(Token.Name, 'line0')]
+    assert get_line(3) == [(Token.Placeholder, 'new')]
+    assert get_line(4) == [(Token.Name, 'line3')]
+    assert get_line(10) == [(Token.Name, 'line9')]
+    assert len(executor_calls) == 2
+
+    # Also when the previous run was not lexed yet.
+    get_line = lexer.lex_document(_CLI(), Document('\n'.join(lines[:3] + ['newer'] + lines[3:])))
+    assert get_line(4) == [(Token.Name, 'line3')]
+    assert get_line(3) == [(Token.Placeholder, 'newer')]
+
+
+def test_threaded_lexer_serializes_calls_into_the_lexer():
+    import threading
+    import time
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.lexers import Lexer, ThreadedLexer
+
+    active = []
+    overlaps = []
+
+    class _SlowLexer(Lexer):
+        def lex_document(self, cli, document):
+            def get_line(lineno):
+                active.append(True)
+                overlaps.append(len(active) > 1)
+                time.sleep(.001)
+                active.pop()
+                return [(Token.Name, document.lines[lineno])]
+            return get_line
+
+    executor_calls = []
+
+    class _EventLoop(object):
+        def run_in_executor(self, callback):
+            executor_calls.append(callback)
+
+    class _CLI(object):
+        eventloop = _EventLoop()
+
+        def invalidate(self):
+            pass
+
+    lexer = ThreadedLexer(_SlowLexer(), lookahead=20)
+    document = Document('\n'.join('line%i' % i for i in range(20)))
+
+    # The worker of the first run is still busy when the second run starts.
+    lexer.lex_document(_CLI(), document)(0)
+    threads = [threading.Thread(target=executor_calls[0])]
+    threads[0].start()
+    lexer.lex_document(_CLI(), document)(0)
+    threads.append(threading.Thread(target=executor_calls[1]))
+    threads[1].start()
+
+    for t in threads:
+        t.join()
+
+    assert overlaps and not any(overlaps)
+
+
+def test_buffer_control_reuses_processed_lines():
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.controls import BufferControl
+    from prompt_toolkit.layout.processors import Processor, Transformation
+
+    transformed = []
+
+    class _CountingProcessor(Processor):
+        def __init__(self):
+            self.key = 'a'
+
+        def get_cache_key(self, cli, document, lineno):
+            return self.key
+
+        def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
+            transformed.append(lineno)
+            return Transformation(tokens)
+
+    processor = _CountingProcessor()
+    control = BufferControl(input_processors=[processor])
+    document = Document('line0\nline1\nline2')
+
+    def render(document):
+        get_processed_line = control._create_get_processed_line_func(None, document)
+        return [get_processed_line(i).tokens for i in range(document.line_count)]
+
+    render(document)
+    assert transformed == [0, 1, 2]
+
+    # Same text and processor state: nothing is processed again.
+    render(Document(document.text, cursor_position=3))
+    assert transformed == [0, 1, 2]
+
+    # The processor state changed.
+    processor.key = 'b'
+    render(document)
+    assert transformed == [0, 1, 2] * 2
+
+    # The text changed.
+    render(Document('line0\nline1'))
+    assert transformed == [0, 1, 2] * 2 + [0, 1]
+
+
+def test_whitespace_processors_skip_zero_width_escapes():
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.processors import (
+        ShowLeadingWhiteSpaceProcessor, ShowTrailingWhiteSpaceProcessor)
+
+    tokens = [(Token.ZeroWidthEscape, '\x1b]0;title\x07'), (Token, '  ab  ')]
+    document = Document('  ab  ')
+
+    processor = ShowTrailingWhiteSpaceProcessor(get_char=lambda cli: '.')
+    assert processor.apply_transformation(None, document, 0, None, tokens).tokens == [
+        (Token.ZeroWidthEscape, '\x1b]0;title\x07'),
+        (Token, '  ab'),
+        (Token.TrailingWhiteSpace, '..'),
+    ]
+
+    processor = ShowLeadingWhiteSpaceProcessor(get_char=lambda cli: '.')
+    assert processor.apply_transformation(None, document, 0, None, tokens).tokens == [
+        (Token.LeadingWhiteSpace, '..'),
+        (Token, 'ab  '),
+    ]
+
+
+def test_apply_token_overlays():
+    from prompt_toolkit.layout.utils import apply_token_overlays
+
+    tokens = [(Token.A, 'abcd'), (Token.B, 'efgh')]
+    result = apply_token_overlays(tokens, [
+        (2, 6, (':', ) + Token.X),
+        (3, 4, (':', ) + Token.Y),
+    ])
+
+    assert result == [
+        (Token.A, 'ab'),
+        (Token.A + (':', ) + Token.X, 'c'),
+        (Token.A + (':', ) + Token.X + (':', ) + Token.Y, 'd'),
+        (Token.B + (':', ) + Token.X, 'ef'),
+        (Token.B, 'gh'),
+    ]
+
+    assert apply_token_overlays(tokens, []) is tokens
+
+
+def test_buffer_control_moves_overlays_with_tabs():
+    from prompt_toolkit.document import Document
+    from prompt_toolkit.layout.controls import BufferControl
+    from prompt_toolkit.layout.processors import Processor, Transformation, TabsProcessor
+    from prompt_toolkit.reactive import Integer
+
+    class _HighlightB(Processor):
+        def apply_transformation(self, cli, document, lineno, source_to_display, tokens):
+            col = document.lines[lineno].index('b')
+            return Transformation(tokens, overlays=[
+                (source_to_display(col), source_to_display(col + 1), (':', ) + Token.X)])
+
+    tabs = TabsProcessor(tabstop=Integer.from_callable(lambda: 4),
+                         get_char1=lambda cli: '|', get_char2=lambda cli: '-')
+    control = BufferControl(input_processors=[_HighlightB(), tabs])
+
+    line = control._create_get_processed_line_func(None, Document('a\tb\tc'))(0)
+
+    assert line.tokens == [
+        (Token, 'a'), (Token.Tab, '|'), (Token.Tab, '--'),
+        (Token + (':', ) + Token.X, 'b'),
+        (Token.Tab, '|'), (Token.Tab, '--'), (Token, 'c'),
+    ]
+    assert [line.source_to_display(i) for i in range(6)] == [0, 1, 4, 5, 8, 9]
+    assert [line.display_to_source(i) for i in range(10)] == [0, 1, 1, 1, 2, 3, 3, 3, 4, 5]
@@ -108,3 +108,146 @@ def test_completer():
     assert completions[0].start_position == -3
     assert completions[1].text == 'before2-def-after2-B'
     assert completions[1].start_position == -3
+
+
+def test_completer_removes_duplicates_lazily():
+    produced = []
+
+    class completer1(Completer):
+        def get_completions(self, document, complete_event):
+            for text in ['a', 'b', 'a', 'c', 'b']:
+                produced.append(text)
+                yield Completion(text, -len(document.text))
+
+    # Two alternatives that both end in "var1".
+    g = compile(r'(x (?P<var1>[a-z]*)) | (x (?P<var1>[a-z]*))')
+    completer = GrammarCompleter(g, {'var1': completer1()})
+
+    completions = completer.get_completions(Document('x', 1), CompleteEvent())
+
+    assert next(completions).text == 'a'
+    assert produced == ['a']
+
+    assert [c.text for c in completions] == ['b', 'c']
+
+
+def test_lexer():
+    from prompt_toolkit.contrib.regular_languages.lexer import GrammarLexer
+    from prompt_toolkit.layout.lexers import SimpleLexer
+    from prompt_toolkit.token import Token
+
+    grammar = compile(r'(?P<operator>add|sub) \s+ (?P<var1>\d+) \s+ (?P<var2>\d+)')
+    lexer = GrammarLexer(grammar, lexers={
+        'operator': SimpleLexer(Token.Operator),
+        'var1': SimpleLexer(Token.Number),
+    })
+
+    get_line = lexer.lex_document(None, Document('add 1 22 x'))
+    assert get_line(0) == [
+        (Token.Operator, 'add'),
+        (Token, ' '),
+        (Token.Number, '1'),
+        (Token, ' 22'),
+        (Token.TrailingInput, ' x'),
+    ]
+
+    # The completer and the lexer share the match for the same text.
+    assert grammar.match_prefix('add 1 22 x') is grammar.match_prefix('add 1 22 x')
+
+
+def test_compile_with_cache_directory():
+    import os
+    import shutil
+    import tempfile
+
+    cache_directory = tempfile.mkdtemp()
+    expression = r'(?P<operator>add|sub) \s+ (?P<var1>\d+) | (?P<operator2>mul)'
+
+    try:
+        g1 = compile(expression, cache_directory=cache_directory)
+        g2 = compile(expression, cache_directory=cache_directory)
+
+        # The second grammar was loaded from the cache, prefix patterns are
+        # compiled lazily.
+        assert g2._prefix_patterns == g1._re_prefix_patterns
+        assert g2._prefix_pattern_set is None
+
+        for text in ['ad', 'add 4', 'mul', 'x']:
+            v1 = g1.match_prefix(text).variables()
+            v2 = g2.match_prefix(text).variables()
+            assert sorted(v1._tuples) == sorted(v2._tuples)
+
+        assert g2.match('sub 3').variables()['var1'] == '3'
+
+        # When the cache file can't be written, no temporary file is left.
+        name, = os.listdir(cache_directory)
+        os.remove(os.path.join(cache_directory, name))
+        os.mkdir(os.path.join(cache_directory, name))
+        open(os.path.join(cache_directory, name, 'x'), 'w').close()
+
+        g3 = compile(expression, cache_directory=cache_directory)
+        assert g3.match('sub 3').variables()['var1'] == '3'
+        assert os.listdir(cache_directory) == [name]
+    finally:
+        shutil.rmtree(cache_directory)
+
+
+def test_compile_with_invalid_cache_file():
+    import os
+    import shutil
+    import tempfile
+
+    cache_directory = tempfile.mkdtemp()
+    expression = r'(?P<operator>add|sub) \s+ (?P<var1>\d+)'
+
+    try:
+        compile(expression, cache_directory=cache_directory)
+        name, = os.listdir(cache_directory)
+
+        # Valid JSON with another structure, or an invalid regex, is ignored
+        # and the cache file is written again.
+        for content in ['{}', '[]', '{"pattern": "(", "prefix_patterns": [], "group_names": {}}']:
+            with open(os.path.join(cache_directory, name), 'w') as f:
+                f.write(content)
+
+            g = compile(expression, cache_directory=cache_directory)
+            assert g.match('sub 3').variables()['var1'] == '3'
+
+            with open(os.path.join(cache_directory, name)) as f:
+                assert f.read() != content
+    finally:
+        shutil.rmtree(cache_directory)
+
+
+def test_prefix_patterns_are_generated_once():
+    import threading
+
+    g = compile(r'(?P<operator>add|sub) \s+ (?P<var1>\d+) | (?P<operator2>mul)')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(g._re_prefix_patterns))
+               for _ in range(8)]
+
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(r is results[0] for r in results)
+
+
+def test_pattern_set_matches_all_patterns_at_once():
+    from prompt_toolkit.contrib.regular_languages.compiler import _PatternSet
+
+    patterns = [r'^(?P<n0>a+)$', r'^(?P<n0>a)(?P<n1>a*)$', r'^(?P<n2>b)$']
+    pattern_set = _PatternSet(patterns)
+    assert pattern_set._re is not None
+
+    matches = pattern_set.match('aaa')
+    assert [p.pattern for p, m in matches] == patterns[:2]
+    assert [sorted((name, m.regs[i]) for name, i in p.groupindex.items())
+            for p, m in matches] == [
+        [('n0', (0, 3))],
+        [('n0', (0, 1)), ('n1', (1, 3))],
+    ]
+
+    assert pattern_set.match('c') == []
@@ -38,3 +38,44 @@ def test_style_inheritance():
     expected = Attrs(color=None, bgcolor=None, bold=False,
                      underline=False, italic=False, blink=True, reverse=False)
     assert style.get_attrs_for_token(Token.A.B.C.D.E) == expected
+
+
+def test_default_style_is_created_lazily():
+    import os
+    import subprocess
+    import sys
+
+    # (In a new process, because other tests import everything. Make sure
+    # that it imports this prompt_toolkit.)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [p for p in [env.get('PYTHONPATH')] if p])
+
+    output = subprocess.check_output([sys.executable, '-c', '''if 1:
+        import sys
+        import prompt_toolkit
+        from prompt_toolkit.styles import DEFAULT_STYLE
+        from prompt_toolkit.token import Token
+
+        print('prompt_toolkit.interface' in sys.modules)
+        print('pygments.styles' in sys.modules)
+        DEFAULT_STYLE.get_attrs_for_token(Token.Keyword)
+        print(prompt_toolkit.CommandLineInterface.__name__)
+    '''], cwd=root, env=env)
+
+    interface_imported, styles_imported, name = output.decode('utf-8').split()
+
+    # (Before Python 3.7, `prompt_toolkit` imports the interface eagerly.)
+    if sys.version_info >= (3, 7):
+        assert interface_imported == 'False'
+    assert styles_imported == 'False'
+    assert name == 'CommandLineInterface'
+
+
+def test_default_style():
+    from prompt_toolkit.styles import DEFAULT_STYLE, style_from_pygments
+
+    style = style_from_pygments()
+    for token in [Token.Keyword, Token.Menu.Completions.Completion.Current, Token.X]:
+        assert DEFAULT_STYLE.get_attrs_for_token(token) == style.get_attrs_for_token(token)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Measure how long it takes to import prompt_toolkit in a fresh interpreter.
+
+Every statement is executed a couple of times in a new Python process and the
+best time is reported. Use `--max` to fail (exit code 1) when one of them
+becomes slower than the given amount of milliseconds, for catching cold-start
+regressions.
+
+Usage::
+
+    python tools/benchmark_import_time.py
+    python tools/benchmark_import_time.py --repeat 20 --max 150
+    python tools/benchmark_import_time.py --modules 'import prompt_toolkit'
+"""
+from __future__ import unicode_literals, print_function
+import argparse
+import os
+import subprocess
+import sys
+
+STATEMENTS = [
+    'import prompt_toolkit',
+    'from prompt_toolkit.shortcuts import prompt',
+    'from prompt_toolkit.shortcuts import create_prompt_application; create_prompt_application()',
+]
+
+_TIMER = """
+import time
+start = time.time()
+%s
+print(time.time() - start)
+"""
+
+
+def _run(args):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))] +
+        [p for p in [env.get('PYTHONPATH')] if p])
+
+    return subprocess.check_output([sys.executable] + args, env=env,
+                                   stderr=subprocess.STDOUT).decode('utf-8')
+
+
+def time_statement(statement, repeat):
+    " Return the best time (in seconds) for executing `statement`. "
+    return min(float(_run(['-c', _TIMER % statement])) for _ in range(repeat))
+
+
+def slowest_modules(statement, count):
+    """
+    Return the `count` modules with the highest cumulative import time (in
+    microseconds) as `(time, name)` tuples. (Requires Python 3.7.)
+    """
+    result = []
+
+    for line in _run(['-X', 'importtime', '-c', statement]).splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[1].strip().isdigit():
+            result.append((int(parts[1]), parts[2].strip()))
+
+    return sorted(result, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='Number of processes to start for every statement.')
+    parser.add_argument('--max', type=float, default=None,
+                        help='Fail when a statement takes more milliseconds.')
+    parser.add_argument('--modules', metavar='STATEMENT', default=None,
+                        help='Show the slowest imports of this statement.')
+    args = parser.parse_args()
+
+    if args.modules:
+        for microseconds, name in slowest_modules(args.modules, 25):
+            print('%8.1f ms  %s' % (microseconds / 1000., name))
+        return
+
+    failed = False
+
+    for statement in STATEMENTS:
+        milliseconds = time_statement(statement, args.repeat) * 1000
+        print('%8.1f ms  %s' % (milliseconds, statement))
+
+        if args.max is not None and milliseconds > args.max:
+            failed = True
+
+    if failed:
+        print('Slower than %s ms.' % args.max)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()